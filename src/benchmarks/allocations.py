@@ -0,0 +1,44 @@
+''' Cantidad de valores de runtime construidos al ejecutar los ejemplos y las cargas
+sintéticas de engines.py con cada motor.
+
+Se instrumenta Value.__new__ para contar las instancias creadas de cada clase
+(los valores compartidos que se reutilizan y los enteros, que son int de Python, no cuentan).
+Uso: py src/benchmarks/allocations.py [motor ...]'''
+import collections
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.engines import ENGINES, EXAMPLES, SYNTHETIC, NullOutput
+from flecha import interpreter
+from flecha.parser import Parser
+
+def instrument(counts: collections.Counter):
+    def counted(cls, *args, **kwargs):
+        counts[cls.__name__] += 1
+        return object.__new__(cls)
+    interpreter.Value.__new__ = counted
+
+
+def main(engines: list[str]):
+    sources = list(SYNTHETIC.values())
+    for path in EXAMPLES:
+        with open(path, encoding='utf-8') as file:
+            sources.append(file.read())
+    programs = [Parser(print_errors=False).parse(source) for source in sources]
+    counts = collections.Counter()
+    instrument(counts)
+    results = {}
+    for engine in engines:
+        counts.clear()
+        for program in programs:
+            ENGINES[engine](NullOutput(), program)
+        results[engine] = dict(counts)
+    names = sorted({name for result in results.values() for name in result})
+    print(f'{"motor":<10}' + ''.join(f'{name:>14}' for name in names) + f'{"total":>12}')
+    for engine, result in results.items():
+        print(f'{engine:<10}' + ''.join(f'{result.get(name, 0):>14}' for name in names) + f'{sum(result.values()):>12}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or list(ENGINES))
@@ -0,0 +1,68 @@
+''' Serialización JSON de ASTs anchos (muchas definiciones) y profundos (aplicaciones anidadas):
+la implementación anterior (armar la lista anidada recursivamente y pasarla a json.dumps)
+contra repr() y dump() a un stream, que recorren el AST iterativamente.
+Uso: py src/benchmarks/ast_json.py [definiciones] [profundidad]'''
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ast_memory import DEFINITION, generate
+from flecha.ast import *
+from flecha.parser import Parser
+
+
+class NullOutput:
+    def write(self, text: str):
+        pass
+
+
+def nested_output(node) -> NodeOutput:
+    ''' Representación como listas anidadas, construida recursivamente como antes'''
+    if isinstance(node, AstNode):
+        return nested_output(node._output())
+    if type(node) is RawJson:
+        return json.loads(node)
+    if type(node) in (list, tuple):
+        return [nested_output(x) for x in node]
+    return node
+
+
+def deep(depth: int) -> Program:
+    expr = ExprNumber(0)
+    for i in range(depth):
+        expr = ExprApply(ExprLambda('x', expr), ExprNumber(i))
+    return Program(Definition('deep', expr))
+
+
+def measure(fn) -> str:
+    start = time.perf_counter()
+    try:
+        fn()
+    except RecursionError:
+        return ' RecursionError'
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return f'{elapsed:7.3f}s  pico {peak / 2**20:8.2f} MB'
+
+
+def main(definitions: int, depth: int):
+    programs = {
+        f'ancho ({definitions} definiciones)': Parser(print_errors=False).parse(generate(definitions, DEFINITION)),
+        f'profundo ({depth} niveles)': deep(depth),
+    }
+    for name, program in programs.items():
+        print(name)
+        print(f'  json.dumps recursivo {measure(lambda: json.dumps(nested_output(program), **jsonConfig))}')
+        print(f'  repr                 {measure(lambda: repr(program))}')
+        print(f'  dump                 {measure(lambda: dump(program, NullOutput()))}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, int(sys.argv[2]) if len(sys.argv) > 2 else 50000)
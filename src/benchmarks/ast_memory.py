@@ -0,0 +1,59 @@
+''' Memoria que ocupa el AST de programas generados grandes: bytes totales retenidos
+después de parsear (medidos con tracemalloc), cantidad de nodos y bytes por nodo,
+sin y con hash-consing.
+Uso: py src/benchmarks/ast_memory.py [definiciones]'''
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flecha.ast import AstNode
+from flecha.hashcons import HashConsTable
+from flecha.parser import Parser
+
+DEFINITION = '''
+def f{i} xs n =
+  case xs
+  | Nil -> n
+  | Cons y ys -> (let z = y * {i} + n in (if z > 100 then f{i} ys (z - 1) else f{i} ys (n + unsafePrintChar 'a')))
+'''
+
+STRINGS = 'def s{i} = print "mensaje largo número {i}: el valor calculado fue"\n'
+
+
+def generate(definitions: int, template: str) -> str:
+    return ''.join(template.format(i=i) for i in range(definitions))
+
+
+def count_nodes() -> int:
+    return sum(1 for o in gc.get_objects() if isinstance(o, AstNode))
+
+
+def measure(source: str, hash_cons: bool) -> tuple[int, int]:
+    parser = Parser(print_errors=False, hash_cons=HashConsTable() if hash_cons else None)
+    parser.parse('def a = 1')
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    program = parser.parse(source)
+    parser.parse('def a = 1')  # ply retiene los símbolos del último parse
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    nodes = count_nodes()
+    del program
+    return size, nodes
+
+
+def main(definitions: int):
+    for name, template in (('funciones', DEFINITION), ('strings', STRINGS)):
+        for hash_cons in (False, True):
+            size, nodes = measure(generate(definitions, template), hash_cons)
+            print(f'{name:<10} {"hash-consing" if hash_cons else "":<12} {definitions} definiciones: '
+                  f'{size / 2**20:8.2f} MB  {nodes:>8} nodos  {size / max(nodes, 1):7.1f} bytes/nodo')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
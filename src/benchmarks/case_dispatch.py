@@ -0,0 +1,31 @@
+''' Tiempo de un case sobre muchos constructores con cada motor: el programa recorre
+repetidas veces una lista de 100 elementos que usan uno de los últimos constructores del case.
+
+Uso: py src/benchmarks/case_dispatch.py [constructores] [repeticiones]'''
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.engines import ENGINES, measure
+from flecha.parser import Parser
+
+def program(constructors: int, repeat: int) -> str:
+    ctors = [f'C{i}' for i in range(constructors)]
+    branches = ' '.join(f'| {c} x -> x + {i}' for i, c in enumerate(ctors))
+    return f'''
+        def f v = case v {branches}
+        def build n = if n == 0 then Nil else Cons ({ctors[-3]} n) (build (n - 1))
+        def sum xs acc = case xs | Nil -> acc | Cons y ys -> sum ys (acc + f y)
+        def rep k xs acc = if k == 0 then acc else rep (k - 1) xs (sum xs acc)
+        def main = unsafePrintInt (rep {repeat} (build 100) 0)'''
+
+
+def main(constructors: int, repeat: int):
+    ast = Parser(print_errors=False).parse(program(constructors, repeat))
+    print(f'{constructors} constructores, {repeat} repeticiones')
+    for engine in ENGINES:
+        print(f'{engine:<10}{measure(engine, ast, 3):>9.3f}s')
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:3]] or [200, 100])
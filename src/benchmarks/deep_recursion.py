@@ -0,0 +1,34 @@
+''' Recursión profunda (no de cola) con el evaluador de pila explícita.
+
+Uso: py src/benchmarks/deep_recursion.py [profundidad]'''
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flecha.machine import Machine
+from flecha.parser import Parser
+
+SOURCE = '''
+def sum n = if n == 0 then 0 else n + sum (n - 1)
+def main = unsafePrintInt (sum {depth})
+'''
+
+
+class NullOutput():
+    def write(self, str: str):
+        self.last = str
+
+
+def main(depth: int):
+    program = Parser().parse(SOURCE.format(depth=depth))
+    out = NullOutput()
+    start = time.perf_counter()
+    Machine(out).run(program)
+    elapsed = time.perf_counter() - start
+    assert out.last == str(depth * (depth + 1) // 2)
+    print(f'stack: sum {depth} -> ok in {elapsed:.2f}s (sys.getrecursionlimit() = {sys.getrecursionlimit()})')
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,64 @@
+''' Compara los motores de evaluación sobre los ejemplos y sobre cargas sintéticas.
+
+Uso: py src/benchmarks/engines.py [motor ...]'''
+import glob
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flecha.engines import ENGINES
+from flecha.parser import Parser
+
+EXAMPLES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                         'tests', 'interpreter', 'examples', '*.fl')))
+
+SYNTHETIC = {
+    'fib 20': '''
+        def fib n = if n < 2 then n else fib (n - 1) + fib (n - 2)
+        def main = unsafePrintInt (fib 20)''',
+    'loop 200000': '''
+        def loop n acc = if n == 0 then acc else loop (n - 1) (acc + n)
+        def main = unsafePrintInt (loop 200000 0)''',
+    'list sum 100': '''
+        def range n = if n == 0 then Nil else Cons n (range (n - 1))
+        def sum xs = case xs | Nil -> 0 | Cons y ys -> y + sum ys
+        def map f xs = case xs | Nil -> Nil | Cons y ys -> Cons (f y) (map f ys)
+        def repeat k acc = if k == 0 then acc else repeat (k - 1) (acc + sum (map (\\x -> x * 2) (range 100)))
+        def main = unsafePrintInt (repeat 200 0)''',
+    # x0 y las globales quedan detrás de las 200 ligaduras del let.
+    'let chain 200': '''
+        def step x = x + 1
+        def chain n = let x0 = n in ''' + ''.join(f'let x{i} = x{i - 1} + x0 in ' for i in range(1, 200)) + '''step x199
+        def repeat k acc = if k == 0 then acc else repeat (k - 1) (acc + chain k)
+        def main = unsafePrintInt (repeat 300 0)''',
+}
+
+
+class NullOutput():
+    def write(self, str: str):
+        pass
+
+
+def measure(engine, program, repeat=1) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ENGINES[engine](NullOutput(), program)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(engines: list[str]):
+    parser = Parser()
+    workloads = [('examples (total)', [parser.parse(open(f, encoding='utf-8').read()) for f in EXAMPLES])]
+    workloads += [(name, [parser.parse(source)]) for name, source in SYNTHETIC.items()]
+    print(f'{"workload":<18}' + ''.join(f'{e:>10}' for e in engines))
+    for name, programs in workloads:
+        times = [sum(measure(e, p, 3) for p in programs) for e in engines]
+        print(f'{name:<18}' + ''.join(f'{t:>9.3f}s' for t in times))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(ENGINES))
@@ -0,0 +1,42 @@
+''' Tiempo de un programa que genera una lista grande de elementos costosos y sólo usa los
+primeros, con evaluación estricta (tree) y por necesidad (lazy). Con lazy además se mide el
+mismo recorrido sobre una lista infinita, que el resto de los motores no puede evaluar.
+
+Uso: py src/benchmarks/lazy_prefix.py [elementos] [prefijo]'''
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.engines import ENGINES, measure
+from flecha.parser import Parser
+
+COMMON = '''
+    def cost n k acc = if k == 0 then acc else cost n (k - 1) (acc + n % 7)
+    def take n xs = if n == 0 then Nil else (case xs | Nil -> Nil | Cons y ys -> Cons y (take (n - 1) ys))
+    def sum xs acc = case xs | Nil -> acc | Cons y ys -> sum ys (acc + y)
+'''
+
+
+def finite(size: int, prefix: int) -> str:
+    return COMMON + f'''
+    def build n acc = if n == 0 then acc else build (n - 1) (Cons (cost n 50 0) acc)
+    def main = unsafePrintInt (sum (take {prefix} (build {size} Nil)) 0)'''
+
+
+def infinite(prefix: int) -> str:
+    return COMMON + f'''
+    def from n = Cons (cost n 50 0) (from (n + 1))
+    def main = unsafePrintInt (sum (take {prefix} (from 1)) 0)'''
+
+
+def main(size: int, prefix: int):
+    parser = Parser(print_errors=False)
+    ast = parser.parse(finite(size, prefix))
+    print(f'lista de {size} elementos, prefijo de {prefix}')
+    for engine in ENGINES:
+        print(f'{engine:<16}{measure(engine, ast, 3):>9.3f}s')
+    print(f'{"lazy (infinita)":<16}{measure("lazy", parser.parse(infinite(prefix)), 3):>9.3f}s')
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:3]] or [5000, 10])
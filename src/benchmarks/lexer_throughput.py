@@ -0,0 +1,56 @@
+''' Tokens por segundo de Lexer (ply.lex) y FastLexer sobre una entrada de varios megabytes,
+armada concatenando los ejemplos de los tests.
+Uso: py src/benchmarks/lexer_throughput.py [megabytes]'''
+import glob
+import os
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+
+from flecha.fastlexer import FastLexer
+from flecha.lexer import Lexer
+
+
+def corpus(megabytes: float) -> str:
+    sources = []
+    for path in sorted(glob.glob(os.path.join(SRC_DIR, 'tests', '*', 'examples', '*.fl'))):
+        with open(path, encoding='utf-8') as file:
+            sources.append(file.read())
+    text = '\n'.join(sources)
+    return text * max(1, int(megabytes * 2**20 / len(text)))
+
+
+def ply_count(text: str) -> int:
+    lexer = Lexer(print_errors=False).build()
+    lexer.input(text)
+    return sum(1 for _ in iter(lexer.token, None))
+
+
+def fast_count(text: str) -> int:
+    return sum(1 for _ in FastLexer(print_errors=False).tokenize(text))
+
+
+def fast_tokens_count(text: str) -> int:
+    lexer = FastLexer(print_errors=False)
+    lexer.input(text)
+    return sum(1 for _ in iter(lexer.token, None))
+
+
+def measure(count, text: str) -> tuple[int, float]:
+    start = time.perf_counter()
+    tokens = count(text)
+    return tokens, time.perf_counter() - start
+
+
+def main(megabytes: float):
+    text = corpus(megabytes)
+    print(f'entrada: {len(text) / 2**20:.1f} MB')
+    for name, count in (('ply.lex', ply_count), ('FastLexer.tokenize', fast_count), ('FastLexer.token', fast_tokens_count)):
+        tokens, elapsed = measure(count, text)
+        print(f'{name:<20} {tokens:>9} tokens  {elapsed:7.2f}s  {tokens / elapsed:>12,.0f} tokens/s')
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,50 @@
+''' Tiempo del intérprete tree sin límites (tree) o con límites de pasos, tiempo y memoria
+(limited), y lo que usó cada programa. Conviene medir cada intérprete en un proceso
+aparte: al alternarlos en el mismo proceso Python deja de especializar sus métodos.
+
+Uso: py src/benchmarks/limits.py [n] [tree|limited]'''
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.engines import NullOutput
+from flecha.interpreter import Interpreter, LocalEnv
+from flecha.limits import BATCH, LimitedInterpreter, Limits
+from flecha.parser import Parser
+
+def programs(n: int) -> dict[str, str]:
+    return {
+        f'fib {n}': f'''
+            def fib n = if n < 2 then n else fib (n - 1) + fib (n - 2)
+            def main = unsafePrintInt (fib {n})''',
+        f'sum {n * 1000}': f'''
+            def sum i n acc = if i > n then acc else sum (i + 1) n (acc + i)
+            def main = unsafePrintInt (sum 0 {n * 1000} 0)''',
+    }
+
+
+def measure(interpreter, program, repeat: int = 3) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        interpreter().eval(program, LocalEnv())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(n: int, mode: str):
+    parser = Parser(print_errors=False)
+    for name, source in programs(n).items():
+        program = parser.parse(source)
+        if mode == 'tree':
+            print(f'{name:<12}{measure(lambda: Interpreter(NullOutput()), program):>9.3f}s')
+            continue
+        limits = Limits(10 ** 9, 3600, 10 ** 9)
+        elapsed = measure(lambda: LimitedInterpreter(NullOutput(), limits), program, 1)
+        print(f'{name:<12}{elapsed:>9.3f}s  lote={BATCH}: {limits}')
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20, sys.argv[2] if len(sys.argv) > 2 else 'limited')
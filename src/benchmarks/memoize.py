@@ -0,0 +1,45 @@
+''' Tiempo del intérprete tree con y sin memoización de funciones globales puras, sobre
+funciones recursivas que repiten cómputo (fib y coeficientes binomiales), con varias
+capacidades de la cache.
+
+Uso: py src/benchmarks/memoize.py [n]'''
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.engines import NullOutput
+from flecha.interpreter import Interpreter, LocalEnv
+from flecha.memo import MemoCache, memoize_program
+from flecha.parser import Parser
+
+def programs(n: int) -> dict[str, str]:
+    return {
+        f'fib {n}': f'''
+            def fib n = if n < 2 then n else fib (n - 1) + fib (n - 2)
+            def main = unsafePrintInt (fib {n})''',
+        f'binomial {n} {n // 2}': f'''
+            def c n k = if k == 0 || k == n then 1 else c (n - 1) (k - 1) + c (n - 1) k
+            def main = unsafePrintInt (c {n} {n // 2})''',
+    }
+
+
+def measure(program, capacity: int) -> tuple[float, MemoCache | None]:
+    memo = MemoCache(capacity) if capacity else None
+    start = time.perf_counter()
+    Interpreter(NullOutput(), memo).eval(memoize_program(program) if memo is not None else program, LocalEnv())
+    return time.perf_counter() - start, memo
+
+
+def main(n: int):
+    parser = Parser(print_errors=False)
+    for name, source in programs(n).items():
+        program = parser.parse(source)
+        print(name)
+        for capacity in (0, 16, 10000):
+            elapsed, memo = measure(program, capacity)
+            print(f'  memoize={capacity:<6}{elapsed:>9.3f}s  {memo if memo is not None else ""}')
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 18)
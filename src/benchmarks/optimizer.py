@@ -0,0 +1,42 @@
+''' Tiempo de evaluación de un programa con aritmética cerrada, if sobre constantes, let
+de literales y funciones auxiliares chicas (como los que genera un generador de código) con
+cada nivel de optimización.
+
+Uso: py src/benchmarks/optimizer.py [iteraciones] [motor]'''
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.engines import measure
+from flecha.optimizer import LEVELS, Optimizer
+from flecha.parser import Parser
+
+def program(iterations: int) -> str:
+    return f'''
+        def debug = False
+        def secondsPerDay = 60 * 60 * 24
+        def area w h = w * h
+        def unused n = area n n
+        def step n acc =
+            let width = 80 in
+            let height = 25 in
+            if debug && n > 0 then acc
+            else acc + (area width height - 1000) / (2 * 4) + (if 3 > 2 then 1 else 0) * (n % secondsPerDay)
+        def loop n acc = if n == 0 then acc else loop (n - 1) (step n acc)
+        def main = unsafePrintInt (loop {iterations} 0)'''
+
+
+def main(iterations: int, engine: str):
+    source = Parser(print_errors=False).parse(program(iterations))
+    print(f'{iterations} iteraciones, motor {engine}')
+    for level in LEVELS:
+        optimizer = Optimizer(level)
+        start = time.perf_counter()
+        ast = optimizer.optimize_program(source)
+        elapsed = time.perf_counter() - start
+        print(f'optimize={level}{measure(engine, ast, 3):>9.3f}s  (optimizar: {elapsed * 1000:.1f} ms; {optimizer.report})')
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000, sys.argv[2] if len(sys.argv) > 2 else 'tree')
@@ -0,0 +1,51 @@
+''' Tiempo de un programa que imprime varios megabytes según cómo se escribe la salida:
+una escritura (una llamada al sistema) por cada print, un archivo de texto de Python y un
+OutputBuffer sobre el archivo binario, que es lo que usa main.py.
+
+Uso: py src/benchmarks/output.py [prints] [motor]'''
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.engines import ENGINES
+from flecha.output import OutputBuffer
+from flecha.parser import Parser
+
+def program(prints: int) -> str:
+    return f'''
+        def loop n = if n == 0 then 0 else (unsafePrintInt n; unsafePrintChar ' '; loop (n - 1))
+        def main = loop {prints}'''
+
+
+class Unbuffered:
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def write(self, text: str):
+        os.write(self.fd, text.encode())
+
+
+def outputs(path: str) -> dict:
+    return {
+        'sin buffer': lambda: Unbuffered(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)),
+        'texto': lambda: open(path, 'w', encoding='utf-8'),
+        'OutputBuffer': lambda: OutputBuffer(open(path, 'wb', buffering=0)),
+    }
+
+
+def main(prints: int, engine: str, path: str = os.devnull):
+    ast = Parser(print_errors=False).parse(program(prints))
+    print(f'{prints} prints, motor {engine}')
+    for name, output in outputs(path).items():
+        out = output()
+        start = time.perf_counter()
+        ENGINES[engine](out, ast)
+        if hasattr(out, 'flush'):
+            out.flush()
+        elapsed = time.perf_counter() - start
+        print(f'{name:<14}{elapsed:>9.3f}s')
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300000, sys.argv[2] if len(sys.argv) > 2 else 'vm')
@@ -0,0 +1,47 @@
+''' Latencia en frío de construir Parser() y del primer parse.
+
+Modos: 'generar' construye las tablas LALR desde la gramática (lo que ocurre sin parsetab.py),
+'validar' inspecciona la gramática y reutiliza parsetab.py si la firma coincide (Parser(tables=False)),
+'pregeneradas' carga las tablas distribuidas sin inspeccionar nada (Parser()).
+Cada medición corre en un proceso nuevo para incluir la importación de los módulos.
+Uso: py src/benchmarks/parser_startup.py [repeticiones]'''
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import time
+start = time.perf_counter()
+from flecha.parser import Parser
+if {mode!r} == 'generar':
+    from ply.yacc import yacc
+    parser = Parser(tables=False)
+    parser._Parser__yacc = yacc(module=parser, write_tables=False, debug=False, tabmodule='flecha.no_parsetab')
+else:
+    parser = Parser(tables={mode!r} == 'pregeneradas')
+built = time.perf_counter()
+parser.parse('def main = unsafePrintInt (1 + 2)')
+parsed = time.perf_counter()
+print(built - start, parsed - built)
+'''
+
+
+def cold_run(mode: str) -> tuple[float, float]:
+    out = subprocess.run([sys.executable, '-c', PROBE.format(mode=mode)], cwd=SRC_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    build, first_parse = out.split()
+    return float(build), float(first_parse)
+
+
+def main(repeat: int):
+    for mode in ('generar', 'validar', 'pregeneradas'):
+        runs = [cold_run(mode) for _ in range(repeat)]
+        build = min(r[0] for r in runs) * 1000
+        first_parse = min(r[1] for r in runs) * 1000
+        print(f'{mode:<13} Parser(): {build:7.2f} ms   primer parse: {first_parse:6.2f} ms')
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,54 @@
+''' Tiempo del intérprete tree con y sin --profile, y lo que informa el perfilador, sobre
+un programa con recursión, llamadas de cola, listas y closures.
+
+Uso: py src/benchmarks/profiler.py [n]'''
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.engines import NullOutput
+from flecha.interpreter import Interpreter, LocalEnv
+from flecha.parser import Parser
+from flecha.profiler import ProfilingInterpreter
+
+def program(n: int) -> str:
+    return f'''
+def fib n = if n < 2 then n else fib (n - 1) + fib (n - 2)
+
+def range i n = if i == n then Nil else Cons i (range (i + 1) n)
+
+def map f xs =
+  case xs
+  | Nil -> Nil
+  | Cons y ys -> Cons (f y) (map f ys)
+
+def sum xs acc =
+  case xs
+  | Nil -> acc
+  | Cons y ys -> sum ys (acc + y)
+
+def main =
+  unsafePrintInt (fib {n});
+  unsafePrintInt (sum (map (\\x -> x * x) (range 0 {n * 10})) 0)
+'''
+
+
+def measure(interpreter, program) -> float:
+    start = time.perf_counter()
+    interpreter.eval(program, LocalEnv())
+    return time.perf_counter() - start
+
+
+def main(n: int):
+    program = Parser(print_errors=False).parse(globals()['program'](n))
+    plain = measure(Interpreter(NullOutput()), program)
+    profiler = ProfilingInterpreter(NullOutput())
+    profiled = measure(profiler, program)
+    print(f'sin --profile {plain:>9.3f}s')
+    print(f'con --profile {profiled:>9.3f}s  ({profiled / plain:.1f}x)')
+    profiler.report(sys.stdout)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 18)
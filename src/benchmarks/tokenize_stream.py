@@ -0,0 +1,48 @@
+''' Memoria máxima y tiempo de --tokenize-file (lee todo y arma la lista de tokens) contra
+--tokenize-stream (archivo mapeado en memoria y un token por línea) sobre un fuente generado.
+Cada comando corre en un proceso nuevo con la salida descartada.
+Uso: py src/benchmarks/tokenize_stream.py [megabytes]'''
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFINITION = 'def f{i} x = case x | Cons y ys -> (y + {i}) * 2 | Nil -> unsafePrintChar \'a\' -- comentario\n'
+
+
+def generate(path: str, megabytes: float):
+    with open(path, 'w', encoding='utf-8') as file:
+        i, size = 0, 0
+        while size < megabytes * 2**20:
+            line = DEFINITION.format(i=i)
+            file.write(line)
+            size += len(line)
+            i += 1
+
+
+def run(command: str, path: str) -> tuple[float, float]:
+    ''' Tiempo y memoria máxima (MB) del proceso hijo'''
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(SRC_DIR, 'main.py'), command, path],
+                   stdout=subprocess.DEVNULL, check=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+
+def main(megabytes: float):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'big.fl')
+        generate(path, megabytes)
+        print(f'entrada: {os.path.getsize(path) / 2**20:.1f} MB')
+        # ru_maxrss es el máximo entre todos los hijos terminados: se mide primero el de menor consumo.
+        for command in ('--tokenize-stream', '--tokenize-file'):
+            elapsed, rss = run(command, path)
+            print(f'{command:<18} {elapsed:7.2f}s  memoria máxima: {rss:8.1f} MB')
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -1,8 +1,10 @@
 from enum import Enum
 import json
-from typing import Sequence
+from json.encoder import encode_basestring_ascii
+from typing import Iterator, Sequence, TextIO
 
-NodeOutput = int | str | Sequence['NodeOutput']
+# Plantilla de la representación JSON de un nodo: los nodos hijos quedan sin expandir (ver iter_json).
+NodeOutput = int | str | Sequence['NodeOutput'] | 'AstNode'
 
 jsonConfig = dict(separators=(',', ':'),default=lambda x:x.value)
 
@@ -20,6 +22,11 @@ class Tags(Enum):
     ExprCase="ExprCase"
     CaseBranch="CaseBranch"
     ExprConstructor = "ExprConstructor"
+    ExprString = "ExprString"
+    ExprPrimitive = "ExprPrimitive"
+    ExprStruct = "ExprStruct"
+    ExprMemo = "ExprMemo"
+    ExprLocal = "ExprLocal"
 
 
 class BinaryOperators(Enum):
@@ -41,6 +48,10 @@ class UnaryOperators(Enum):
     NOT = "NOT"
     UMINUS ="UMINUS"
 
+class Primitives(Enum):
+    UNSAFE_PRINT_INT = 'unsafePrintInt'
+    UNSAFE_PRINT_CHAR = 'unsafePrintChar'
+
 binary_operators = {
     "||": BinaryOperators.OR.value,
     "&&": BinaryOperators.AND.value,
@@ -61,48 +72,127 @@ unary_operators = {
     "-": UnaryOperators.UMINUS.value,
 }
 
+# Hash de cada tag, para calcular el hash estructural de los nodos sin pasar por Enum.__hash__.
+_tag_hash = {tag: hash(tag) for tag in Tags}
+
 
 class AstNode():
-    ''' Representa un nodo del AST'''
+    ''' Representa un nodo del AST.
 
-    def __init__(self, tag:Tags, children):
-        self.tag: Tags = tag
-        self.children: list['AstNode'] = children
+    Los nodos genéricos (AstGenericNode) guardan sus hijos en children; los nodos de la gramática
+    (ExprVar, ExprApply, ...) tienen aridad fija y guardan sus partes en campos propios,
+    pero producen la misma representación.
 
-    def appendChild(self, child: 'AstNode') -> 'AstNode':
-        self.children.append(child)
-        return self
+    Los nodos de aridad fija son inmutables y calculan su hash estructural al construirse
+    a partir del de sus partes, de modo que comparar nodos distintos es O(1) casi siempre
+    y los nodos se pueden usar como claves (ver flecha.hashcons).
+
+    Definition, ExprLambda y CaseBranch guardan además la línea del fuente en line, que no
+    forma parte de su identidad estructural. Tampoco forman parte de ella los slots que
+    flecha.resolver.address les asigna al resolver un árbol para evaluarlo sobre frames
+    (size, slot, slots y addresses): sólo están definidos en los nodos que construye address.'''
+    __slots__ = ('tag', '_hash')
 
-    def _childrenOutput(self) -> list[NodeOutput]:
-        return [x._output() for x in self.children]
+    def __new__(cls, *args):
+        # AstNode(tag, children) construye un AstGenericNode: los nodos de aridad fija no
+        # tienen children.
+        return object.__new__(AstGenericNode if cls is AstNode else cls)
+
+    def __init__(self, tag:Tags):
+        self.tag: Tags = tag
+        self._hash = None
+
+    def _parts(self) -> tuple:
+        ''' Valores y nodos hijos que determinan la identidad estructural del nodo'''
+        return ()
 
     def _output(self) -> NodeOutput:
-        return [self.tag] + self._childrenOutput()
+        return [self.tag]
 
     def __repr__(self) -> str:
-        return json.dumps(self._output(), **jsonConfig)
+        return ''.join(iter_json(self))
 
     def __eq__(self, __o: object) -> bool:
-        return __o.__repr__() == self.__repr__()
+        return self is __o or (isinstance(__o, AstNode) and _equal(self, __o))
+
+    def __hash__(self) -> int:
+        # Los nodos genéricos son mutables: su hash se calcula cada vez.
+        h = self._hash
+        return hash((self.tag, *self._parts())) if h is None else h
+
+
+def _equal(a: AstNode, b: AstNode) -> bool:
+    ''' Igualdad estructural iterativa, equivalente a comparar las representaciones'''
+    pending = [(a, b)]
+    while pending:
+        a, b = pending.pop()
+        if a is b:
+            continue
+        if a._hash is not None and b._hash is not None and a._hash != b._hash:
+            return False
+        if a.tag is Tags.ExprString or b.tag is Tags.ExprString:
+            if a.tag is b.tag:
+                if a.value != b.value:
+                    return False
+            else:
+                # Un string es igual a la cadena de Cons que denota.
+                pending.append((a.cons() if a.tag is Tags.ExprString else a,
+                                b.cons() if b.tag is Tags.ExprString else b))
+            continue
+        if a.tag != b.tag:
+            return False
+        parts_a, parts_b = a._parts(), b._parts()
+        if len(parts_a) != len(parts_b):
+            return False
+        for x, y in zip(parts_a, parts_b):
+            if isinstance(x, AstNode) and isinstance(y, AstNode):
+                pending.append((x, y))
+            elif x != y:
+                return False
+    return True
+
+
+class AstGenericNode(AstNode):
+    ''' Representa un nodo genérico del AST, con una cantidad >=0 de nodos hijos en children'''
+    __slots__ = ('children',)
+
+    def __init__(self, tag: Tags, children: Sequence[AstNode]):
+        AstNode.__init__(self, tag)
+        self.children: list[AstNode] = children
+
+    def _parts(self) -> tuple:
+        return tuple(self.children)
+
+    def appendChild(self, child: AstNode) -> AstNode:
+        self.children.append(child)
+        return self
+
+    def _output(self) -> NodeOutput:
+        return [self.tag, *self.children]
 
 
-class AstNodeCollection(AstNode):
+class AstNodeCollection(AstGenericNode):
     ''' Representa un nodo del AST que contiene una cantidad >=0 de nodos hijos y cuya representación no contiene un tag'''
+    __slots__ = ()
 
     def __init__(self, name: str, nodes: Sequence[AstNode]):
-        AstNode.__init__(self, name, nodes)
+        AstGenericNode.__init__(self, name, nodes)
 
     def _output(self) -> NodeOutput:
-        return self._childrenOutput() if self.children else []
+        return list(self.children)
 
 
 class AstLeaf(AstNode):
     '''Representa una hoja del AST'''
+    __slots__ = ('value',)
 
     def __init__(self, name: str, value):
-        AstNode.__init__(self, name, None)
+        AstNode.__init__(self, name)
         self.value = value
 
+    def _parts(self) -> tuple:
+        return (self.value,)
+
     def _output(self) -> NodeOutput:
         return self.value
 
@@ -110,77 +200,155 @@ class AstLeaf(AstNode):
 
 
 class Id(AstLeaf):
+    __slots__ = ()
+
     def __init__(self, value: str):
         AstLeaf.__init__(self, 'Id', value)
 
 # region Literales
 
 class ExprLiteral(AstLeaf):
+    __slots__ = ()
+
     def __init__(self, name, value):
-        AstLeaf.__init__(self, name, value)
+        self.tag = name
+        self.value = value
+        self._hash = hash((_tag_hash.get(name, name), value))
 
     def _output(self):
         return [self.tag, self.value]
 
 class ExprNumber(ExprLiteral):
+    __slots__ = ()
+
     def __init__(self, value: int):
-        ExprLiteral.__init__(self, Tags.ExprNumber, value)
+        self.tag = Tags.ExprNumber
+        self.value = value
+        self._hash = hash((_NUMBER, value))
 
 
 class ExprChar(ExprLiteral):
+    __slots__ = ()
+
     def __init__(self, char: str):
-        ExprLiteral.__init__(self, Tags.ExprChar, ord(char))
+        self.tag = Tags.ExprChar
+        self.value = ord(char)
+        self._hash = hash((_CHAR, self.value))
+
+
+class ExprString(ExprLiteral):
+    ''' Literal string empaquetado. Su representación es la misma que la de la cadena de
+    aplicaciones de Cons que denota (ver build_string)'''
+    __slots__ = ()
+
+    def __init__(self, txt: str):
+        self.tag = Tags.ExprString
+        self.value = txt
+        # El mismo hash que la cadena de Cons equivalente.
+        h = _NIL_HASH
+        for c in reversed(txt):
+            h = hash((_APPLY, hash((_APPLY, _CONS_HASH, hash((_CHAR, ord(c))))), h))
+        self._hash = h
+
+    def cons(self) -> 'Expression':
+        ''' La primera celda del string: Nil o Cons aplicado al primer caracter y al resto'''
+        if not self.value:
+            return ExprConstructor('Nil')
+        return ExprApply(ExprApply(ExprConstructor('Cons'), ExprChar(self.value[0])), ExprString(self.value[1:]))
 
+    def _output(self):
+        return RawJson(''.join(_CONS_JSON.format(ord(c)) for c in self.value) + _NIL_JSON + ']' * len(self.value))
 
 # endregion
 
 
 class ExprVar(AstNode):
+    __slots__ = ('name',)
+
     def __init__(self, id: str):
-        AstNode.__init__(self, Tags.ExprVar, [Id(id)])
+        self.tag = Tags.ExprVar
+        self.name = id
+        self._hash = hash((_VAR, id))
 
     def id(self):
-        return self.children[0].value
+        return self.name
+
+    def _parts(self) -> tuple:
+        return (self.name,)
+
+    def _output(self):
+        return [self.tag, self.name]
 
 
 class ExprConstructor(AstNode):
+    __slots__ = ('name',)
+
     def __init__(self, id: str):
-        AstNode.__init__(self, Tags.ExprConstructor, [Id(id)])
+        self.tag = Tags.ExprConstructor
+        self.name = id
+        self._hash = hash((_CONSTRUCTOR, id))
     
     def id(self):
-        return self.children[0].value
+        return self.name
+
+    def _parts(self) -> tuple:
+        return (self.name,)
+
+    def _output(self):
+        return [self.tag, self.name]
 
 
 class ExprCase(AstNode):
+    __slots__ = ('_expr', '_branches')
+
     def __init__(self, expr: 'Expression', branches: 'CaseBranches'):
-        AstNode.__init__(self, Tags.ExprCase, [expr] + branches.children)
+        self.tag = Tags.ExprCase
+        self._expr = expr
+        self._branches: tuple[CaseBranch, ...] = tuple(branches.children)
+        self._hash = hash((_CASE, expr._hash, *(b._hash for b in self._branches)))
         
     def expr(self):
-        return self.children[0]
+        return self._expr
+
+    def _parts(self) -> tuple:
+        return (self._expr, *self._branches)
 
     def _output(self):
-        return [self.tag, self.expr()._output(),[c._output() for c in self.children[1:]]]
+        return [self.tag, self._expr, list(self._branches)]
        
     def branches(self):
-        return self.children[1:]
+        return self._branches
 
 class CaseBranch(AstNode):
-    def __init__(self, id: str, params: Sequence[str], expr: 'Expression'):
-        _params = [Id(p) for p in params]
-        AstNode.__init__(self, Tags.CaseBranch, [
-                         Id(id), CaseBranchParams(_params), expr])
+    __slots__ = ('_id', '_params', '_expr', 'line', 'slots')
+
+    def __init__(self, id: str, params: Sequence[str], expr: 'Expression', line: int | None = None):
+        self.tag = Tags.CaseBranch
+        self._id = id
+        self._params: tuple[str, ...] = tuple(params)
+        self._expr = expr
+        self.line = line
+        self._hash = hash((_BRANCH, id, self._params, expr._hash))
 
     def id(self):
-        return self.children[0].value
+        return self._id
     
-    def params(self) -> list[str]:
-        return [ p.value for p in self.children[1].children ]
+    def params(self) -> tuple[str, ...]:
+        return self._params
 
     def expr(self):
-        return self.children[2]
+        return self._expr
+
+    def _parts(self) -> tuple:
+        return (self._id, self._params, self._expr)
+
+    def _output(self):
+        return [self.tag, self._id, list(self._params), self._expr]
 
 
 class CaseBranches(AstNodeCollection):
+    __slots__ = ()
+
     def __init__(self, branches: Sequence[CaseBranch]):
         AstNodeCollection.__init__(self, None, branches)
 
@@ -189,6 +357,8 @@ class CaseBranches(AstNodeCollection):
 
 
 class CaseBranchParams(AstNodeCollection):
+    __slots__ = ()
+
     def __init__(self, params: Sequence[Id]):
         AstNodeCollection.__init__(self, None, params)
 
@@ -197,79 +367,289 @@ n: Sequence[AstNode] = [AstLeaf('', 1)]
 
 
 class ExprLet(AstNode):
+    __slots__ = ('_param', '_arg', '_in', 'slot')
+
     def __init__(self, id: str, letExpr: 'Expression', inExpr: 'Expression'):
-        AstNode.__init__(self, Tags.ExprLet, [Id(id), letExpr, inExpr])
+        self.tag = Tags.ExprLet
+        self._param = id
+        self._arg = letExpr
+        self._in = inExpr
+        self._hash = hash((_LET, id, letExpr._hash, inExpr._hash))
 
     def param(self):
-        return self.children[0].value
+        return self._param
 
     def argExpr(self):
-        return self.children[1]
+        return self._arg
     
     def inExpr(self):
-        return self.children[2]
+        return self._in
+
+    def _parts(self) -> tuple:
+        return (self._param, self._arg, self._in)
+
+    def _output(self):
+        return [self.tag, self._param, self._arg, self._in]
 
 
 class ExprLambda(AstNode):
-    def __init__(self, id: str, expr: 'Expression'):
-        AstNode.__init__(self, Tags.ExprLambda, [Id(id), expr])
+    __slots__ = ('_param', '_body', 'line', 'size')
+
+    def __init__(self, id: str, expr: 'Expression', line: int | None = None):
+        self.tag = Tags.ExprLambda
+        self._param = id
+        self._body = expr
+        self.line = line
+        self._hash = hash((_LAMBDA, id, expr._hash))
     
     def param(self):
-        return self.children[0].value
+        return self._param
 
     def body(self):
-        return self.children[1]
+        return self._body
+
+    def _parts(self) -> tuple:
+        return (self._param, self._body)
+
+    def _output(self):
+        return [self.tag, self._param, self._body]
 
 
 class ExprApply(AstNode):
+    __slots__ = ('_fn', '_arg')
+
     def __init__(self, fn: 'Expression', arg: 'Expression'):
-        AstNode.__init__(self, Tags.ExprApply, [fn, arg])
+        self.tag = Tags.ExprApply
+        self._fn = fn
+        self._arg = arg
+        self._hash = hash((_APPLY, fn._hash, arg._hash))
 
     def fn(self):
-        return self.children[0]
+        return self._fn
 
     def arg(self):
-        return self.children[1]
+        return self._arg
+
+    def _parts(self) -> tuple:
+        return (self._fn, self._arg)
+
+    def _output(self):
+        return [self.tag, self._fn, self._arg]
 
 
-Expression = ExprNumber | ExprApply | ExprCase | ExprChar | ExprConstructor | ExprLambda | ExprLet | ExprVar
+class ExprPrimitive(AstNode):
+    ''' Aplicación saturada de un operador o de unsafePrint* a sus argumentos (ver flecha.rewrite)'''
+    __slots__ = ('_op', '_args')
+
+    def __init__(self, op: str, args: Sequence['Expression']):
+        self.tag = Tags.ExprPrimitive
+        self._op = op
+        self._args: tuple[Expression, ...] = tuple(args)
+        self._hash = hash((_PRIMITIVE, op, *(a._hash for a in self._args)))
+
+    def op(self):
+        return self._op
+
+    def args(self):
+        return self._args
+
+    def _parts(self) -> tuple:
+        return (self._op, *self._args)
+
+    def _output(self):
+        return [self.tag, self._op, *self._args]
+
+
+class ExprStruct(AstNode):
+    ''' Aplicación saturada de un constructor a sus argumentos (ver flecha.rewrite)'''
+    __slots__ = ('name', '_args')
+
+    def __init__(self, id: str, args: Sequence['Expression']):
+        self.tag = Tags.ExprStruct
+        self.name = id
+        self._args: tuple[Expression, ...] = tuple(args)
+        self._hash = hash((_STRUCT, id, *(a._hash for a in self._args)))
+
+    def id(self):
+        return self.name
+
+    def args(self):
+        return self._args
+
+    def _parts(self) -> tuple:
+        return (self.name, *self._args)
+
+    def _output(self):
+        return [self.tag, self.name, *self._args]
+
+
+class ExprMemo(AstNode):
+    ''' Cuerpo de una función global cuyos resultados se memorizan según el valor de sus
+    parámetros (ver flecha.memo)'''
+    __slots__ = ('name', '_params', '_body', 'addresses')
+
+    def __init__(self, id: str, params: Sequence[str], body: 'Expression'):
+        self.tag = Tags.ExprMemo
+        self.name = id
+        self._params: tuple[str, ...] = tuple(params)
+        self._body = body
+        self._hash = hash((_MEMO, id, self._params, body._hash))
+
+    def id(self):
+        return self.name
+
+    def params(self):
+        return self._params
+
+    def body(self):
+        return self._body
+
+    def _parts(self) -> tuple:
+        return (self.name, self._params, self._body)
+
+    def _output(self):
+        return [self.tag, self.name, list(self._params), self._body]
+
+
+class ExprLocal(AstNode):
+    ''' Variable local resuelta a su dirección (profundidad, slot) en los frames (ver flecha.resolver)'''
+    __slots__ = ('name', 'depth', 'slot')
+
+    def __init__(self, id: str, depth: int, slot: int):
+        self.tag = Tags.ExprLocal
+        self.name = id
+        self.depth = depth
+        self.slot = slot
+        self._hash = hash((_LOCAL, id, depth, slot))
+
+    def id(self):
+        return self.name
+
+    def _parts(self) -> tuple:
+        return (self.name, self.depth, self.slot)
+
+    def _output(self):
+        return [self.tag, self.name, self.depth, self.slot]
+
+
+_NUMBER, _CHAR, _VAR, _CONSTRUCTOR, _CASE, _BRANCH, _LET, _LAMBDA, _APPLY, _DEF, _PRIMITIVE, _STRUCT, _MEMO, _LOCAL = (
+    _tag_hash[t] for t in (Tags.ExprNumber, Tags.ExprChar, Tags.ExprVar, Tags.ExprConstructor, Tags.ExprCase,
+                           Tags.CaseBranch, Tags.ExprLet, Tags.ExprLambda, Tags.ExprApply, Tags.Definition,
+                           Tags.ExprPrimitive, Tags.ExprStruct, Tags.ExprMemo, Tags.ExprLocal))
+_NIL_HASH, _CONS_HASH = ExprConstructor('Nil')._hash, ExprConstructor('Cons')._hash
+
+
+Expression = (ExprNumber | ExprApply | ExprCase | ExprChar | ExprString | ExprConstructor | ExprLambda | ExprLet | ExprVar
+              | ExprPrimitive | ExprStruct | ExprLocal)
+
+# Los nodos son inmutables: todas las apariciones de un operador comparten su ExprVar.
+_binary_operator_vars = {op: ExprVar(name) for op, name in binary_operators.items()}
+_unary_operator_vars = {op: ExprVar(name) for op, name in unary_operators.items()}
 
 def build_binary_expression(expr1: Expression, op:str, expr2: Expression):
-    return ExprApply(ExprApply(ExprVar(binary_operators[op]),expr1), expr2)
+    return ExprApply(ExprApply(_binary_operator_vars[op],expr1), expr2)
 
 def build_unary_expression(op:str, expr: Expression):
-    return ExprApply(ExprVar(unary_operators[op]),expr)
+    return ExprApply(_unary_operator_vars[op],expr)
 
-def build_lambda(params: list[str], exp: Expression) -> Expression:
-    return ExprLambda(params[0], build_lambda(params[1:], exp)) if params else exp
+def build_lambda(params: list[str], exp: Expression, line: int | None = None) -> Expression:
+    for p in reversed(params):
+        exp = ExprLambda(p, exp, line)
+    return exp
 
 
-def build_if(exp: any, t_exp: any, f_exp: any):
-    return ExprCase(exp, CaseBranches([CaseBranch('True', [], t_exp), f_exp]))
+def build_if(exp: any, t_exp: any, f_exp: any, line: int | None = None):
+    return ExprCase(exp, CaseBranches([CaseBranch('True', [], t_exp, line), f_exp]))
 
 
 def build_string(txt) -> Expression:
-    return ExprApply(ExprApply(ExprConstructor('Cons'), ExprChar(txt[0])), build_string(txt[1:])) if txt else ExprConstructor('Nil')
+    return ExprString(txt)
 
 
 class Definition(AstNode):
-    def __init__(self, id: str, expr: Expression):
-        AstNode.__init__(self, Tags.Definition, [Id(id), expr])
+    __slots__ = ('_id', '_expr', 'line', 'size')
+
+    def __init__(self, id: str, expr: Expression, line: int | None = None):
+        self.tag = Tags.Definition
+        self._id = id
+        self._expr = expr
+        self.line = line
+        self._hash = hash((_DEF, id, expr._hash))
 
     def id(self):
-        return self.children[0].value
+        return self._id
     
     def expr(self):
-        return self.children[1]
+        return self._expr
+
+    def _parts(self) -> tuple:
+        return (self._id, self._expr)
+
+    def _output(self):
+        return [self.tag, self._id, self._expr]
 
 
 class Program(AstNodeCollection):
+    __slots__ = ()
+
     def __init__(self, *args: Definition):
-        AstNode.__init__(self, Tags.Program, [args[0]] if args else [])
+        AstNodeCollection.__init__(self, Tags.Program, [args[0]] if args else [])
 
     def append(self, definition: Definition):
-        AstNode.appendChild(self, definition)
+        self.appendChild(definition)
         return self
 
     def definitions(self):
         return self.children
+
+
+# region Serialización JSON
+class RawJson(str):
+    ''' Fragmento de JSON ya serializado dentro de una plantilla'''
+    __slots__ = ()
+
+
+_tag_json = {tag: encode_basestring_ascii(tag.value) for tag in Tags}
+_CONS_JSON = '["ExprApply",["ExprApply",["ExprConstructor","Cons"],["ExprChar",{}]],'
+_NIL_JSON = '["ExprConstructor","Nil"]'
+_CLOSE, _COMMA = RawJson(']'), RawJson(',')
+
+
+def iter_json(root: AstNode) -> Iterator[str]:
+    ''' Genera la representación JSON compacta de root (la misma que json.dumps con jsonConfig)
+    en fragmentos, recorriendo el AST con una pila explícita en lugar de recursión'''
+    pending: list = [root]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, AstNode):
+            item = item._output()
+        t = type(item)
+        if t is RawJson:
+            yield item
+        elif t is list or t is tuple:
+            yield '['
+            pending.append(_CLOSE)
+            for i in range(len(item) - 1, -1, -1):
+                pending.append(item[i])
+                if i:
+                    pending.append(_COMMA)
+        elif t is str:
+            yield encode_basestring_ascii(item)
+        elif t is int:
+            yield int.__repr__(item)
+        elif t is Tags:
+            yield _tag_json[item]
+        else:
+            yield json.dumps(item, **jsonConfig)
+
+
+def dump(root: AstNode, out: TextIO, batch: int = 8192):
+    ''' Escribe la representación JSON de root en out a medida que se genera, de a batch fragmentos'''
+    chunks = []
+    for chunk in iter_json(root):
+        chunks.append(chunk)
+        if len(chunks) == batch:
+            out.write(''.join(chunks))
+            chunks.clear()
+    out.write(''.join(chunks))
+# endregion
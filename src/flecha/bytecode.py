@@ -0,0 +1,294 @@
+from array import array
+from enum import IntEnum
+from typing import Callable
+from flecha.ast import *
+from flecha.interpreter import Primitives, StringValue, char_value
+from flecha.primitives import *
+from flecha.resolver import Scope
+
+# Los slots de LOAD_DEREF ocupan los 16 bits bajos del operando.
+DEREF_SLOTS = 1 << 16
+
+
+class Op(IntEnum):
+    ''' Códigos de instrucción. Cada instrucción ocupa dos enteros: código y operando'''
+    LOAD_LOCAL = 0      # frame[slot]
+    LOAD_DEREF = 1      # frame de `depth` niveles más afuera: operando = depth << 16 | slot
+    LOAD_GLOBAL = 2     # consts[i] es el nombre de la definición
+    LOAD_CONST = 3      # consts[i] es un valor ya construido
+    STORE_LOCAL = 4     # frame[slot] = pop()
+    MAKE_CLOSURE = 5    # consts[i] es el Block del cuerpo de la lambda
+    MAKE_STRUCT = 6     # consts[i] es (constructor, aridad)
+    CALL = 7            # pop() closure, pop() argumento
+    TAIL_CALL = 8       # como CALL pero sin guardar la dirección de retorno
+    RETURN = 9
+    CASE = 10           # consts[i] es la tabla de ramas: pop() valor y saltar a la rama
+    JUMP = 11           # pc = operando
+    AND_JUMP = 12       # si pop() es False apila False y salta, si no sigue
+    OR_JUMP = 13        # si pop() es True apila True y salta, si no sigue
+    TO_BOOL = 14        # verifica que el tope sea booleano
+    ADD = 15
+    SUB = 16
+    MUL = 17
+    DIV = 18
+    MOD = 19
+    EQ = 20
+    NE = 21
+    GE = 22
+    LE = 23
+    GT = 24
+    LT = 25
+    NOT = 26
+    UMINUS = 27
+    PRINT_INT = 28
+    PRINT_CHAR = 29
+
+
+_binary_instructions = {op: Op[op] for op in list(relational_ops) + list(arithmetic_ops)}
+
+_unary_instructions = {
+    Primitives.UNSAFE_PRINT_INT.value: Op.PRINT_INT,
+    Primitives.UNSAFE_PRINT_CHAR.value: Op.PRINT_CHAR,
+    UnaryOperators.NOT.value: Op.NOT,
+    UnaryOperators.UMINUS.value: Op.UMINUS,
+}
+
+
+class Block:
+    ''' Código de una función (lambda o definición) y el tamaño de su frame'''
+
+    def __init__(self, name: str):
+        self.name = name
+        self.code = array('i')
+        self.frame_size = 0
+        self.padding: list = []
+
+    def emit(self, op: Op, arg: int = 0) -> int:
+        self.code.extend((op, arg))
+        return len(self.code) - 2
+
+    def patch(self, at: int, target: int):
+        self.code[at + 1] = target
+
+    def here(self) -> int:
+        return len(self.code)
+
+
+class CaseTable:
+    ''' Tabla de saltos de un case: (constructor, aridad) o nombre de tipo -> (pc, slots)'''
+
+    def __init__(self):
+        self.branches: dict[tuple[str, int] | str, tuple[int, tuple[int, ...]]] = {}
+
+    def add(self, id: str, slots: tuple[int, ...], pc: int):
+        self.branches.setdefault((id, len(slots)), (pc, slots))
+        self.branches.setdefault(id, (pc, ()))
+
+    def __repr__(self):
+        return ' '.join(f'{id}/{len(slots)}->{pc}' for id, (pc, slots) in self.branches.items() if type(id) is str)
+
+
+class BytecodeProgram:
+    def __init__(self):
+        self.consts: list = []
+        self.definitions: list[tuple[str, Block]] = []
+        self._const_index: dict = {}
+
+    def const(self, value, key=None) -> int:
+        ''' Agrega un valor a la tabla de operandos; los valores con la misma clave se comparten'''
+        if key is not None and key in self._const_index:
+            return self._const_index[key]
+        self.consts.append(value)
+        if key is not None:
+            self._const_index[key] = len(self.consts) - 1
+        return len(self.consts) - 1
+
+
+class BytecodeCompiler:
+    ''' Compila un Program a bytecode: un array de enteros por función más una tabla de operandos'''
+
+    def __init__(self):
+        self._program = BytecodeProgram()
+        self._compile_map: dict[Tags, Callable[[AstNode, Block, Scope, bool], None]] = {
+            Tags.ExprVar: self.compile_var,
+            Tags.ExprNumber: self.compile_number,
+            Tags.ExprChar: self.compile_char,
+            Tags.ExprConstructor: self.compile_constructor,
+            Tags.ExprString: self.compile_string,
+            Tags.ExprLambda: self.compile_lambda,
+            Tags.ExprApply: self.compile_apply,
+            Tags.ExprPrimitive: self.compile_apply,
+            Tags.ExprStruct: self.compile_apply,
+            Tags.ExprLet: self.compile_let,
+            Tags.ExprCase: self.compile_case
+        }
+
+    def compile_program(self, ast: Program) -> BytecodeProgram:
+        for d in ast.definitions():
+            scope = Scope()
+            block = Block(d.id())
+            self.compile(d.expr(), block, scope, True)
+            self.finish(block, scope)
+            self._program.definitions.append((d.id(), block))
+        return self._program
+
+    def finish(self, block: Block, scope: Scope):
+        block.frame_size = scope.layout.size
+        block.padding = [None] * (block.frame_size - 2)
+
+    def compile(self, ast: AstNode, block: Block, scope: Scope, tail: bool = False):
+        ''' Emite el código que deja el valor de ast en la pila; en posición de cola además retorna'''
+        if ast.tag not in self._compile_map:
+            raise RuntimeError(f"No se pudo evaluar la expresión {ast}")
+        self._compile_map[ast.tag](ast, block, scope, tail)
+
+    def emit_result(self, block: Block, tail: bool):
+        if tail:
+            block.emit(Op.RETURN)
+
+    def compile_var(self, ast: ExprVar, block: Block, scope: Scope, tail: bool):
+        address = scope.address(ast.id())
+        if address is None:
+            block.emit(Op.LOAD_GLOBAL, self._program.const(ast.id(), ('global', ast.id())))
+        elif address[0] == 0:
+            block.emit(Op.LOAD_LOCAL, address[1])
+        else:
+            if address[1] >= DEREF_SLOTS:
+                raise RuntimeError(f"Demasiadas variables en el entorno de '{ast.id()}': el slot {address[1]} no entra en LOAD_DEREF")
+            block.emit(Op.LOAD_DEREF, address[0] << 16 | address[1])
+        self.emit_result(block, tail)
+
+    def compile_number(self, ast: ExprNumber, block: Block, scope: Scope, tail: bool):
+        block.emit(Op.LOAD_CONST, self._program.const(ast.value, ('int', ast.value)))
+        self.emit_result(block, tail)
+
+    def compile_char(self, ast: ExprChar, block: Block, scope: Scope, tail: bool):
+        block.emit(Op.LOAD_CONST, self._program.const(char_value(ast.value), ('char', ast.value)))
+        self.emit_result(block, tail)
+
+    def compile_constructor(self, ast: ExprConstructor, block: Block, scope: Scope, tail: bool):
+        block.emit(Op.MAKE_STRUCT, self._program.const((ast.id(), 0), ('struct', ast.id(), 0)))
+        self.emit_result(block, tail)
+
+    def compile_string(self, ast: ExprString, block: Block, scope: Scope, tail: bool):
+        block.emit(Op.LOAD_CONST, self._program.const(StringValue(ast.value), ('string', ast.value)))
+        self.emit_result(block, tail)
+
+    def compile_lambda(self, ast: ExprLambda, block: Block, scope: Scope, tail: bool):
+        body_scope = scope.function(ast.param())
+        body = Block(f'{block.name}/{ast.param()}')
+        self.compile(ast.body(), body, body_scope, True)
+        self.finish(body, body_scope)
+        block.emit(Op.MAKE_CLOSURE, self._program.const(body))
+        self.emit_result(block, tail)
+
+    def compile_let(self, ast: ExprLet, block: Block, scope: Scope, tail: bool):
+        self.compile(ast.argExpr(), block, scope)
+        body_scope = scope.bind(ast.param())
+        block.emit(Op.STORE_LOCAL, body_scope.slot(ast.param()))
+        self.compile(ast.inExpr(), block, body_scope, tail)
+
+    def compile_case(self, ast: ExprCase, block: Block, scope: Scope, tail: bool):
+        self.compile(ast.expr(), block, scope)
+        table = CaseTable()
+        block.emit(Op.CASE, self._program.const(table))
+        exits = []
+        for b in ast.branches():
+            branch_scope, slots = scope, []
+            for p in b.params():
+                branch_scope = branch_scope.bind(p)
+                slots.append(branch_scope.slot(p))
+            table.add(b.id(), tuple(slots), block.here())
+            self.compile(b.expr(), block, branch_scope, tail)
+            if not tail:
+                exits.append(block.emit(Op.JUMP))
+        for at in exits:
+            block.patch(at, block.here())
+
+    def compile_apply(self, ast: ExprApply, block: Block, scope: Scope, tail: bool):
+        kind, *parts = classify_apply(ast)
+        match kind:
+            case ApplyKind.Unary:
+                op, exp = parts
+                self.compile(exp, block, scope)
+                block.emit(_unary_instructions[op])
+            case ApplyKind.Binary:
+                self.compile_binary_op(*parts, block, scope)
+            case ApplyKind.Struct:
+                self.compile_struct(ast, block, scope)
+            case ApplyKind.Call:
+                fn, arg = parts
+                self.compile(arg, block, scope)
+                self.compile(fn, block, scope)
+                block.emit(Op.TAIL_CALL if tail else Op.CALL)
+                return
+        self.emit_result(block, tail)
+
+    def compile_struct(self, ast: ExprApply, block: Block, scope: Scope):
+        # La cola de listas y strings se anida en el último argumento: se emite iterativamente.
+        pending = []
+        while ast.tag in application_tags:
+            kind, *parts = classify_apply(ast)
+            if kind != ApplyKind.Struct:
+                break
+            ctor, args = parts
+            for a in args[:-1]:
+                self.compile(a, block, scope)
+            pending.append((ctor, len(args)))
+            ast = args[-1]
+        self.compile(ast, block, scope)
+        for ctor, arity in reversed(pending):
+            block.emit(Op.MAKE_STRUCT, self._program.const((ctor, arity), ('struct', ctor, arity)))
+
+    def compile_binary_op(self, op: str, left: AstNode, right: AstNode, block: Block, scope: Scope):
+        self.compile(left, block, scope)
+        if op in (BinaryOperators.AND.value, BinaryOperators.OR.value):
+            at = block.emit(Op.AND_JUMP if op == BinaryOperators.AND.value else Op.OR_JUMP)
+            self.compile(right, block, scope)
+            block.emit(Op.TO_BOOL)
+            block.patch(at, block.here())
+            return
+        if op not in _binary_instructions:
+            raise RuntimeError(f"Operación no reconocida: {op}")
+        self.compile(right, block, scope)
+        block.emit(_binary_instructions[op])
+
+
+# region Desensamblador
+_jump_ops = (Op.JUMP, Op.AND_JUMP, Op.OR_JUMP)
+_const_ops = (Op.LOAD_GLOBAL, Op.LOAD_CONST, Op.MAKE_CLOSURE, Op.MAKE_STRUCT, Op.CASE)
+
+
+def disassemble(program: BytecodeProgram) -> str:
+    blocks = [block for _, block in program.definitions]
+    lines = []
+    seen = set()
+    while blocks:
+        block = blocks.pop(0)
+        if id(block) in seen:
+            continue
+        seen.add(id(block))
+        lines.append(f'{block.name}: (frame {block.frame_size})')
+        for pc in range(0, len(block.code), 2):
+            op, arg = Op(block.code[pc]), block.code[pc + 1]
+            lines.append(f'  {pc:>5}  {op.name:<13}{_operand(program, op, arg, blocks)}')
+    return '\n'.join(lines)
+
+
+def _operand(program: BytecodeProgram, op: Op, arg: int, blocks: list[Block]) -> str:
+    if op in _const_ops:
+        const = program.consts[arg]
+        if op == Op.MAKE_CLOSURE:
+            blocks.append(const)
+            return f'{arg} ({const.name})'
+        if op == Op.MAKE_STRUCT:
+            return f'{arg} ({const[0]}/{const[1]})'
+        if isinstance(const, StringValue):
+            return f'{arg} ({json.dumps(const.text, ensure_ascii=False)})'
+        return f'{arg} ({const})'
+    if op == Op.LOAD_DEREF:
+        return f'{arg >> 16},{arg & 0xFFFF}'
+    if op in _jump_ops or op in (Op.LOAD_LOCAL, Op.STORE_LOCAL):
+        return f'{arg}'
+    return ''
+# endregion
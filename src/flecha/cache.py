@@ -0,0 +1,145 @@
+import hashlib
+import marshal
+import mmap
+import os
+from typing import Callable
+from flecha.ast import *
+from flecha.parser import ParseResult
+
+# Cambiar la versión invalida todas las entradas existentes (por ejemplo al modificar
+# la gramática, el AST o la codificación de abajo).
+CACHE_VERSION = '3'
+MAGIC = b'FLC' + CACHE_VERSION.encode() + b'\0'
+
+# region Codificación
+# El programa se codifica como una tupla plana en orden posfijo: primero los hijos y
+# después el código del nodo con sus operandos. Así la codificación y la decodificación
+# son iterativas y no dependen de la profundidad del AST (por ejemplo strings largos).
+# Las definiciones, lambdas y ramas llevan además su línea en el fuente (o None).
+DEF, VAR, NUMBER, CHAR, CONSTRUCTOR, LAMBDA, APPLY, LET, CASE, STRING = range(10)
+
+
+def encode(program: Program) -> tuple:
+    out = []
+    for d in program.definitions():
+        _encode_expr(d.expr(), out)
+        out += [DEF, d.id(), d.line]
+    return tuple(out)
+
+
+def _encode_expr(root: AstNode, out: list):
+    pending = [(root, False)]
+    while pending:
+        node, visited = pending.pop()
+        tag = node.tag
+        if tag == Tags.ExprVar: out += [VAR, node.id()]
+        elif tag == Tags.ExprNumber: out += [NUMBER, node.value]
+        elif tag == Tags.ExprChar: out += [CHAR, node.value]
+        elif tag == Tags.ExprConstructor: out += [CONSTRUCTOR, node.id()]
+        elif tag == Tags.ExprString: out += [STRING, node.value]
+        elif visited:
+            if tag == Tags.ExprLambda: out += [LAMBDA, node.param(), node.line]
+            elif tag == Tags.ExprApply: out += [APPLY]
+            elif tag == Tags.ExprLet: out += [LET, node.param()]
+            elif tag == Tags.ExprCase:
+                out += [CASE, len(node.branches())]
+                for b in node.branches():
+                    out += [b.id(), b.line, len(b.params()), *b.params()]
+        else:
+            pending.append((node, True))
+            pending.extend(reversed(_children(node)))
+    return out
+
+
+def _children(node: AstNode) -> list[tuple[AstNode, bool]]:
+    if node.tag == Tags.ExprLambda: children = [node.body()]
+    elif node.tag == Tags.ExprApply: children = [node.fn(), node.arg()]
+    elif node.tag == Tags.ExprLet: children = [node.argExpr(), node.inExpr()]
+    elif node.tag == Tags.ExprCase: children = [node.expr()] + [b.expr() for b in node.branches()]
+    else: raise RuntimeError(f"No se puede codificar la expresión {node}")
+    return [(c, False) for c in children]
+
+
+def decode(data: tuple) -> Program:
+    program = Program()
+    stack = []
+    i = 0
+    while i < len(data):
+        op = data[i]
+        if op == VAR: stack.append(ExprVar(data[i + 1])); i += 2
+        elif op == NUMBER: stack.append(ExprNumber(data[i + 1])); i += 2
+        elif op == CHAR: stack.append(ExprChar(chr(data[i + 1]))); i += 2
+        elif op == CONSTRUCTOR: stack.append(ExprConstructor(data[i + 1])); i += 2
+        elif op == STRING: stack.append(ExprString(data[i + 1])); i += 2
+        elif op == APPLY:
+            arg = stack.pop()
+            stack.append(ExprApply(stack.pop(), arg)); i += 1
+        elif op == LAMBDA: stack.append(ExprLambda(data[i + 1], stack.pop(), data[i + 2])); i += 3
+        elif op == LET:
+            body = stack.pop()
+            stack.append(ExprLet(data[i + 1], stack.pop(), body)); i += 2
+        elif op == CASE:
+            count, i = data[i + 1], i + 2
+            bodies = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            branches = CaseBranches([])
+            for body in bodies:
+                id, line, arity = data[i], data[i + 1], data[i + 2]
+                branches.append(CaseBranch(id, list(data[i + 3:i + 3 + arity]), body, line))
+                i += 3 + arity
+            stack.append(ExprCase(stack.pop(), branches))
+        elif op == DEF:
+            program.append(Definition(data[i + 1], stack.pop(), data[i + 2])); i += 3
+        else:
+            raise ValueError(f'Código de nodo inválido: {op}')
+    return program
+# endregion
+
+
+class ProgramCache:
+    ''' Cache en disco de programas parseados, indexada por el hash del fuente y la versión de la cache.
+
+    Cada entrada es un archivo con MAGIC seguido del programa codificado con marshal;
+    se lee mapeando el archivo en memoria. Las entradas ilegibles o de otra versión
+    se ignoran y se vuelven a generar.'''
+
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def key(self, source: str) -> str:
+        return hashlib.sha256(MAGIC + source.encode('utf-8')).hexdigest()
+
+    def path(self, source: str) -> str:
+        return os.path.join(self._directory, self.key(source) + '.flc')
+
+    def load(self, source: str) -> Program | None:
+        try:
+            with open(self.path(source), 'rb') as file, \
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                    memoryview(mapped) as view:
+                if view[:len(MAGIC)] != MAGIC:
+                    return None
+                with view[len(MAGIC):] as data:
+                    return decode(marshal.loads(data))
+        except (OSError, ValueError, EOFError, TypeError, IndexError):
+            return None
+
+    def store(self, source: str, program: Program):
+        os.makedirs(self._directory, exist_ok=True)
+        path = self.path(source)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as file:
+            file.write(MAGIC)
+            file.write(marshal.dumps(encode(program)))
+        os.replace(tmp, path)
+
+    def parse(self, source: str, parse: Callable[[str], ParseResult]) -> ParseResult:
+        ''' Devuelve el programa de la cache o lo parsea con parse. Sólo se guardan los
+        programas sin errores, así que los errores se informan cada vez que se parsea.'''
+        program = self.load(source)
+        if program is not None:
+            return ParseResult(program, [])
+        result = parse(source)
+        if result.ok():
+            self.store(source, result.ast)
+        return result
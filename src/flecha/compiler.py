@@ -0,0 +1,205 @@
+from typing import Callable, TextIO
+from flecha.ast import *
+from flecha.interpreter import (FALSE, TRUE, VOID, ClosureValue, GlobalEnv, Primitives, StringValue, StructValue, Value,
+                                boolean_value, case_table, char_value, constructor_value, select_branch)
+from flecha.primitives import *
+from flecha.resolver import Frame, Scope, frame_getter, new_frame
+
+Code = Callable[[Frame], Value]
+
+
+class TailCall:
+    ''' Llamada pendiente devuelta por una aplicación en posición de cola;
+    la aplicación que invocó al cuerpo de la closure la continúa en un ciclo'''
+    __slots__ = ('closure', 'arg')
+
+    def __init__(self, closure: ClosureValue, arg: Value):
+        self.closure = closure
+        self.arg = arg
+
+class Compiler:
+    ''' Traduce un Program a un árbol de closures de Python.
+
+    La estructura del AST (tags, accesores, clasificación de primitivas) se
+    resuelve una única vez al compilar, de modo que evaluar un nodo es sólo
+    llamar a la closure correspondiente con el frame de la función actual.
+    Las variables locales se resuelven a una dirección (profundidad, slot)
+    con un Scope, así que ligar y buscar variables es O(1). Las aplicaciones
+    en posición de cola devuelven un TailCall en lugar de apilar frames de Python.'''
+
+    def __init__(self, output: TextIO) -> None:
+        self._global_env = GlobalEnv()
+        self._output = output
+        self._constructors: dict[str, StructValue] = {}
+        self._compile_map: dict[Tags, Callable[[AstNode, Scope, bool], Code]] = {
+            Tags.ExprVar: self.compile_var,
+            Tags.ExprNumber: self.compile_number,
+            Tags.ExprChar: self.compile_char,
+            Tags.ExprLambda: self.compile_lambda,
+            Tags.ExprApply: self.compile_apply,
+            Tags.ExprPrimitive: self.compile_apply,
+            Tags.ExprStruct: self.compile_apply,
+            Tags.ExprConstructor: self.compile_constructor,
+            Tags.ExprString: self.compile_string,
+            Tags.ExprLet: self.compile_let,
+            Tags.ExprCase: self.compile_case
+        }
+
+    def run(self, program: Program) -> Value:
+        return self.compile_program(program)()
+
+    def compile_program(self, ast: Program) -> Callable[[], Value]:
+        definitions = []
+        for d in ast.definitions():
+            scope = Scope()
+            definitions.append((d.id(), self.compile(d.expr(), scope), scope.layout))
+        global_env = self._global_env
+
+        def program():
+            for id, code, layout in definitions:
+                global_env.assign(id, code(new_frame(None, layout.size)))
+            return global_env.lookup('main')
+        return program
+
+    def compile(self, ast: AstNode, scope: Scope, tail: bool = False) -> Code:
+        if ast.tag in self._compile_map:
+            return self._compile_map[ast.tag](ast, scope, tail)
+        raise RuntimeError(f"No se pudo evaluar la expresión {ast}")
+
+    def compile_var(self, ast: ExprVar, scope: Scope, tail: bool) -> Code:
+        id = ast.id()
+        address = scope.address(id)
+        if address is not None:
+            return frame_getter(address)
+        lookup = self._global_env.lookup
+        return lambda env: lookup(id)
+
+    def compile_number(self, ast: ExprNumber, scope, tail) -> Code:
+        value = ast.value
+        return lambda env: value
+
+    def compile_char(self, ast: ExprChar, scope, tail) -> Code:
+        value = char_value(ast.value)
+        return lambda env: value
+
+    def compile_constructor(self, ast: ExprConstructor, scope, tail) -> Code:
+        value = constructor_value(ast.id(), self._constructors)
+        return lambda env: value
+
+    def compile_string(self, ast: ExprString, scope, tail) -> Code:
+        # Los strings son inmutables y construyen sus celdas a demanda: se comparte un único valor.
+        value = StringValue(ast.value)
+        return lambda env: value
+
+    def compile_lambda(self, ast: ExprLambda, scope: Scope, tail: bool) -> Code:
+        param = ast.param()
+        body_scope = scope.function(param)
+        body = self.compile(ast.body(), body_scope, True)
+        padding = [None] * (body_scope.layout.size - 2)
+        if padding:
+            enter = lambda parent, arg: body([parent, arg, *padding])
+        else:
+            enter = lambda parent, arg: body([parent, arg])
+        return lambda env: ClosureValue(param, enter, env)
+
+    def compile_let(self, ast: ExprLet, scope: Scope, tail: bool) -> Code:
+        arg = self.compile(ast.argExpr(), scope)
+        body_scope = scope.bind(ast.param())
+        slot = body_scope.slot(ast.param())
+        body = self.compile(ast.inExpr(), body_scope, tail)
+
+        def let(env):
+            env[slot] = arg(env)
+            return body(env)
+        return let
+
+    def compile_apply(self, ast: ExprApply, scope: Scope, tail: bool) -> Code:
+        kind, *parts = classify_apply(ast)
+        match kind:
+            case ApplyKind.Unary: return self.compile_unary_op(*parts, scope)
+            case ApplyKind.Binary: return self.compile_binary_op(*parts, scope)
+            case ApplyKind.Struct: return self.compile_struct(*parts, scope)
+        fn, arg = parts
+        arg_code = self.compile(arg, scope)
+        fn_code = self.compile(fn, scope)
+
+        if tail:
+            def tail_apply(env):
+                _arg = arg_code(env)
+                return TailCall(as_closure(fn_code(env)), _arg)
+            return tail_apply
+
+        def apply(env):
+            _arg = arg_code(env)
+            _cl = as_closure(fn_code(env))
+            result = _cl.body(_cl.env, _arg)
+            while type(result) is TailCall:
+                _cl = result.closure
+                result = _cl.body(_cl.env, result.arg)
+            return result
+        return apply
+
+    def compile_struct(self, ctor: str, args: list[AstNode], scope: Scope) -> Code:
+        codes = [self.compile(a, scope) for a in args]
+        return lambda env: StructValue(ctor, [c(env) for c in codes])
+
+    def compile_case(self, ast: ExprCase, scope: Scope, tail: bool) -> Code:
+        expr = self.compile(ast.expr(), scope)
+        table = case_table(self.compile_branch(b, scope, tail) for b in ast.branches())
+
+        def case(env):
+            val = expr(env)
+            slots, body = select_branch(table, val)
+            if slots:
+                for s, v in zip(slots, val.args):
+                    env[s] = v
+            return body(env)
+        return case
+
+    def compile_branch(self, ast: CaseBranch, scope: Scope, tail: bool) -> tuple[str, tuple[int, ...], Code]:
+        slots = []
+        for p in ast.params():
+            scope = scope.bind(p)
+            slots.append(scope.slot(p))
+        return (ast.id(), tuple(slots), self.compile(ast.expr(), scope, tail))
+
+# unary operations
+    def compile_unary_op(self, op: str, exp: AstNode, scope: Scope) -> Code:
+        operand = self.compile(exp, scope)
+        write = self._output.write
+        match op:
+            case Primitives.UNSAFE_PRINT_INT.value:
+                def print_int(env):
+                    write(str(as_number(operand(env))))
+                    return VOID
+                return print_int
+            case Primitives.UNSAFE_PRINT_CHAR.value:
+                def print_char(env):
+                    write(as_char(operand(env)))
+                    return VOID
+                return print_char
+            case UnaryOperators.NOT.value:
+                return lambda env: boolean_value(not as_boolean(operand(env)))
+            case UnaryOperators.UMINUS.value:
+                return lambda env: -as_number(operand(env))
+
+# binary operations
+    def compile_binary_op(self, op: str, left: AstNode, right: AstNode, scope: Scope) -> Code:
+        vL, vR = self.compile(left, scope), self.compile(right, scope)
+        if op == BinaryOperators.AND.value:
+            return lambda env: boolean_value(as_boolean(vL(env)) and as_boolean(vR(env)))
+        if op == BinaryOperators.OR.value:
+            return lambda env: boolean_value(as_boolean(vL(env)) or as_boolean(vR(env)))
+        if op in relational_ops:
+            fn = relational_ops[op]
+
+            def relational_op(env):
+                return TRUE if fn(*as_numbers(op, vL(env), vR(env))) else FALSE
+            return relational_op
+        if op in arithmetic_ops:
+            fn = arithmetic_ops[op]
+
+            def arithmetic_op(env):
+                return fn(*as_numbers(op, vL(env), vR(env)))
+            return arithmetic_op
+        raise RuntimeError(f"Operación no reconocida: {op}")
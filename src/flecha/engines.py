@@ -0,0 +1,15 @@
+from flecha.compiler import Compiler
+from flecha.interpreter import Interpreter, LocalEnv
+from flecha.lazy import LazyInterpreter
+from flecha.machine import Machine
+from flecha.vm import VM
+
+# Motores de evaluación por nombre: cada uno evalúa un programa escribiendo en output
+# y devuelve el valor de main.
+ENGINES = {
+    'tree': lambda output, program: Interpreter(output).eval(program, LocalEnv()),
+    'lazy': lambda output, program: LazyInterpreter(output).eval(program, LocalEnv()),
+    'compiled': lambda output, program: Compiler(output).run(program),
+    'stack': lambda output, program: Machine(output).run(program),
+    'vm': lambda output, program: VM(output).run(program),
+}
@@ -0,0 +1,141 @@
+import mmap
+import os
+import re
+from typing import Iterator
+from flecha.lexer import Lexer
+
+TokenTuple = tuple[str, object, int, int]
+
+def _char(excluded: str, utf8: bool) -> str:
+    # Un caracter que no esté en excluded; en UTF-8 un caracter puede ocupar varios bytes.
+    if utf8:
+        return rf'(?:[^{excluded}\x80-\xff]|[\x80-\xff][\x80-\xbf]*)'
+    return rf'[^{excluded}]'
+
+
+# Mismo orden de prioridad que ply: primero las reglas definidas como funciones, en el
+# orden en que aparecen en Lexer, y después las reglas de strings de mayor a menor largo.
+# Los caracteres ignorados se consumen como prefijo de cada token en lugar de ser un token
+# propio, y cualquier otro caracter cae en ERROR: finditer recorre el texto sin huecos.
+def _master(utf8: bool) -> str:
+    function_rules = [
+        ('CHAR', r"\'(?P<char>(\\(n|t|r|\\|\'|\"))|" + _char(r"\\\'", utf8) + r")\'"),
+        ('STRING', r'\"(?P<string>((\\(n|t|r|\\|\'|\"))|[^\\\"])*)\"'),
+        ('LOWERID', r'[a-z][_a-zA-Z0-9]*'),
+        ('UPPERID', r'[A-Z][_a-zA-Z0-9]*'),
+        ('NUMBER', r'\d+'),
+        ('COMMENT', r'\--.*\n?'),
+        ('NEWLINE', r'\n+'),
+    ]
+    rules = function_rules + _string_rules + [('ERROR', _char(r'\n', utf8))]
+    return f'[{re.escape(Lexer.t_ignore)}]*(?:' + '|'.join([f'(?P<{name}>{regex})' for name, regex in rules] + [r'\Z']) + ')'
+
+
+_string_rules = sorted(((name[2:], getattr(Lexer, name)) for name in dir(Lexer)
+                        if name.startswith('t_') and isinstance(getattr(Lexer, name), str) and name != 't_ignore'),
+                       key=lambda rule: len(rule[1]), reverse=True)
+
+_text_master = re.compile(_master(utf8=False))
+_bytes_master = re.compile(_master(utf8=True).encode('latin-1'))
+
+
+def _lexeme(regex: str) -> str:
+    # Las reglas de strings de Lexer reconocen un único lexema fijo, que es el valor del token.
+    literal = regex[1:-1] if regex.startswith('(') and regex.endswith(')') else regex
+    lexeme = re.sub(r'\\(.)', r'\1', literal)
+    assert re.fullmatch(regex, lexeme), regex
+    return lexeme
+
+
+_plain = {name: _lexeme(regex) for name, regex in _string_rules}
+_identifiers = frozenset(('LOWERID', 'UPPERID'))
+
+_escapes = re.compile(r"\\(n|t|r|\\|\'|\")")
+
+
+def _decode(data: bytes) -> str:
+    return data.decode('utf-8', errors='backslashreplace')
+
+
+def _unescape(txt: str) -> str:
+    return _escapes.sub(lambda m: Lexer.escaped_chars[m.group(0)], txt) if '\\' in txt else txt
+
+
+class FastToken():
+    ''' Token con la interfaz que espera ply.yacc'''
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer')
+
+    def __init__(self, type: str, value, lineno: int, lexpos: int):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __repr__(self):
+        return f'LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})'
+
+
+class FastLexer():
+    ''' Lexer alternativo a ply.lex basado en una única expresión regular maestra.
+
+    tokenize() genera tuplas (tipo, valor, línea, posición) idénticas a los tokens de
+    Lexer y tokenize_file() las genera leyendo un archivo mapeado en memoria;
+    input()/token() ofrecen la misma interfaz que un lexer de ply para usarlo desde Parser.'''
+
+    def __init__(self, print_errors: bool = True):
+        self.print_errors = print_errors
+        self.errors: list[str] = []
+        self.lineno = 1
+        self._tokens: Iterator[TokenTuple] = iter(())
+
+    def tokenize(self, text: str) -> Iterator[TokenTuple]:
+        return self._scan(_text_master, text, str)
+
+    def tokenize_file(self, path: str) -> Iterator[TokenTuple]:
+        ''' Tokeniza un archivo UTF-8 sin cargarlo entero en memoria; la posición de cada token es en bytes'''
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield from self._scan(_bytes_master, mapped, _decode)
+
+    def _scan(self, master: re.Pattern, text, decode) -> Iterator[TokenTuple]:
+        reserved = Lexer.reserved
+        lineno = self.lineno
+        plain, identifiers = _plain, _identifiers
+        for m in master.finditer(text):
+            kind = m.lastgroup
+            if kind in identifiers:
+                value = decode(m.group(kind))
+                yield (reserved.get(value, kind), value, lineno, m.start(kind))
+            elif kind in plain:
+                yield (kind, plain[kind], lineno, m.start(kind))
+            elif kind == 'NEWLINE':
+                lineno += m.end() - m.start(kind)
+                self.lineno = lineno
+            elif kind == 'NUMBER':
+                yield (kind, int(m.group(kind)), lineno, m.start(kind))
+            elif kind == 'STRING':
+                yield (kind, _unescape(decode(m.group('string'))), lineno, m.start(kind))
+            elif kind == 'CHAR':
+                yield (kind, _unescape(decode(m.group('char'))), lineno, m.start(kind))
+            elif kind == 'COMMENT':
+                lineno += 1
+                self.lineno = lineno
+            elif kind == 'ERROR':
+                self.error(decode(m.group(kind)))
+
+    def error(self, char: str):
+        message = f'Illegal character {char!r}'
+        self.errors.append(message)
+        if self.print_errors:
+            print(message)
+
+    # region Interfaz de lexer de ply
+    def input(self, text: str):
+        self._tokens = self.tokenize(text)
+
+    def token(self) -> FastToken | None:
+        tok = next(self._tokens, None)
+        return None if tok is None else FastToken(*tok)
+    # endregion
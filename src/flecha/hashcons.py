@@ -0,0 +1,65 @@
+from typing import Callable
+from flecha.ast import *
+
+# Cómo reconstruir cada nodo de aridad fija a partir de sus partes (ver AstNode._parts).
+_rebuild: dict[Tags, Callable[[tuple], AstNode]] = {
+    Tags.ExprApply: lambda parts: ExprApply(*parts),
+    Tags.ExprLambda: lambda parts: ExprLambda(*parts),
+    Tags.ExprLet: lambda parts: ExprLet(*parts),
+    Tags.ExprCase: lambda parts: ExprCase(parts[0], CaseBranches(list(parts[1:]))),
+    Tags.CaseBranch: lambda parts: CaseBranch(*parts),
+    Tags.Definition: lambda parts: Definition(*parts),
+    Tags.ExprPrimitive: lambda parts: ExprPrimitive(parts[0], parts[1:]),
+    Tags.ExprStruct: lambda parts: ExprStruct(parts[0], parts[1:]),
+    Tags.ExprMemo: lambda parts: ExprMemo(*parts),
+}
+
+# Nodos que guardan su línea en el fuente; entre nodos iguales se conserva la del primero.
+_lined_tags = frozenset((Tags.ExprLambda, Tags.CaseBranch, Tags.Definition))
+
+
+class HashConsTable:
+    ''' Tabla de hash-consing: intern() devuelve un AST equivalente en el que todos los
+    subárboles estructuralmente iguales (propios o de ASTs internados antes con la misma
+    tabla) son el mismo objeto.
+
+    Como los hijos de un nodo internado ya están internados, buscarlo en la tabla compara
+    sus partes por identidad, y dos nodos internados son iguales si y sólo si son el mismo.
+    La tabla mantiene vivos los nodos internados hasta que se descarta o se llama a clear().'''
+
+    def __init__(self):
+        self._nodes: dict[AstNode, AstNode] = {}
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def clear(self):
+        self._nodes.clear()
+
+    def intern(self, root: AstNode) -> AstNode:
+        nodes = self._nodes
+        interned: dict[int, AstNode] = {}
+        pending = [(root, False)]
+        while pending:
+            node, expanded = pending.pop()
+            if id(node) in interned:
+                continue
+            parts = node._parts()
+            if not expanded:
+                pending.append((node, True))
+                pending.extend((p, False) for p in parts if isinstance(p, AstNode))
+                continue
+            new_parts = tuple(interned[id(p)] if isinstance(p, AstNode) else p for p in parts)
+            shared = node
+            if any(new is not old for new, old in zip(new_parts, parts)):
+                shared = _rebuild[node.tag](new_parts)
+                if node.tag in _lined_tags:
+                    shared.line = node.line
+            interned[id(node)] = nodes.setdefault(shared, shared)
+        return interned[id(root)]
+
+    def intern_program(self, program: Program) -> Program:
+        interned = Program()
+        for d in program.definitions():
+            interned.append(self.intern(d))
+        return interned
@@ -1,6 +1,8 @@
 from enum import Enum
-from typing import Callable, TextIO
+from typing import Callable, Iterable, TextIO
 from flecha.ast import *
+from flecha.resolver import PARAM_SLOT, PARENT_SLOT, Frame, Scope, address, frame_value, new_frame
+from flecha.rewrite import resolve, resolve_program
 
 class ValueTypes(Enum):
     Int = "Int"
@@ -14,50 +16,138 @@ class Booleans(Enum):
     FALSE = "False"
 
 # region Values
+# Representación de los valores en tiempo de ejecución: los enteros son int de Python,
+# los caracteres CharValue y las estructuras StructValue. Todas las clases usan __slots__
+# y el tipo es un atributo de clase, así que verificar el tipo de un valor es comparar su clase.
 class Value:
-    def __init__(self):
-        self.type = ValueTypes.Null.value
+    __slots__ = ()
+    type = ValueTypes.Null.value
+
 class VoidValue(Value):
-    pass
+    __slots__ = ()
 
 class LiteralValue(Value):
-    def __init__(self, type, v):
-        self.value = v
-        self.type = type.value
+    __slots__ = ('value',)
 
     def __repr__(self) -> str:
-        return self.value
+        return str(self.value)
 
-class IntValue(LiteralValue):
-    def __init__(self,v):
-        super().__init__(ValueTypes.Int, v)
+class IntValue(int):
+    ''' Entero con la interfaz de LiteralValue. Los motores usan directamente int;
+    las operaciones aceptan también IntValue'''
+    __slots__ = ()
+    type = ValueTypes.Int.value
+
+    @property
+    def value(self) -> int:
+        return int(self)
 
 class CharValue(LiteralValue):
+    __slots__ = ()
+    type = ValueTypes.Char.value
+
     def __init__(self, v:int):
-        super().__init__(ValueTypes.Char, chr(v)) 
+        self.value = chr(v)
 
 class ClosureValue(Value):
+    __slots__ = ('param', 'body', 'env')
+    type = ValueTypes.Closure.value
+
     def __init__(self, param, body, env) -> None:
         self.param: str = param
         self.body: Expression = body
-        self.env: LocalEnv = env
-        self.type = ValueTypes.Closure.value
+        self.env: Frame = env
         
     def __repr__(self):
         return json.dumps([self.type, self.param]+self.body, default=str)
 
 class StructValue(Value):
+    __slots__ = ('ctor', 'args')
+    type = ValueTypes.Struct.value
+
     def __init__(self, ctor:str, args: list[Value]):
         self.ctor: str = ctor
         self.args: list[Value] = args
-        self.type = ValueTypes.Struct.value
 
     def __repr__(self):
         return json.dumps([self.type,self.ctor]+self.args,default=str)
+class StringValue(StructValue):
+    ''' String empaquetado: se comporta como la lista Cons/Nil de sus caracteres a partir
+    de start, pero cada celda se construye recién cuando se accede a sus argumentos'''
+    __slots__ = ('text', 'start', '_cells')
+
+    def __init__(self, text: str, start: int = 0):
+        self.text = text
+        self.start = start
+        self.ctor: str = 'Cons' if start < len(text) else 'Nil'
+        self._cells = None
+
+    @property
+    def args(self) -> list[Value]:
+        if self._cells is None:
+            if self.start == len(self.text):
+                self._cells = []
+            else:
+                self._cells = [char_value(ord(self.text[self.start])), StringValue(self.text, self.start + 1)]
+        return self._cells
+
 class BooleanValue(StructValue):
+    __slots__ = ()
+
     def __init__(self,b):
         super().__init__(Booleans.TRUE.value if b else Booleans.FALSE.value,[])
 
+# Los valores son inmutables: los que no dependen del cómputo (booleanos, constructores
+# sin argumentos, void y caracteres) se crean una sola vez y se comparten.
+TRUE, FALSE = BooleanValue(True), BooleanValue(False)
+VOID = VoidValue()
+# Sólo los constructores predefinidos se comparten entre programas: los nombres que
+# definen los programas van a la tabla de cada motor (ver constructor_value).
+_nullary: dict[str, StructValue] = {TRUE.ctor: TRUE, FALSE.ctor: FALSE, 'Nil': StructValue('Nil', [])}
+_chars = [CharValue(c) for c in range(256)]
+
+def boolean_value(b: bool) -> BooleanValue:
+    return TRUE if b else FALSE
+
+def constructor_value(ctor: str, table: dict[str, StructValue] | None = None) -> StructValue:
+    ''' Valor del constructor sin argumentos ctor. Los que no son predefinidos se comparten
+    en table, que es de un motor y se libera con él; sin table se crea un valor nuevo.'''
+    value = _nullary.get(ctor)
+    if value is None:
+        if table is None:
+            return StructValue(ctor, [])
+        value = table.get(ctor)
+        if value is None:
+            value = table[ctor] = StructValue(ctor, [])
+    return value
+
+def char_value(c: int) -> CharValue:
+    return _chars[c] if c < 256 else CharValue(c)
+
+# Tipo de los valores que no son estructuras, con el nombre que usan las ramas de un case.
+_type_names = {int: ValueTypes.Int.value, IntValue: ValueTypes.Int.value, CharValue: ValueTypes.Char.value,
+               ClosureValue: ValueTypes.Closure.value, VoidValue: ValueTypes.Null.value}
+
+def type_name(val) -> str:
+    return _type_names.get(val.__class__) or val.type
+
+def case_table(branches: Iterable[tuple[str, tuple, object]]) -> dict:
+    ''' Tabla de despacho de un case a partir de sus ramas (constructor, slots, rama):
+    (constructor, aridad) -> (slots, rama) para las estructuras y nombre de tipo -> ((), rama)
+    para el resto de los valores. Si varias ramas matchean un valor gana la primera.'''
+    table = {}
+    for id, slots, branch in branches:
+        table.setdefault((id, len(slots)), (slots, branch))
+        table.setdefault(id, ((), branch))
+    return table
+
+
+def select_branch(table: dict, val: Value) -> tuple[tuple, object]:
+    ''' Rama de la tabla que matchea val; si los slots no son vacíos se ligan a val.args'''
+    entry = table.get((val.ctor, len(val.args)) if isinstance(val, StructValue) else type_name(val))
+    if entry is None:
+        raise RuntimeError(f"Error al intentar matchear la expresión: {val}")
+    return entry
 
 # endregion
 
@@ -76,224 +166,294 @@ class GlobalEnv:
             raise RuntimeError(f"Identificador no definido: '{id}'")
 
 class LocalEnv:
+    ''' Entorno local persistente: una lista enlazada de ligaduras (id, valor, resto),
+    de modo que extender el entorno es O(1) y no copia las ligaduras existentes.
+
+    Es el entorno con el que se evalúa una raíz (ver Interpreter.eval_root): durante la
+    evaluación las variables locales se guardan en frames (ver flecha.resolver).'''
+
     def __init__(self, init=[]):
-        self._stack = init
+        self._head = None
+        self._len = 0
+        for id, val in reversed(init):
+            self._head = (id, val, self._head)
+            self._len += 1
 
     def __len__(self):
-        return len(self._stack)
+        return self._len
 
     def extend(self, id: str, val: 'Value'):
-        return LocalEnv([(id, val)] + self._stack)
+        env = LocalEnv()
+        env._head = (id, val, self._head)
+        env._len = self._len + 1
+        return env
 
     def lookup(self, id: str):
-        for x in self._stack:
-            if x[0] == id:
-                return x[1]
+        node = self._head
+        while node is not None:
+            if node[0] == id:
+                return node[1]
+            node = node[2]
         return None
 
+    def bindings(self) -> list[tuple[str, 'Value']]:
+        ''' Las ligaduras de la más externa a la más interna'''
+        return list(self._stack())[::-1]
+
+    def _stack(self):
+        node = self._head
+        while node is not None:
+            yield (node[0], node[1])
+            node = node[2]
+
     def __repr__(self):
-        return str(self._stack)
+        return str(list(self._stack()))
 # endregion
 
 
+# Semántica de los operadores sobre enteros, compartida por todos los motores y el optimizador.
+relational_ops = {
+    BinaryOperators.EQ.value : lambda x, y: x == y,
+    BinaryOperators.NE.value : lambda x, y: x != y,
+    BinaryOperators.LE.value : lambda x, y: x <= y,
+    BinaryOperators.GE.value : lambda x, y: x >= y,
+    BinaryOperators.LT.value : lambda x, y: x < y,
+    BinaryOperators.GT.value : lambda x, y: x > y,
+}
+arithmetic_ops = {
+    BinaryOperators.DIV.value : lambda x, y: x // y,
+    BinaryOperators.MOD.value : lambda x, y: x % y,
+    BinaryOperators.SUB.value : lambda x, y: x - y,
+    BinaryOperators.ADD.value : lambda x, y: x + y,
+    BinaryOperators.MUL.value : lambda x, y: x * y,
+}
 
-class Primitives(Enum):
-    UNSAFE_PRINT_INT = 'unsafePrintInt'
-    UNSAFE_PRINT_CHAR = 'unsafePrintChar'
 
 class Interpreter:
-    def __init__(self, output:TextIO ) -> None:
+    def __init__(self, output:TextIO, memo=None) -> None:
         self._global_env = GlobalEnv()
         self._output = output
+        # Cache de los ExprMemo (ver flecha.memo.MemoCache); sin cache se evalúa el cuerpo.
+        self._memo = memo
+        # Tabla de despacho de cada case, armada la primera vez que se evalúa: id(nodo) -> (nodo, tabla).
+        self._case_tables: dict[int, tuple[ExprCase, dict]] = {}
+        # Constructores sin argumentos de los programas evaluados (ver constructor_value).
+        self._constructors: dict[str, StructValue] = {}
+        # Raíces ya resueltas (ver eval_root): id(raíz) -> (raíz, nombres del entorno, resuelta,
+        # slots de los nombres, tamaño del frame externo).
+        self._roots: dict[int, tuple[AstNode, tuple[str, ...], AstNode, list[int], int]] = {}
         self._eval_map:dict[Tags,Callable[[AstNode],Value]] = {
             Tags.Program : self.eval_program,
             Tags.Definition: self.eval_definition,
             Tags.ExprVar: self.eval_var,
+            Tags.ExprLocal: self.eval_local,
             Tags.ExprNumber: self.eval_number,
             Tags.ExprChar: self.eval_char,
             Tags.ExprLambda: self.eval_lambda,
-            Tags.ExprApply: self.eval_apply,
             Tags.ExprConstructor: self.eval_constructor,
-            Tags.ExprLet: self.eval_let,
-            Tags.ExprCase: self.eval_case
+            Tags.ExprString: self.eval_string,
+            Tags.ExprPrimitive: self.eval_primitive,
+            Tags.ExprStruct: self.eval_struct,
+            Tags.ExprMemo: self.eval_memo,
         }
-        self._relational_ops = {
-            BinaryOperators.EQ.value : lambda x, y: x == y,
-            BinaryOperators.NE.value : lambda x, y: x != y,
-            BinaryOperators.LE.value : lambda x, y: x <= y,
-            BinaryOperators.GE.value : lambda x, y: x >= y,
-            BinaryOperators.LT.value : lambda x, y: x < y,
-            BinaryOperators.GT.value : lambda x, y: x > y,
-        }
-        self._arithmetic_ops = {
-            BinaryOperators.DIV.value : lambda x, y: x // y,
-            BinaryOperators.MOD.value : lambda x, y: x % y,
-            BinaryOperators.SUB.value : lambda x, y: x - y,
-            BinaryOperators.ADD.value : lambda x, y: x + y,
-            BinaryOperators.MUL.value : lambda x, y: x * y,
-
+        # Expresiones con una subexpresión en posición de cola: en lugar de evaluarla
+        # recursivamente devuelven el par (expresión, entorno) con el que sigue eval.
+        self._tail_map:dict[Tags,Callable[[AstNode,Frame],Value | tuple[AstNode,Frame]]] = {
+            Tags.ExprApply: self.tail_call,
+            Tags.ExprLet: self.tail_let,
+            Tags.ExprCase: self.tail_case
         }
+        self._relational_ops = relational_ops
+        self._arithmetic_ops = arithmetic_ops
         self._logical_ops = {
             BinaryOperators.AND.value : self.eval_and,
             BinaryOperators.OR.value : self.eval_or
         }
+        self._binary_ops = {
+            **{op: self.eval_relational_op for op in self._relational_ops},
+            **{op: self.eval_arithmetic_op for op in self._arithmetic_ops},
+            **{op: self.eval_logical_op for op in self._logical_ops},
+        }
 
 
-    def eval(self, ast: AstNode, env: LocalEnv) -> Value:
+    def eval(self, ast: AstNode, env: Frame | LocalEnv) -> Value:
+        # Las raíces se evalúan con un LocalEnv; lo demás, con el frame de la función actual.
+        if type(env) is LocalEnv:
+            return self.eval_root(ast, env)
+        while ast.tag in self._tail_map:
+            step = self._tail_map[ast.tag](ast, env)
+            if type(step) is not tuple:
+                return step
+            ast, env = step
         if ast.tag in self._eval_map: 
             return self._eval_map[ast.tag](ast,env)
         raise RuntimeError(f"No se pudo evaluar la expresión {ast}")
 
-    def eval_program(self, ast: Program, env: LocalEnv):
+    def eval_root(self, ast: AstNode, env: LocalEnv) -> Value:
+        ''' Evalúa la raíz de una evaluación (un Program o cualquier expresión). La raíz se
+        resuelve una sola vez: las aplicaciones de primitivas y constructores se reescriben,
+        de modo que cada ExprApply que se evalúa es la llamada a una closure, y las variables
+        locales se resuelven a su dirección en los frames (ver flecha.resolver.address). Las
+        ligaduras de env forman el frame más externo.'''
+        bindings = env.bindings()
+        names = tuple(name for name, _ in bindings)
+        entry = self._roots.get(id(ast))
+        if entry is None or entry[0] is not ast or entry[1] != names:
+            scope, slots = Scope(), []
+            for name in names:
+                scope = scope.bind(name)
+                slots.append(scope.slot(name))
+            resolved = address(resolve_program(ast) if ast.tag == Tags.Program else resolve(ast), scope)
+            entry = self._roots[id(ast)] = (ast, names, resolved, slots, scope.layout.size)
+        _, _, resolved, slots, size = entry
+        frame = new_frame(None, size)
+        for slot, (_, val) in zip(slots, bindings):
+            frame[slot] = val
+        return self.eval(resolved, frame)
+
+    def eval_program(self, ast: Program, env: Frame):
         for d in ast.definitions():
             self.eval_definition(d, env)
         return self._global_env.lookup('main')
 
-    def eval_definition(self, ast: Definition, env: LocalEnv) -> VoidValue:
-        self._global_env.assign(ast.id(), self.eval(ast.expr(), env))
-        return VoidValue()
+    def eval_definition(self, ast: Definition, env: Frame) -> VoidValue:
+        self._global_env.assign(ast.id(), self.eval(ast.expr(), new_frame(env, ast.size)))
+        return VOID
 
-    def eval_var(self, ast: ExprVar, env: LocalEnv) -> Value:
-        return self.lookup(ast.id(), env)
+    def eval_var(self, ast: ExprVar, env: Frame) -> Value:
+        # Las variables locales son ExprLocal: las que quedan son globales.
+        return self._global_env.lookup(ast.id())
 
-    def eval_let(self, ast:ExprLet, env:LocalEnv) -> Value:
-        arg_val = self.eval(ast.argExpr(),env)
-        return self.eval(ast.inExpr(), env.extend(ast.param(),arg_val))        
+    def eval_local(self, ast: ExprLocal, env: Frame) -> Value:
+        for _ in range(ast.depth):
+            env = env[PARENT_SLOT]
+        return env[ast.slot]
 
-    def eval_number(self, ast: ExprNumber, env) -> IntValue:
-        return IntValue(ast.value)
+    def tail_let(self, ast:ExprLet, env:Frame) -> tuple[AstNode,Frame]:
+        env[ast.slot] = self.eval(ast.argExpr(),env)
+        return (ast.inExpr(), env)
+
+    def eval_number(self, ast: ExprNumber, env) -> int:
+        return ast.value
 
     def eval_char(self, ast: ExprNumber, env) -> CharValue:
-        return CharValue(ast.value)
+        return char_value(ast.value)
    
-    def eval_lambda(self, ast: ExprLambda, env:LocalEnv) -> ClosureValue:
-        return ClosureValue(ast.param(), ast.body(), env)
+    def eval_lambda(self, ast: ExprLambda, env:Frame) -> ClosureValue:
+        # La closure guarda la lambda: su cuerpo y el tamaño del frame de cada llamada.
+        return ClosureValue(ast.param(), ast, env)
 
-    def eval_apply(self, ast: ExprApply, env:LocalEnv) -> Value:
-        if self.is_unary_operation(ast): return self.eval_unary_op(ast.fn(), ast.arg(), env)
-        elif self.is_binary_operation(ast): return self.eval_binary_op(ast, env)
-        elif self.is_struct_expr(ast): return self.eval_struct(ast,env)
+    def tail_call(self, ast: ExprApply, env:Frame) -> tuple[AstNode,Frame]:
         _arg = self.eval(ast.arg(), env)
-        _cl: ClosureValue = self.eval_as_closure(ast.fn(),env)
-        return self.eval(_cl.body, _cl.env.extend(_cl.param, _arg))
+        return self.enter_closure(self.eval_as_closure(ast.fn(),env), _arg)
+
+    def enter_closure(self, _cl: ClosureValue, _arg) -> tuple[AstNode,Frame]:
+        lam: ExprLambda = _cl.body
+        frame = [None] * lam.size
+        frame[PARENT_SLOT] = _cl.env
+        frame[PARAM_SLOT] = _arg
+        return (lam.body(), frame)
 
     def eval_constructor(self, ast:ExprConstructor, env):
-        return StructValue(ast.id(),[])
-
-    def eval_struct(self, ast: AstNode, env:LocalEnv) -> Value:
-        _curr = ast
-        _args = []
-        while(_curr.tag == Tags.ExprApply):
-            _args.insert(0,_curr.arg())
-            _curr = _curr.fn()
-        _ctor:ExprConstructor = _curr
-        return StructValue(_ctor.id(),[self.eval(a,env) for a in _args])
+        return constructor_value(ast.id(), self._constructors)
+
+    def eval_string(self, ast:ExprString, env):
+        return StringValue(ast.value)
+
+    def eval_struct(self, ast: ExprStruct, env:Frame) -> Value:
+        return StructValue(ast.id(),[self.eval(a,env) for a in ast.args()])
+
+    def eval_primitive(self, ast: ExprPrimitive, env:Frame) -> Value:
+        args = ast.args()
+        if len(args) == 1:
+            return self.eval_unary_op(ast.op(), args[0], env)
+        return self.eval_binary_op(ast.op(), args[0], args[1], env)
     
-    def eval_case(self, ast: ExprCase, env:LocalEnv) -> Value:
+    def tail_case(self, ast: ExprCase, env:Frame) -> tuple[AstNode,Frame]:
         val:Value = self.eval(ast.expr(),env)
-        for b in ast.branches():
-            is_match, new_env = self.match(val,b,env)
-            if is_match : return self.eval(b.expr(), new_env)
-        raise RuntimeError(f"Error al intentar matchear la expresión: {val}")
+        slots, expr = select_branch(self.case_table(ast), val)
+        if slots:
+            for s, v in zip(slots, val.args):
+                env[s] = v
+        return (expr, env)
+
+    def eval_memo(self, ast: ExprMemo, env:Frame) -> Value:
+        memo = self._memo
+        key = None if memo is None else memo.key(ast.id(), [frame_value(env, *a) for a in ast.addresses])
+        if key is None:
+            return self.eval(ast.body(), env)
+        val = memo.get(key)
+        if val is None:
+            val = self.eval(ast.body(), env)
+            memo.put(key, val)
+        return val
+
+    def case_table(self, ast: ExprCase) -> dict:
+        entry = self._case_tables.get(id(ast))
+        if entry is None or entry[0] is not ast:
+            entry = self._case_tables[id(ast)] = (ast, case_table((b.id(), b.slots, b.expr()) for b in ast.branches()))
+        return entry[1]
 
 # unary operations
-    def eval_unary_op(self, op: ExprVar, exp:Expression, env:LocalEnv):
-        match op.id():
+    def eval_unary_op(self, op: str, exp:Expression, env:Frame):
+        match op:
             case Primitives.UNSAFE_PRINT_INT.value: return self.eval_print_int(exp, env)
             case Primitives.UNSAFE_PRINT_CHAR.value: return self.eval_print_char(exp, env)
             case UnaryOperators.NOT.value: return self.eval_not(exp, env)
             case UnaryOperators.UMINUS.value: return self.eval_uminus(exp, env)
 
-    def eval_not(self, exp:AstNode, env:LocalEnv):
-        return BooleanValue(not self.eval_as_boolean(exp,env))
+    def eval_not(self, exp:AstNode, env:Frame):
+        return boolean_value(not self.eval_as_boolean(exp,env))
 
     def eval_uminus(self,exp:AstNode,env):
-        return IntValue(-self.eval_as_number(exp,env))
+        return -self.eval_as_number(exp,env)
 
     def eval_print_int(self, exp:AstNode, env):
-        self._output.write(f'{self.eval_as_number(exp,env)}')
-        return VoidValue()
+        self._output.write(str(self.eval_as_number(exp,env)))
+        return VOID
 
     def eval_print_char(self, exp:AstNode, env):
-        self._output.write(f'{self.eval_as_char(exp,env)}')
-        return VoidValue()
+        self._output.write(self.eval_as_char(exp,env))
+        return VOID
 
 #binary operations
-    def eval_binary_op(self, ast:ExprApply, env:LocalEnv):
-        left = ast.fn().arg()
-        right = ast.arg()
-        binOp : ExprVar = ast.fn().fn().id()
-        if binOp in self._relational_ops: eval_fn = self.eval_relational_op
-        elif binOp in self._arithmetic_ops: eval_fn = self.eval_arithmetic_op
-        elif binOp in self._logical_ops: eval_fn = self.eval_logical_op
-        else: raise RuntimeError(f"Operación no reconocida: {binOp}")
+    def eval_binary_op(self, binOp: str, left: AstNode, right: AstNode, env:Frame):
+        eval_fn = self._binary_ops.get(binOp)
+        if eval_fn is None: raise RuntimeError(f"Operación no reconocida: {binOp}")
         return eval_fn(left, binOp, right, env)
 
-    def eval_relational_op(self,left: AstNode, op:str, right: AstNode, env:LocalEnv):
+    def eval_relational_op(self,left: AstNode, op:str, right: AstNode, env:Frame):
         vL,vR = self.assert_numeric_operation(left, op, right, env)
-        return BooleanValue(self._relational_ops[op](vL,vR))
+        return boolean_value(self._relational_ops[op](vL,vR))
 
-    def eval_arithmetic_op(self,left: AstNode, op:str, right: AstNode, env:LocalEnv):
+    def eval_arithmetic_op(self,left: AstNode, op:str, right: AstNode, env:Frame):
         vL,vR = self.assert_numeric_operation(left, op, right, env)
-        return IntValue(self._arithmetic_ops[op](vL,vR))
+        return self._arithmetic_ops[op](vL,vR)
 
-    def eval_logical_op(self,left: AstNode, op:str, right: AstNode,env:LocalEnv):
+    def eval_logical_op(self,left: AstNode, op:str, right: AstNode,env:Frame):
         return self._logical_ops[op](left,right,env)
 
-    def eval_or(self,left: AstNode, right: AstNode,env:LocalEnv):
-        return BooleanValue(self.eval_as_boolean(left, env) or self.eval_as_boolean(right, env))
+    def eval_or(self,left: AstNode, right: AstNode,env:Frame):
+        return boolean_value(self.eval_as_boolean(left, env) or self.eval_as_boolean(right, env))
 
-    def eval_and(self,left: AstNode, right: AstNode,env:LocalEnv):
-        return BooleanValue(self.eval_as_boolean(left, env) and self.eval_as_boolean(right, env))
+    def eval_and(self,left: AstNode, right: AstNode,env:Frame):
+        return boolean_value(self.eval_as_boolean(left, env) and self.eval_as_boolean(right, env))
 
 #aux
-    def lookup(self, id: str, env: LocalEnv):
-        val = env.lookup(id)
-        return self._global_env.lookup(id) if (val is None) else val
-
-    def match(self, val:Value, b:CaseBranch, env:LocalEnv):
-        return self.match_struct(val,b,env) if (val.type == ValueTypes.Struct.value) else (val.type==b.id(), env)
-
-    def match_struct(self, val:StructValue, b:CaseBranch, env:LocalEnv):
-        _new_env = env
-        _is_match:bool = val.ctor==b.id() and len(val.args) == len(b.params())
-        if _is_match:
-            for i,p in enumerate(b.params()):
-                _new_env = _new_env.extend(p,val.args[i])
-        return (_is_match, _new_env)
-           
-    def is_unary_operation(self, ast:ExprApply):
-        fn = ast.fn()
-        return self.is_var_expr(fn) and (fn.id() in [p.value for p in Primitives] or fn.id() in unary_operators.values())
-
-    def is_binary_operation(self, ast:ExprApply):
-        fn = ast.fn()
-        return self.is_app_expr(fn) and self.is_var_expr(fn.fn()) and fn.fn().id() in binary_operators.values()
-
-    def is_struct_expr(self, ast: AstNode) -> bool:
-        _curr = ast
-        while(_curr.tag == Tags.ExprApply):
-            _curr = _curr.fn()
-        return _curr.tag == Tags.ExprConstructor
-
-    def is_app_expr(self,ast:AstNode):
-        return ast.tag == Tags.ExprApply
-            
-    def is_var_expr(self,ast:AstNode):
-        return ast.tag == Tags.ExprVar
-
     def assert_numeric_operation(self, left, op, right, env):
         try:
             vL = self.eval_as_number(left, env)
             vR = self.eval_as_number(right, env)
-        except:
+        except RuntimeError:
             raise RuntimeError(f"El operador {op} solo se puede usar con números")
         return(vL,vR)    
 
     def eval_as_number(self, exp:AstNode, env) -> int:
         val = self.eval(exp,env)
-        self.assert_number_val(val)
-        return val.value
+        if type(val) is not int:
+            self.assert_number_val(val)
+            val = int(val)
+        return val
 
     def eval_as_closure(self, exp:AstNode, env) -> int:
         val = self.eval(exp, env)
@@ -303,22 +463,22 @@ class Interpreter:
     def eval_as_boolean(self, exp:AstNode, env):
         val = self.eval(exp, env)
         self.assert_bool_val(val)
-        return val.ctor == Booleans.TRUE.value
+        return val is TRUE
     
-    def assert_number_val(self, val:IntValue):
-        if val.type != ValueTypes.Int.value: 
+    def assert_number_val(self, val:int):
+        if not isinstance(val, int): 
             raise RuntimeError(f"El valor {val} no se puede evaluar como número")
 
     def assert_closure_val(self, val:ClosureValue):
-        if val.type != ValueTypes.Closure.value: 
+        if type(val) is not ClosureValue: 
             raise RuntimeError(f"El valor {val} no se puede evaluar como closure")
 
     def assert_bool_val(self, val:StructValue):
-        if not (val.type == ValueTypes.Struct.value and val.ctor in [Booleans.TRUE.value,Booleans.FALSE.value]): 
+        if val is not TRUE and val is not FALSE: 
             raise RuntimeError(f"El valor {val} no se puede evaluar como booleano")
 
     def eval_as_char(self,exp,env):
         v = self.eval(exp,env)
-        if v.type != ValueTypes.Char.value:
+        if type(v) is not CharValue:
             raise RuntimeError(f"El valor {v} no se puede evaluar como char")
         return v.value
@@ -0,0 +1,135 @@
+from flecha.ast import *
+from flecha.interpreter import Interpreter, StructValue, Value
+from flecha.resolver import Frame, frame_value
+from flecha.rewrite import print_primitives
+
+# Expresiones que se evalúan sin costo ni efectos: no hace falta postergarlas. Las
+# estructuras se arman enseguida porque sus argumentos ya se postergan.
+_immediate_tags = frozenset((Tags.ExprNumber, Tags.ExprChar, Tags.ExprConstructor, Tags.ExprString,
+                             Tags.ExprLambda, Tags.ExprStruct))
+_short_circuit_ops = frozenset((BinaryOperators.AND.value, BinaryOperators.OR.value))
+
+
+class Thunk:
+    ''' Expresión postergada junto con su entorno. Se evalúa la primera vez que se fuerza y
+    guarda el resultado: las demás referencias al mismo thunk lo comparten.'''
+    __slots__ = ('expr', 'env', 'value')
+
+    def __init__(self, expr: AstNode, env: Frame):
+        self.expr: AstNode | None = expr
+        self.env: Frame | None = env
+        self.value: Value | None = None
+
+    def __repr__(self):
+        return '<thunk>' if self.expr is not None else repr(self.value)
+
+
+class LazyInterpreter(Interpreter):
+    ''' Intérprete con evaluación por necesidad: los argumentos de las funciones, los let y los
+    argumentos de los constructores se evalúan recién cuando un case, una primitiva o un print
+    necesita su valor, y una sola vez.
+
+    Las definiciones globales se evalúan en orden (hasta el constructor o la closure más
+    externa) y los `let _ = e in ...` (`e; ...`) evalúan e antes de seguir, así que la
+    secuencia de efectos escrita con ; se mantiene. Un unsafePrint* cuyo resultado no se usa
+    en otra posición no se ejecuta.'''
+
+    def delay(self, ast: AstNode, env: Frame) -> Value | Thunk:
+        tag = ast.tag
+        if tag == Tags.ExprLocal:
+            return frame_value(env, ast.depth, ast.slot)
+        if tag == Tags.ExprVar:
+            try:
+                return self._global_env.lookup(ast.id())
+            except RuntimeError:
+                # El error se informa recién si se usa el valor.
+                return Thunk(ast, env)
+        if tag in _immediate_tags:
+            return self._eval_map[tag](ast, env)
+        if tag == Tags.ExprPrimitive and self.ready(ast, env):
+            # Postergar `acc + x` armaría cadenas de thunks tan largas como la recursión
+            # que los acumula; si la operación falla, el error queda para cuando se use.
+            try:
+                return self.eval_primitive(ast, env)
+            except (RuntimeError, ArithmeticError):
+                pass
+        return Thunk(ast, env)
+
+    def ready(self, ast: ExprPrimitive, env: Frame) -> bool:
+        ''' Si ast opera sólo sobre literales y variables ya evaluadas, sin imprimir: evaluarla
+        ahora es barato, no tiene efectos y termina'''
+        pending = [ast]
+        while pending:
+            node = pending.pop()
+            tag = node.tag
+            if tag == Tags.ExprPrimitive:
+                if node.op() in print_primitives:
+                    return False
+                pending.extend(node.args())
+            elif tag == Tags.ExprLocal:
+                val = frame_value(env, node.depth, node.slot)
+                if type(val) is Thunk and val.expr is not None:
+                    return False
+            elif tag != Tags.ExprNumber and tag != Tags.ExprChar:
+                return False
+        return True
+
+    def force(self, thunk: Thunk) -> Value:
+        ''' Evalúa el thunk si todavía no se evaluó. Los thunks que una operación primitiva
+        va a forzar de todos modos (como acc en `acc + x`) se fuerzan antes, en el mismo orden
+        y sin recursión, así una cadena de acumuladores postergados no agota la pila.'''
+        pending = [thunk]
+        while pending:
+            t = pending[-1]
+            if t.expr is None:
+                pending.pop()
+                continue
+            operands = _strict_operands(t.expr, t.env)
+            if operands:
+                pending.extend(reversed(operands))
+                continue
+            pending.pop()
+            t.value = self.eval(t.expr, t.env)
+            # Se sueltan la expresión y el entorno para no retener lo que ya no se usa.
+            t.expr = t.env = None
+        return thunk.value
+
+    def eval_local(self, ast: ExprLocal, env: Frame) -> Value:
+        val = super().eval_local(ast, env)
+        return self.force(val) if type(val) is Thunk else val
+
+    def tail_let(self, ast: ExprLet, env: Frame) -> tuple[AstNode, Frame]:
+        if ast.param() == '_':
+            return super().tail_let(ast, env)
+        env[ast.slot] = self.delay(ast.argExpr(), env)
+        return (ast.inExpr(), env)
+
+    def tail_call(self, ast: ExprApply, env: Frame) -> tuple[AstNode, Frame]:
+        _arg = self.delay(ast.arg(), env)
+        return self.enter_closure(self.eval_as_closure(ast.fn(), env), _arg)
+
+    def eval_struct(self, ast: ExprStruct, env: Frame) -> Value:
+        return StructValue(ast.id(), [self.delay(a, env) for a in ast.args()])
+
+
+def _strict_operands(expr: AstNode, env: Frame) -> list[Thunk]:
+    ''' Thunks sin evaluar que la primitiva expr fuerza seguro al evaluarse, de izquierda a
+    derecha: las variables entre sus operandos (salvo el derecho de && y ||) que se evalúan
+    antes que cualquier otra expresión que pueda tener efectos'''
+    operands = []
+    pending = [expr]
+    while pending:
+        node = pending.pop()
+        tag = node.tag
+        if tag == Tags.ExprPrimitive and node.op() not in print_primitives:
+            args = node.args()
+            if node.op() in _short_circuit_ops:
+                args = args[:1]
+            pending.extend(reversed(args))
+        elif tag == Tags.ExprLocal:
+            val = frame_value(env, node.depth, node.slot)
+            if type(val) is Thunk and val.expr is not None:
+                operands.append(val)
+        elif tag != Tags.ExprVar and tag != Tags.ExprNumber and tag != Tags.ExprChar:
+            break
+    return operands
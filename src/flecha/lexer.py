@@ -3,12 +3,19 @@ from ply.lex import LexToken
 import re
 LexInstance = lex.Lexer
 
+# Módulo con las tablas pregeneradas (ver flecha.tables)
+LEXTAB = 'flecha.lextab'
+
 
 def replace(m):
     return Lexer.escaped_chars[m.group('esc')]
 
 
 class Lexer(): 
+    def __init__(self, print_errors: bool = True):
+        self.print_errors = print_errors
+        self.errors: list[str] = []
+
     reserved = {
         'def': 'DEF',
         'if': 'IF',
@@ -110,8 +117,22 @@ class Lexer():
         t.lexer.lineno += t.value.count('\n')
 
     def t_error(self, t):
-        print(f'Illegal character {t.value[0]!r}')
+        message = f'Illegal character {t.value[0]!r}'
+        self.errors.append(message)
+        if self.print_errors:
+            print(message)
         t.lexer.skip(1)
 
-    def build(self) -> LexInstance:
-        return lex.lex(module=self)
+    def build(self, tables: bool = True) -> LexInstance:
+        ''' Con tables=True carga las tablas pregeneradas de flecha.lextab sin inspeccionar las reglas'''
+        if tables:
+            try:
+                return self.load_tables()
+            except (ImportError, KeyError, AttributeError):
+                pass
+        return lex.lex(module=self, optimize=False)
+
+    def load_tables(self) -> LexInstance:
+        _lex = lex.Lexer()
+        _lex.readtab(LEXTAB, {name: getattr(self, name) for name in dir(self) if name.startswith('t_')})
+        return _lex
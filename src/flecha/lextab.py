@@ -0,0 +1,10 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AND', 'ARROW', 'CASE', 'CHAR', 'DEF', 'DEFEQ', 'DIV', 'ELIF', 'ELSE', 'EQ', 'GE', 'GT', 'IF', 'IN', 'LAMBDA', 'LE', 'LET', 'LOWERID', 'LPAREN', 'LT', 'MINUS', 'MOD', 'NE', 'NOT', 'NUMBER', 'OR', 'PIPE', 'PLUS', 'RPAREN', 'SEMICOLON', 'STRING', 'THEN', 'TIMES', 'UPPERID'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_CHAR>\\\'(?P<value>(\\\\(n|t|r|\\\\|\\\'|\\"))|[^\\\\\\\'])\\\')', [None, ('t_CHAR', 'CHAR'), None]), ('(?P<t_STRING>\\"(?P<value>((\\\\(n|t|r|\\\\|\\\'|\\"))|[^\\\\\\"])*)\\")|(?P<t_LOWERID>[a-z][_a-zA-Z0-9]*)', [None, ('t_STRING', 'STRING'), None, None, None, None, ('t_LOWERID', 'LOWERID')]), ('(?P<t_UPPERID>[A-Z][_a-zA-Z0-9]*)|(?P<t_NUMBER>\\d+)|(?P<t_Comment>\\--.*\\n?)|(?P<t_ignore_newline>\\n+)', [None, ('t_UPPERID', 'UPPERID'), ('t_NUMBER', 'NUMBER'), ('t_Comment', 'Comment'), ('t_ignore_newline', 'ignore_newline')]), ('(?P<t_LAMBDA>(\\\\))|(?P<t_OR>\\|\\|)|(?P<t_AND>&&)|(?P<t_ARROW>->)|(?P<t_EQ>==)|(?P<t_GE>>=)|(?P<t_LE><=)', [None, (None, 'LAMBDA'), None, (None, 'OR'), (None, 'AND'), (None, 'ARROW'), (None, 'EQ'), (None, 'GE'), (None, 'LE')]), ('(?P<t_LPAREN>\\()|(?P<t_NE>!=)|(?P<t_PIPE>\\|)|(?P<t_PLUS>\\+)|(?P<t_RPAREN>\\))|(?P<t_TIMES>\\*)|(?P<t_DEFEQ>=)|(?P<t_DIV>/)|(?P<t_GT>>)|(?P<t_LT><)|(?P<t_MINUS>-)|(?P<t_MOD>%)|(?P<t_NOT>!)|(?P<t_SEMICOLON>;)', [None, (None, 'LPAREN'), (None, 'NE'), (None, 'PIPE'), (None, 'PLUS'), (None, 'RPAREN'), (None, 'TIMES'), (None, 'DEFEQ'), (None, 'DIV'), (None, 'GT'), (None, 'LT'), (None, 'MINUS'), (None, 'MOD'), (None, 'NOT'), (None, 'SEMICOLON')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
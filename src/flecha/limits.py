@@ -0,0 +1,173 @@
+import time
+from typing import TextIO
+from flecha.ast import *
+from flecha.interpreter import Interpreter, LocalEnv, Value
+from flecha.resolver import Frame
+
+# Cada cuántos pasos se controlan el tiempo y la memoria.
+BATCH = 4096
+# Bits de un entero por celda de memoria.
+WORD_BITS = 64
+# Operandos desde los que una operación aritmética puede tardar: antes se controlan los límites.
+BIG_INT_BITS = 1 << 16
+
+
+class LimitExceeded(Exception):
+    ''' Una evaluación superó uno de sus Limits. No es un RuntimeError, así que los errores
+    de los programas y el límite se distinguen. steps, seconds y heap son lo usado hasta
+    el momento del error.'''
+
+    def __init__(self, message: str, limits: 'Limits'):
+        super().__init__(f'{message} ({limits})')
+        self.steps = limits.steps
+        self.seconds = limits.elapsed()
+        self.heap = limits.heap
+
+
+class StepLimitExceeded(LimitExceeded):
+    pass
+
+
+class TimeLimitExceeded(LimitExceeded):
+    pass
+
+
+class HeapLimitExceeded(LimitExceeded):
+    pass
+
+
+class Limits:
+    ''' Límites de una evaluación: cantidad de pasos (aplicaciones, let y case evaluados),
+    tiempo en segundos y memoria en celdas. None es sin límite.
+
+    La memoria se aproxima contando lo que se asigna: una celda por paso (la ligadura que
+    agrega al entorno), por closure, por valor de una estructura o caracter de un string y
+    por cada WORD_BITS bits del resultado de una operación aritmética. No se descuenta lo
+    que se libera, así que limita lo que asigna toda la evaluación.'''
+
+    def __init__(self, steps: int | None = None, seconds: float | None = None, heap: int | None = None,
+                 batch: int = BATCH):
+        for name, limit in (('pasos', steps), ('segundos', seconds), ('celdas', heap), ('lote', batch)):
+            if limit is not None and limit <= 0:
+                raise RuntimeError(f"Límite de {name} inválido: {limit}")
+        self.max_steps = steps
+        self.max_seconds = seconds
+        self.max_heap = heap
+        self.batch = batch
+        self.steps = 0
+        self.heap = 0
+        self._start = None
+
+    def __str__(self):
+        return f'{self.steps} pasos, {self.elapsed():.3f} s, {self.heap} celdas'
+
+    def elapsed(self) -> float:
+        return 0.0 if self._start is None else time.perf_counter() - self._start
+
+    def check(self):
+        ''' Controla los límites con lo usado hasta ahora. El tiempo se cuenta desde el
+        primer control, que se hace antes del primer paso.'''
+        if self._start is None:
+            self._start = time.perf_counter()
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            raise StepLimitExceeded(f"Se excedió el límite de {self.max_steps} pasos", self)
+        if self.max_heap is not None and self.heap > self.max_heap:
+            raise HeapLimitExceeded(f"Se excedió el límite de {self.max_heap} celdas de memoria", self)
+        if self.max_seconds is not None and self.elapsed() > self.max_seconds:
+            raise TimeLimitExceeded(f"Se excedió el límite de {self.max_seconds} segundos", self)
+
+    def fuel(self) -> int:
+        ''' Pasos que se pueden dar antes del próximo control'''
+        if self.max_steps is None:
+            return self.batch
+        return min(self.batch, self.max_steps - self.steps)
+
+
+class LimitedInterpreter(Interpreter):
+    ''' Intérprete tree que evalúa dentro de limits y lanza un LimitExceeded cuando se
+    supera alguno. Los pasos se descuentan de un contador y los límites se controlan cada
+    limits.batch pasos (el de pasos se respeta exacto, los demás pueden pasarse por lo que
+    se usa en un lote). Las operaciones con enteros grandes pueden tardar y asignar mucho
+    en un solo paso: antes de operar con enteros de más de BIG_INT_BITS bits y después de
+    asignar más de un lote de celdas se controlan los límites sin esperar al fin del lote.
+    El Interpreter sin límites no cambia.'''
+
+    def __init__(self, output: TextIO, limits: Limits, memo=None) -> None:
+        super().__init__(output, memo)
+        self.limits = limits
+        # Pasos que quedan y que se dieron en el lote actual, y celdas asignadas en él.
+        self._fuel = 0
+        self._given = 0
+        self._cells = 0
+
+    def eval_program(self, ast: Program, env: Frame):
+        try:
+            for d in ast.definitions():
+                self.eval_definition(d, env)
+            return self._global_env.lookup('main')
+        finally:
+            self.settle()
+
+    def eval(self, ast: AstNode, env: Frame | LocalEnv) -> Value:
+        # El ciclo de Interpreter.eval, que cuenta un paso por cada aplicación, let o case:
+        # toda recursión pasa por ellos, y las demás expresiones son tan grandes como el fuente.
+        if type(env) is LocalEnv:
+            return self.eval_root(ast, env)
+        tail_map = self._tail_map
+        while ast.tag in tail_map:
+            self._fuel -= 1
+            if self._fuel < 0:
+                self.refuel()
+            step = tail_map[ast.tag](ast, env)
+            if type(step) is not tuple:
+                return step
+            ast, env = step
+        if ast.tag in self._eval_map:
+            return self._eval_map[ast.tag](ast, env)
+        raise RuntimeError(f"No se pudo evaluar la expresión {ast}")
+
+    def refuel(self):
+        ''' Cuenta lo usado en el lote que se terminó, controla los límites y da el próximo'''
+        self._fuel = 0
+        self.settle()
+        self.limits.check()
+        self._given = self.limits.fuel()
+        self._fuel = self._given - 1
+
+    def settle(self):
+        ''' Pasa a limits los pasos y las celdas contados desde el último control'''
+        limits = self.limits
+        steps = self._given - self._fuel
+        limits.steps += steps
+        # Cada paso liga en el entorno un parámetro, una variable o los de una rama.
+        limits.heap += steps + self._cells
+        self._given = self._fuel = self._cells = 0
+
+    def check(self):
+        ''' Controla los límites en medio de un lote, que se termina: el próximo paso empieza otro'''
+        self.settle()
+        self.limits.check()
+
+    def eval_arithmetic_op(self, left: AstNode, op: str, right: AstNode, env: Frame):
+        vL, vR = self.assert_numeric_operation(left, op, right, env)
+        if vL.bit_length() > BIG_INT_BITS or vR.bit_length() > BIG_INT_BITS:
+            self.check()
+        val = self._arithmetic_ops[op](vL, vR)
+        cells = val.bit_length() // WORD_BITS
+        if cells:
+            self._cells += cells
+            if cells >= self.limits.batch:
+                self.check()
+        return val
+
+    def eval_lambda(self, ast: ExprLambda, env: Frame) -> Value:
+        self._cells += 1
+        return super().eval_lambda(ast, env)
+
+    def eval_struct(self, ast: ExprStruct, env: Frame) -> Value:
+        self._cells += 1 + len(ast.args())
+        return super().eval_struct(ast, env)
+
+    def eval_string(self, ast: ExprString, env: Frame) -> Value:
+        self._cells += 1 + len(ast.value)
+        return super().eval_string(ast, env)
@@ -0,0 +1,277 @@
+from typing import Callable, TextIO
+from flecha.ast import *
+from flecha.interpreter import (FALSE, TRUE, VOID, ClosureValue, GlobalEnv, Primitives, StringValue, StructValue, Value,
+                                boolean_value, case_table, char_value, constructor_value, select_branch)
+from flecha.primitives import *
+from flecha.resolver import Frame, Scope, new_frame
+
+# region Instrucciones
+# Cada expresión se traduce a una tupla cuyo primer elemento es el código de instrucción.
+VAR = 0         # (VAR, depth, slot)
+GLOBAL = 1      # (GLOBAL, id)
+CONST = 2       # (CONST, value): un valor ya construido (literales y constructores sin argumentos)
+LAMBDA = 5      # (LAMBDA, param, body, padding)
+LET = 6         # (LET, slot, arg, body)
+APPLY = 7       # (APPLY, fn, arg)
+STRUCT = 8      # (STRUCT, ctor, args)
+CASE = 9        # (CASE, expr, table): table es la tabla de despacho de case_table
+PRINT_INT = 10  # (PRINT_INT, exp)
+PRINT_CHAR = 11 # (PRINT_CHAR, exp)
+NOT = 12        # (NOT, exp)
+UMINUS = 13     # (UMINUS, exp)
+BINARY = 14     # (BINARY, op, fn, relational, left, right)
+AND = 15        # (AND, left, right)
+OR = 16         # (OR, left, right)
+
+# Continuaciones: qué hacer con el valor que se acaba de calcular.
+K_APPLY_ARG = 0    # (K_APPLY_ARG, fn, frame): evaluar la función
+K_APPLY_FN = 1     # (K_APPLY_FN, arg): entrar al cuerpo de la closure
+K_LET = 2          # (K_LET, slot, body, frame)
+K_CASE = 3         # (K_CASE, table, frame)
+K_STRUCT = 4       # (K_STRUCT, ctor, args, frame, values)
+K_UNARY = 5        # (K_UNARY, instr)
+K_BINARY_LEFT = 6  # (K_BINARY_LEFT, instr, frame)
+K_BINARY = 7       # (K_BINARY, instr, left)
+K_AND = 8          # (K_AND, right, frame)
+K_OR = 9           # (K_OR, right, frame)
+K_BOOLEAN = 10     # (K_BOOLEAN,)
+# endregion
+
+Instruction = tuple
+
+_unary_instructions = {
+    Primitives.UNSAFE_PRINT_INT.value: PRINT_INT,
+    Primitives.UNSAFE_PRINT_CHAR.value: PRINT_CHAR,
+    UnaryOperators.NOT.value: NOT,
+    UnaryOperators.UMINUS.value: UMINUS,
+}
+
+
+class Machine:
+    ''' Evaluador con pila explícita.
+
+    El programa se traduce a tuplas de instrucciones con las variables ya resueltas
+    y se ejecuta en un único ciclo que guarda las continuaciones pendientes en una
+    lista de Python, de modo que la profundidad de recursión de un programa Flecha
+    sólo está limitada por la memoria disponible. Las llamadas en posición de cola
+    (cuerpo de una closure, rama de un case, cuerpo de un let) no apilan continuaciones.'''
+
+    def __init__(self, output: TextIO) -> None:
+        self._global_env = GlobalEnv()
+        self._output = output
+        self._constructors: dict[str, StructValue] = {}
+        self._translate_map: dict[Tags, Callable[[AstNode, Scope], Instruction]] = {
+            Tags.ExprVar: self.translate_var,
+            Tags.ExprNumber: lambda ast, scope: (CONST, ast.value),
+            Tags.ExprChar: lambda ast, scope: (CONST, char_value(ast.value)),
+            Tags.ExprConstructor: lambda ast, scope: (CONST, constructor_value(ast.id(), self._constructors)),
+            Tags.ExprString: lambda ast, scope: (CONST, StringValue(ast.value)),
+            Tags.ExprLambda: self.translate_lambda,
+            Tags.ExprApply: self.translate_apply,
+            Tags.ExprPrimitive: self.translate_apply,
+            Tags.ExprStruct: self.translate_apply,
+            Tags.ExprLet: self.translate_let,
+            Tags.ExprCase: self.translate_case
+        }
+
+    def run(self, program: Program) -> Value:
+        for d in program.definitions():
+            scope = Scope()
+            code = self.translate(d.expr(), scope)
+            self._global_env.assign(d.id(), self.execute(code, new_frame(None, scope.layout.size)))
+        return self._global_env.lookup('main')
+
+# region Traducción
+    def translate(self, ast: AstNode, scope: Scope) -> Instruction:
+        if ast.tag in self._translate_map:
+            return self._translate_map[ast.tag](ast, scope)
+        raise RuntimeError(f"No se pudo evaluar la expresión {ast}")
+
+    def translate_var(self, ast: ExprVar, scope: Scope) -> Instruction:
+        address = scope.address(ast.id())
+        return (GLOBAL, ast.id()) if address is None else (VAR, *address)
+
+    def translate_lambda(self, ast: ExprLambda, scope: Scope) -> Instruction:
+        body_scope = scope.function(ast.param())
+        body = self.translate(ast.body(), body_scope)
+        return (LAMBDA, ast.param(), body, [None] * (body_scope.layout.size - 2))
+
+    def translate_let(self, ast: ExprLet, scope: Scope) -> Instruction:
+        body_scope = scope.bind(ast.param())
+        return (LET, body_scope.slot(ast.param()), self.translate(ast.argExpr(), scope),
+                self.translate(ast.inExpr(), body_scope))
+
+    def translate_case(self, ast: ExprCase, scope: Scope) -> Instruction:
+        branches = []
+        for b in ast.branches():
+            slots, branch_scope = [], scope
+            for p in b.params():
+                branch_scope = branch_scope.bind(p)
+                slots.append(branch_scope.slot(p))
+            branches.append((b.id(), tuple(slots), self.translate(b.expr(), branch_scope)))
+        return (CASE, self.translate(ast.expr(), scope), case_table(branches))
+
+    def translate_apply(self, ast: ExprApply, scope: Scope) -> Instruction:
+        kind, *parts = classify_apply(ast)
+        match kind:
+            case ApplyKind.Unary:
+                op, exp = parts
+                return (_unary_instructions[op], self.translate(exp, scope))
+            case ApplyKind.Binary:
+                return self.translate_binary_op(*parts, scope)
+            case ApplyKind.Struct:
+                return self.translate_struct(ast, scope)
+        fn, arg = parts
+        return (APPLY, self.translate(fn, scope), self.translate(arg, scope))
+
+    def translate_struct(self, ast: ExprApply, scope: Scope) -> Instruction:
+        # Las listas (y los strings) anidan la cola en el último argumento:
+        # se recorre esa cadena iterativamente para no depender de su largo.
+        chain = []
+        while ast.tag in application_tags:
+            kind, *parts = classify_apply(ast)
+            if kind != ApplyKind.Struct:
+                break
+            ctor, args = parts
+            chain.append((ctor, [self.translate(a, scope) for a in args[:-1]]))
+            ast = args[-1]
+        instr = self.translate(ast, scope)
+        for ctor, args in reversed(chain):
+            instr = (STRUCT, ctor, args + [instr])
+        return instr
+
+    def translate_binary_op(self, op: str, left: AstNode, right: AstNode, scope: Scope) -> Instruction:
+        vL, vR = self.translate(left, scope), self.translate(right, scope)
+        if op == BinaryOperators.AND.value: return (AND, vL, vR)
+        if op == BinaryOperators.OR.value: return (OR, vL, vR)
+        if op in relational_ops: return (BINARY, op, relational_ops[op], True, vL, vR)
+        if op in arithmetic_ops: return (BINARY, op, arithmetic_ops[op], False, vL, vR)
+        raise RuntimeError(f"Operación no reconocida: {op}")
+# endregion
+
+    def execute(self, code: Instruction, frame: Frame) -> Value:
+        stack = []
+        push, pop = stack.append, stack.pop
+        lookup = self._global_env.lookup
+        write = self._output.write
+        while True:
+            # Evaluar code en frame hasta obtener un valor, o apilar una continuación y seguir.
+            op = code[0]
+            if op == VAR:
+                _, depth, slot = code
+                f = frame
+                for _ in range(depth):
+                    f = f[0]
+                value = f[slot]
+            elif op == GLOBAL:
+                value = lookup(code[1])
+            elif op == APPLY:
+                push((K_APPLY_ARG, code[1], frame))
+                code = code[2]
+                continue
+            elif op == BINARY:
+                push((K_BINARY_LEFT, code, frame))
+                code = code[4]
+                continue
+            elif op == CASE:
+                push((K_CASE, code[2], frame))
+                code = code[1]
+                continue
+            elif op == CONST:
+                value = code[1]
+            elif op == STRUCT:
+                push((K_STRUCT, code[1], code[2], frame, []))
+                code = code[2][0]
+                continue
+            elif op == LET:
+                push((K_LET, code[1], code[3], frame))
+                code = code[2]
+                continue
+            elif op == LAMBDA:
+                value = ClosureValue(code[1], code, frame)
+            elif op == AND:
+                push((K_AND, code[2], frame))
+                code = code[1]
+                continue
+            elif op == OR:
+                push((K_OR, code[2], frame))
+                code = code[1]
+                continue
+            else:
+                push((K_UNARY, op))
+                code = code[1]
+                continue
+
+            # Devolver value a las continuaciones pendientes hasta que alguna pida evaluar otra expresión.
+            while stack:
+                k = pop()
+                kind = k[0]
+                if kind == K_APPLY_ARG:
+                    push((K_APPLY_FN, value))
+                    code, frame = k[1], k[2]
+                    break
+                elif kind == K_APPLY_FN:
+                    cl = as_closure(value)
+                    lam = cl.body
+                    code, frame = lam[2], [cl.env, k[1], *lam[3]]
+                    break
+                elif kind == K_BINARY_LEFT:
+                    instr = k[1]
+                    push((K_BINARY, instr, value))
+                    code, frame = instr[5], k[2]
+                    break
+                elif kind == K_BINARY:
+                    instr = k[1]
+                    value = instr[2](*as_numbers(instr[1], k[2], value))
+                    if instr[3]:
+                        value = TRUE if value else FALSE
+                elif kind == K_CASE:
+                    _, table, frame = k
+                    slots, code = select_branch(table, value)
+                    if slots:
+                        for s, v in zip(slots, value.args):
+                            frame[s] = v
+                    break
+                elif kind == K_STRUCT:
+                    _, ctor, args, frame, values = k
+                    values.append(value)
+                    if len(values) == len(args):
+                        value = StructValue(ctor, values)
+                    else:
+                        push(k)
+                        code = args[len(values)]
+                        break
+                elif kind == K_LET:
+                    _, slot, code, frame = k
+                    frame[slot] = value
+                    break
+                elif kind == K_UNARY:
+                    op = k[1]
+                    if op == PRINT_INT:
+                        write(str(as_number(value)))
+                        value = VOID
+                    elif op == PRINT_CHAR:
+                        write(as_char(value))
+                        value = VOID
+                    elif op == NOT:
+                        value = boolean_value(not as_boolean(value))
+                    else:
+                        value = -as_number(value)
+                elif kind == K_AND:
+                    if not as_boolean(value):
+                        value = FALSE
+                    else:
+                        push((K_BOOLEAN,))
+                        code, frame = k[1], k[2]
+                        break
+                elif kind == K_OR:
+                    if as_boolean(value):
+                        value = TRUE
+                    else:
+                        push((K_BOOLEAN,))
+                        code, frame = k[1], k[2]
+                        break
+                else:
+                    value = boolean_value(as_boolean(value))
+            else:
+                return value
@@ -0,0 +1,157 @@
+from collections import OrderedDict
+from flecha.ast import *
+from flecha.interpreter import CharValue, StructValue, Value
+from flecha.optimizer import free_vars
+from flecha.rewrite import print_primitives, resolve_program
+
+# Cantidad máxima de enteros, caracteres y constructores en la clave de una llamada: los
+# argumentos más grandes no se memorizan.
+MAX_KEY = 256
+
+
+class MemoCache:
+    ''' Cache LRU de resultados de funciones globales, con capacidad para capacity llamadas.
+    La clave de una llamada es el nombre de la función y la estructura de sus argumentos:
+    enteros, caracteres y estructuras de ellos; las llamadas con closures no se memorizan.'''
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise RuntimeError(f"Capacidad de memoización inválida: {capacity}")
+        self.capacity = capacity
+        self._entries: OrderedDict[tuple, Value] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return (f'{self.hits} aciertos, {self.misses} fallos, {self.evictions} desalojos, '
+                f'{len(self._entries)}/{self.capacity} entradas')
+
+    def key(self, name: str, values: list[Value]) -> tuple | None:
+        tokens = [name]
+        pending = values[::-1]
+        while pending:
+            val = pending.pop()
+            cls = type(val)
+            if cls is int:
+                tokens.append(val)
+            elif cls is CharValue:
+                tokens.append(val.value)
+            elif isinstance(val, StructValue):
+                args = val.args
+                tokens.append((val.ctor, len(args)))
+                pending.extend(reversed(args))
+            elif isinstance(val, int):
+                tokens.append(int(val))
+            else:
+                return None
+            if len(tokens) > MAX_KEY:
+                return None
+        return tuple(tokens)
+
+    def get(self, key: tuple) -> Value | None:
+        val = self._entries.get(key)
+        if val is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return val
+
+    def put(self, key: tuple, val: Value):
+        entries = self._entries
+        entries[key] = val
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+
+def memoizable(program: Program) -> dict[str, int]:
+    ''' Funciones globales que conviene memorizar, con su aridad: las puras (que no alcanzan
+    un unsafePrint* ni una global indefinida o redefinida) que se llaman a sí mismas más de
+    una vez y nunca en posición de cola, como fib. Las que recorren con una sola llamada
+    recursiva no repiten cómputo, y las que tienen llamadas de cola se evalúan como siempre
+    para no perderlas: el resultado memorizado se guarda después de evaluar el cuerpo.'''
+    definitions = program.definitions()
+    counts: dict[str, int] = {}
+    for d in definitions:
+        counts[d.id()] = counts.get(d.id(), 0) + 1
+    uses = {d.id(): free_vars(d.expr()) for d in definitions if counts[d.id()] == 1 and not _prints(d.expr())}
+    pure = set(uses)
+    changed = True
+    while changed:
+        impure = {name for name in pure if not uses[name] <= pure}
+        pure -= impure
+        changed = bool(impure)
+    result = {}
+    for d in definitions:
+        if d.id() in pure:
+            params, body = _lambdas(d.expr())
+            if params and _repeats_itself(d.id(), params, body):
+                result[d.id()] = len(params)
+    return result
+
+
+def memoize_program(program: Program) -> Program:
+    ''' Resuelve el programa y envuelve el cuerpo de las funciones memorizables en un
+    ExprMemo, que el intérprete evalúa consultando su MemoCache'''
+    program = resolve_program(program)
+    arities = memoizable(program)
+    memoized = Program()
+    for d in program.definitions():
+        if d.id() in arities:
+            params, body = _lambdas(d.expr())
+            d = Definition(d.id(), build_lambda(params, ExprMemo(d.id(), params, body), d.expr().line), d.line)
+        memoized.append(d)
+    return memoized
+
+
+def _lambdas(expr: AstNode) -> tuple[list[str], AstNode]:
+    params = []
+    while expr.tag == Tags.ExprLambda:
+        params.append(expr.param())
+        expr = expr.body()
+    return params, expr
+
+
+def _prints(root: AstNode) -> bool:
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        if node.tag == Tags.ExprPrimitive and node.op() in print_primitives:
+            return True
+        if node.tag == Tags.ExprVar and node.id() in print_primitives:
+            return True
+        pending.extend(p for p in node._parts() if isinstance(p, AstNode))
+    return False
+
+
+def _repeats_itself(name: str, params: list[str], body: AstNode) -> bool:
+    ''' Si body llama a name en más de un lugar y ninguna de las llamadas es de cola'''
+    calls = tail_calls = 0
+    pending = [(body, frozenset(params), True)]
+    while pending:
+        node, bound, tail = pending.pop()
+        tag = node.tag
+        if tag == Tags.ExprVar:
+            if node.id() == name and name not in bound:
+                calls += 1
+                tail_calls += tail
+        elif tag == Tags.ExprApply:
+            # La cabeza de una aplicación en posición de cola es una llamada de cola.
+            pending.append((node.fn(), bound, tail))
+            pending.append((node.arg(), bound, False))
+        elif tag == Tags.ExprLambda:
+            pending.append((node.body(), bound | {node.param()}, False))
+        elif tag == Tags.ExprLet:
+            pending.append((node.argExpr(), bound, False))
+            pending.append((node.inExpr(), bound | {node.param()}, tail))
+        elif tag == Tags.ExprCase:
+            pending.append((node.expr(), bound, False))
+            pending.extend((b.expr(), bound | set(b.params()), tail) for b in node.branches())
+        elif tag == Tags.ExprPrimitive or tag == Tags.ExprStruct:
+            pending.extend((a, bound, False) for a in node.args())
+    return calls > 1 and not tail_calls
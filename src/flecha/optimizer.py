@@ -0,0 +1,369 @@
+from typing import Generator
+from flecha.ast import *
+from flecha.primitives import arithmetic_ops, relational_ops
+from flecha.rewrite import resolve_program
+
+# Niveles de optimización: 1 pliega las operaciones primitivas con operandos constantes y
+# los case cuyo valor se conoce al compilar; 2 además propaga los let ligados a constantes;
+# 3 además expande las definiciones globales chicas y elimina las que no se usan.
+LEVELS = (0, 1, 2, 3)
+
+# Tamaño máximo (en nodos) de una definición que se expande en los lugares donde se usa.
+INLINE_BUDGET = 40
+
+_TRUE, _FALSE = ExprConstructor('True'), ExprConstructor('False')
+_literal_tags = frozenset((Tags.ExprNumber, Tags.ExprChar, Tags.ExprConstructor, Tags.ExprString))
+_type_tags = {Tags.ExprNumber: 'Int', Tags.ExprChar: 'Char', Tags.ExprLambda: 'Closure'}
+
+
+class OptimizationReport:
+    def __init__(self):
+        self.folded = 0
+        self.cases = 0
+        self.propagated = 0
+        self.inlined = 0
+        self.removed = 0
+
+    def __str__(self):
+        return (f'{self.folded} operaciones plegadas, {self.cases} case resueltos, '
+                f'{self.propagated} let propagados, {self.inlined} llamadas expandidas, '
+                f'{self.removed} definiciones eliminadas')
+
+
+def _boolean(node: AstNode) -> bool | None:
+    if node.tag == Tags.ExprConstructor and node.id() in ('True', 'False'):
+        return node.id() == 'True'
+    return None
+
+
+def _run(visit, root: AstNode, env: dict) -> AstNode:
+    ''' Ejecuta visit(root, env) sin recursión: visit es un generador que pide optimizar un
+    subárbol haciendo yield (nodo, env) y recibe el resultado'''
+    stack = [visit(root, env)]
+    result = None
+    while stack:
+        try:
+            node, node_env = stack[-1].send(result)
+        except StopIteration as stop:
+            stack.pop()
+            result = stop.value
+            continue
+        stack.append(visit(node, node_env))
+        result = None
+    return result
+
+
+def size(root: AstNode) -> int:
+    count = 0
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        count += 1
+        pending.extend(p for p in node._parts() if isinstance(p, AstNode))
+    return count
+
+
+def is_pure(expr: AstNode) -> bool:
+    ''' Si evaluar expr no tiene efectos ni puede fallar: literales, lambdas y estructuras de ellos'''
+    pending = [expr]
+    while pending:
+        node = pending.pop()
+        if node.tag == Tags.ExprStruct:
+            pending.extend(node.args())
+        elif node.tag not in _literal_tags and node.tag != Tags.ExprLambda:
+            return False
+    return True
+
+
+def free_vars(root: AstNode) -> set[str]:
+    ''' Variables libres de una expresión'''
+    free = set()
+    pending = [(root, frozenset())]
+    while pending:
+        node, bound = pending.pop()
+        tag = node.tag
+        if tag == Tags.ExprVar:
+            if node.id() not in bound:
+                free.add(node.id())
+        elif tag == Tags.ExprLambda:
+            pending.append((node.body(), bound | {node.param()}))
+        elif tag == Tags.ExprLet:
+            pending.append((node.argExpr(), bound))
+            pending.append((node.inExpr(), bound | {node.param()}))
+        elif tag == Tags.ExprCase:
+            pending.append((node.expr(), bound))
+            pending.extend((b.expr(), bound | set(b.params())) for b in node.branches())
+        elif tag == Tags.ExprApply:
+            pending.extend(((node.fn(), bound), (node.arg(), bound)))
+        elif tag == Tags.ExprPrimitive or tag == Tags.ExprStruct:
+            pending.extend((a, bound) for a in node.args())
+    return free
+
+
+class Optimizer:
+    ''' Optimiza un programa antes de evaluarlo: pliega las operaciones primitivas cuyos
+    operandos son constantes, reemplaza los case cuyo valor se conoce por la rama que
+    corresponde y propaga los let ligados a constantes. En el nivel 3 además expande las
+    definiciones globales chicas donde se usan y elimina las que main no alcanza.
+
+    Sólo elimina expresiones constantes, que no tienen efectos, y nunca cambia el orden de
+    evaluación del resto: las salidas de unsafePrint* se mantienen. Las operaciones que
+    fallarían al evaluarlas (división por cero, tipos incorrectos) se dejan sin plegar.'''
+
+    def __init__(self, level: int = 2, inline_budget: int = INLINE_BUDGET):
+        if level not in LEVELS:
+            raise RuntimeError(f"Nivel de optimización inválido: {level}")
+        self.level = level
+        self.inline_budget = inline_budget
+        self.report = OptimizationReport()
+
+    def optimize_program(self, program: Program) -> Program:
+        program = resolve_program(program)
+        if self.level == 0:
+            return program
+        if self.level >= 3:
+            optimized = self.remove_unreachable(self.inline_globals(program.definitions()))
+        else:
+            optimized = [self.optimize_definition(d, d.expr()) for d in program.definitions()]
+        result = Program()
+        for d in optimized:
+            result.append(d)
+        return result
+
+    def optimize_definition(self, d: Definition, expr: AstNode) -> Definition:
+        expr = _run(self.visit, expr, {})
+        return d if expr is d.expr() else Definition(d.id(), expr, d.line)
+
+    def optimize(self, expr: AstNode) -> AstNode:
+        program = self.optimize_program(Program(Definition('', expr)))
+        return program.definitions()[0].expr()
+
+    def visit(self, node: AstNode, env: dict[str, AstNode]) -> Generator:
+        tag = node.tag
+        if tag == Tags.ExprVar:
+            return env.get(node.id(), node)
+        if tag == Tags.ExprPrimitive:
+            args = []
+            for a in node.args():
+                args.append((yield (a, env)))
+            return self.fold(node, args)
+        if tag == Tags.ExprStruct:
+            args = []
+            for a in node.args():
+                args.append((yield (a, env)))
+            return node if _same(args, node.args()) else ExprStruct(node.id(), args)
+        if tag == Tags.ExprApply:
+            fn = yield (node.fn(), env)
+            arg = yield (node.arg(), env)
+            return node if fn is node.fn() and arg is node.arg() else ExprApply(fn, arg)
+        if tag == Tags.ExprLambda:
+            body = yield (node.body(), _without(env, (node.param(),)))
+            return node if body is node.body() else ExprLambda(node.param(), body, node.line)
+        if tag == Tags.ExprLet:
+            arg = yield (node.argExpr(), env)
+            if self.level >= 2 and arg.tag in _literal_tags:
+                self.report.propagated += 1
+                return (yield (node.inExpr(), {**env, node.param(): arg}))
+            body = yield (node.inExpr(), _without(env, (node.param(),)))
+            return node if arg is node.argExpr() and body is node.inExpr() else ExprLet(node.param(), arg, body)
+        if tag == Tags.ExprCase:
+            expr = yield (node.expr(), env)
+            known = self.select_branch(expr, node.branches())
+            if known is not None:
+                self.report.cases += 1
+                return (yield (known, env))
+            branches = []
+            for b in node.branches():
+                body = yield (b.expr(), _without(env, b.params()))
+                branches.append(b if body is b.expr() else CaseBranch(b.id(), b.params(), body, b.line))
+            if expr is node.expr() and _same(branches, node.branches()):
+                return node
+            return ExprCase(expr, CaseBranches(branches))
+        return node
+
+    def fold(self, node: ExprPrimitive, args: list[AstNode]) -> AstNode:
+        op = node.op()
+        folded = None
+        if len(args) == 1:
+            arg = args[0]
+            if op == UnaryOperators.UMINUS.value and arg.tag == Tags.ExprNumber:
+                folded = ExprNumber(-arg.value)
+            elif op == UnaryOperators.NOT.value and _boolean(arg) is not None:
+                folded = _FALSE if _boolean(arg) else _TRUE
+        else:
+            left, right = args
+            if op == BinaryOperators.AND.value or op == BinaryOperators.OR.value:
+                # La derecha sólo se evalúa si la izquierda no decide el resultado.
+                short = _boolean(left) is (op == BinaryOperators.OR.value)
+                if _boolean(left) is not None and (short or _boolean(right) is not None):
+                    folded = left if short else right
+            elif left.tag == Tags.ExprNumber and right.tag == Tags.ExprNumber:
+                if op in relational_ops:
+                    folded = _TRUE if relational_ops[op](left.value, right.value) else _FALSE
+                elif op in arithmetic_ops and not (op in ('DIV', 'MOD') and right.value == 0):
+                    folded = ExprNumber(arithmetic_ops[op](left.value, right.value))
+        if folded is not None:
+            self.report.folded += 1
+            return folded
+        return node if _same(args, node.args()) else ExprPrimitive(op, args)
+
+    def select_branch(self, expr: AstNode, branches: Sequence[CaseBranch]) -> AstNode | None:
+        ''' Si el valor de expr se conoce, la expresión equivalente a la rama que matchea'''
+        if expr.tag == Tags.ExprString:
+            expr = expr.cons()
+            if expr.tag == Tags.ExprApply:
+                expr = ExprStruct('Cons', [expr.fn().arg(), expr.arg()])
+        if expr.tag == Tags.ExprConstructor or expr.tag == Tags.ExprStruct:
+            args = expr.args() if expr.tag == Tags.ExprStruct else ()
+            for b in branches:
+                if b.id() == expr.id() and len(b.params()) == len(args):
+                    return self.bind(b.params(), args, b.expr())
+        elif expr.tag in _type_tags:
+            for b in branches:
+                if b.id() == _type_tags[expr.tag]:
+                    return b.expr()
+        return None
+
+    # region Expansión de definiciones globales
+    def inline_globals(self, definitions: Sequence[Definition]) -> list[Definition]:
+        ''' Expande las referencias a definiciones globales chicas y no recursivas: las
+        constantes se reemplazan por su valor y las aplicaciones de una función a un argumento
+        por un let. Sólo se expande una definición en las que la siguen, cuando su nombre se
+        define una única vez: son las únicas que siempre ven ese valor. Cada definición se
+        optimiza antes de decidir si se expande, así se expande ya plegada.'''
+        counts: dict[str, int] = {}
+        for d in definitions:
+            counts[d.id()] = counts.get(d.id(), 0) + 1
+        globals_of = {d.id(): free_vars(d.expr()) for d in definitions if counts[d.id()] == 1}
+        inlinable: dict[str, AstNode] = {}
+        result = []
+        for d in definitions:
+            expr = d.expr()
+            if inlinable:
+                expr = _run(lambda node, bound: self.inline(node, bound, inlinable), expr, frozenset())
+            d = self.optimize_definition(d, expr)
+            expr = d.expr()
+            result.append(d)
+            if (counts[d.id()] == 1 and (expr.tag in _literal_tags or expr.tag == Tags.ExprLambda)
+                    and size(expr) <= self.inline_budget and not _recursive(d.id(), globals_of)):
+                inlinable[d.id()] = expr
+        return result
+
+    def inline(self, node: AstNode, bound: frozenset, inlinable: dict[str, AstNode]) -> Generator:
+        tag = node.tag
+        if tag == Tags.ExprVar:
+            value = inlinable.get(node.id())
+            if value is not None and node.id() not in bound and value.tag in _literal_tags:
+                self.report.inlined += 1
+                return value
+            return node
+        if tag == Tags.ExprApply:
+            fn = node.fn()
+            arg = yield (node.arg(), bound)
+            value = inlinable.get(fn.id()) if fn.tag == Tags.ExprVar and fn.id() not in bound else None
+            if (value is not None and value.tag == Tags.ExprLambda
+                    and not (free_vars(value.body()) - {value.param()}) & bound):
+                self.report.inlined += 1
+                return ExprLet(value.param(), arg, value.body())
+            fn = yield (fn, bound)
+            applied = _beta(fn, arg, bound)
+            if applied is not None:
+                return applied
+            return node if fn is node.fn() and arg is node.arg() else ExprApply(fn, arg)
+        if tag == Tags.ExprLambda:
+            body = yield (node.body(), bound | {node.param()})
+            return node if body is node.body() else ExprLambda(node.param(), body, node.line)
+        if tag == Tags.ExprLet:
+            arg = yield (node.argExpr(), bound)
+            body = yield (node.inExpr(), bound | {node.param()})
+            return node if arg is node.argExpr() and body is node.inExpr() else ExprLet(node.param(), arg, body)
+        if tag == Tags.ExprCase:
+            expr = yield (node.expr(), bound)
+            branches = []
+            for b in node.branches():
+                body = yield (b.expr(), bound | set(b.params()))
+                branches.append(b if body is b.expr() else CaseBranch(b.id(), b.params(), body, b.line))
+            if expr is node.expr() and _same(branches, node.branches()):
+                return node
+            return ExprCase(expr, CaseBranches(branches))
+        if tag == Tags.ExprPrimitive or tag == Tags.ExprStruct:
+            args = []
+            for a in node.args():
+                args.append((yield (a, bound)))
+            if _same(args, node.args()):
+                return node
+            return ExprPrimitive(node.op(), args) if tag == Tags.ExprPrimitive else ExprStruct(node.id(), args)
+        return node
+
+    def remove_unreachable(self, definitions: list[Definition]) -> list[Definition]:
+        ''' Elimina las definiciones puras que no se alcanzan desde main ni desde las
+        definiciones que se mantienen porque evaluarlas tiene efectos'''
+        by_name: dict[str, list[Definition]] = {}
+        for d in definitions:
+            by_name.setdefault(d.id(), []).append(d)
+        reachable = {'main'}
+        pending = ['main']
+        for d in definitions:
+            if not is_pure(d.expr()):
+                pending.extend(free_vars(d.expr()))
+        while pending:
+            name = pending.pop()
+            reachable.add(name)
+            for d in by_name.get(name, ()):
+                pending.extend(n for n in free_vars(d.expr()) if n not in reachable)
+        kept = [d for d in definitions if d.id() in reachable or not is_pure(d.expr())]
+        self.report.removed += len(definitions) - len(kept)
+        return kept
+    # endregion
+
+    def bind(self, params: Sequence[str], args: Sequence[AstNode], body: AstNode) -> AstNode | None:
+        # Los argumentos se evalúan en orden con lets anidados: cada argumento no puede
+        # usar una variable con el nombre de un parámetro anterior.
+        for i in range(1, len(args)):
+            if free_vars(args[i]) & set(params[:i]):
+                return None
+        for p, a in zip(reversed(params), reversed(args)):
+            body = ExprLet(p, a, body)
+        return body
+
+
+def _recursive(name: str, globals_of: dict[str, set[str]]) -> bool:
+    ''' Si la definición name se alcanza a sí misma a través de las globales que usa'''
+    seen = set()
+    pending = list(globals_of.get(name, ()))
+    while pending:
+        g = pending.pop()
+        if g == name:
+            return True
+        if g not in seen:
+            seen.add(g)
+            pending.extend(globals_of.get(g, ()))
+    return False
+
+
+def _beta(fn: AstNode, arg: AstNode, bound: frozenset) -> AstNode | None:
+    ''' Reduce la aplicación de una lambda a un let. Si la lambda está dentro de los let de
+    una función ya expandida, sólo se reduce con un argumento constante o una variable local
+    que esos let no ocultan: se pueden evaluar después de ellos sin cambiar el orden de los
+    efectos'''
+    movable = arg.tag in _literal_tags or (arg.tag == Tags.ExprVar and arg.id() in bound)
+    lets = []
+    while fn.tag == Tags.ExprLet and movable and not (arg.tag == Tags.ExprVar and arg.id() == fn.param()):
+        lets.append(fn)
+        fn = fn.inExpr()
+    if fn.tag != Tags.ExprLambda:
+        return None
+    result = ExprLet(fn.param(), arg, fn.body())
+    for let in reversed(lets):
+        result = ExprLet(let.param(), let.argExpr(), result)
+    return result
+
+
+def _without(env: dict, names: Sequence[str]) -> dict:
+    if not env or not any(n in env for n in names):
+        return env
+    return {k: v for k, v in env.items() if k not in names}
+
+
+def _same(new: Sequence[AstNode], old: Sequence[AstNode]) -> bool:
+    return all(n is o for n, o in zip(new, old))
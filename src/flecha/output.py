@@ -0,0 +1,79 @@
+import codecs
+import io
+import sys
+from typing import BinaryIO, TextIO
+
+# Tamaño de los bloques que se escriben en la salida.
+BUFFER_SIZE = 1 << 16
+
+
+class _Sink(io.RawIOBase):
+    ''' Destino de los bloques de un OutputBuffer: los escribe tal cual en una salida binaria
+    o decodificados en una de texto'''
+
+    def __init__(self, output: TextIO | BinaryIO, encoding: str | None):
+        self._output = output
+        self._decoder = None if encoding is None else codecs.getincrementaldecoder(encoding)()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self._decoder is None:
+            self._output.write(bytes(b))
+        else:
+            self._output.write(self._decoder.decode(bytes(b)))
+        return len(b)
+
+
+class OutputBuffer:
+    ''' Salida con buffer para lo que imprimen los programas: el texto se acumula y se
+    escribe en output en bloques de size bytes, al llamar a flush() y al salir del bloque
+    with, también cuando la evaluación termina con error.
+
+    write es el de un io.TextIOWrapper, así que imprimir no ejecuta código Python. output
+    puede ser binaria (se le escribe el texto codificado con encoding) o de texto. Con
+    closefd, close() también cierra output.'''
+
+    def __init__(self, output: TextIO | BinaryIO, size: int = BUFFER_SIZE, encoding: str = 'utf-8',
+                 errors: str = 'strict', newline: str | None = '', closefd: bool = False):
+        binary = isinstance(output, (io.RawIOBase, io.BufferedIOBase))
+        self._buffer = io.BufferedWriter(_Sink(output, None if binary else encoding), buffer_size=size)
+        # El TextIOWrapper junta el texto en bloques de io.DEFAULT_BUFFER_SIZE antes de pasarlo
+        # al BufferedWriter, que es el que escribe en output en bloques de size.
+        self._text = io.TextIOWrapper(self._buffer, encoding=encoding, errors=errors, newline=newline)
+        self._output = output
+        self._closefd = closefd
+        self.size = size
+        self.write = self._text.write
+
+    def flush(self):
+        self._text.flush()
+        if hasattr(self._output, 'flush'):
+            self._output.flush()
+
+    def close(self):
+        if not self._text.closed:
+            try:
+                self.flush()
+                self._text.close()
+            finally:
+                if self._closefd:
+                    self._output.close()
+
+    def __enter__(self) -> 'OutputBuffer':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def stdout_buffer(size: int = BUFFER_SIZE) -> OutputBuffer:
+    ''' OutputBuffer sobre la salida estándar binaria, con la codificación de sys.stdout. Si
+    sys.stdout no tiene un descriptor (por ejemplo si se reemplazó), escribe en sys.stdout.'''
+    sys.stdout.flush()
+    try:
+        stream = open(sys.stdout.fileno(), 'wb', buffering=0, closefd=False)
+    except (AttributeError, OSError, ValueError):
+        return OutputBuffer(sys.stdout, size)
+    return OutputBuffer(stream, size, sys.stdout.encoding or 'utf-8', sys.stdout.errors or 'strict', None, closefd=True)
@@ -1,14 +1,48 @@
-from ply.yacc import yacc
+import threading
+from typing import Iterable
+from ply.yacc import LRParser, LRTable, VersionError, yacc
 from flecha.lexer import Lexer
+from flecha.fastlexer import FastLexer
+from flecha.hashcons import HashConsTable
 from flecha.ast import *
 
+# Módulo con las tablas LALR pregeneradas (ver flecha.tables)
+PARSETAB = 'flecha.parsetab'
+
 
 class Parser():
     tokens = Lexer.tokens
 
-    def __init__(self):
-        self.__lex = Lexer().build()
-        self.__yacc = yacc(module=self)
+    def __init__(self, tables: bool = True, print_errors: bool = True, fast_lexer: bool = False,
+                 hash_cons: HashConsTable | None = None):
+        ''' Con tables=True carga las tablas pregeneradas del lexer y del parser sin
+        inspeccionar la gramática ni escribir archivos; si no están disponibles,
+        o con tables=False, genera las tablas en memoria a partir de la gramática.
+        Con fast_lexer=True los tokens se obtienen de FastLexer en lugar de ply.lex.
+        Con hash_cons los programas parseados se internan en esa tabla.
+        Los errores de cada parse quedan en self.errors y, con print_errors, además se imprimen.'''
+        self.print_errors = print_errors
+        self.errors: list[str] = []
+        self.hash_cons = hash_cons
+        if fast_lexer:
+            self.__rules = self.__lex = FastLexer(print_errors)
+        else:
+            self.__rules = Lexer(print_errors)
+            self.__lex = self.__rules.build(tables)
+        self.__yacc = None
+        if tables:
+            try:
+                self.__yacc = self.load_tables()
+            except (ImportError, VersionError, KeyError, AttributeError):
+                pass
+        if self.__yacc is None:
+            self.__yacc = yacc(module=self, write_tables=False, debug=False)
+
+    def load_tables(self) -> LRParser:
+        table = LRTable()
+        table.read_table(PARSETAB)
+        table.bind_callables({name: getattr(self, name) for name in dir(self) if name.startswith('p_')})
+        return LRParser(table, self.p_error)
 
     precedence = (
         ('left', 'SEMICOLON'),
@@ -35,7 +69,7 @@ class Parser():
 
     def p_def(self, p):
         '''definition : DEF LOWERID parameters DEFEQ expression'''
-        p[0] = Definition(p[2], build_lambda(p[3], p[5]))
+        p[0] = Definition(p[2], build_lambda(p[3], p[5], p.lineno(1)), p.lineno(1))
 
     def p_parameters_empty(self, p):
         '''parameters :'''
@@ -65,15 +99,15 @@ class Parser():
 
     def p_ifExpression(self, p):
         '''ifExpression : IF innerExpression THEN innerExpression elseBranches'''
-        p[0] = build_if(p[2], p[4], p[5])
+        p[0] = build_if(p[2], p[4], p[5], p.lineno(1))
 
     def p_elseBranches_elif(self, p):
         '''elseBranches : ELIF innerExpression THEN innerExpression elseBranches'''
-        p[0] = CaseBranch('False', [], build_if(p[2], p[4], p[5]))
+        p[0] = CaseBranch('False', [], build_if(p[2], p[4], p[5], p.lineno(1)), p.lineno(1))
 
     def p_elseBranches_else(self, p):
         '''elseBranches : ELSE innerExpression'''
-        p[0] = CaseBranch('False', [], p[2])
+        p[0] = CaseBranch('False', [], p[2], p.lineno(1))
 
     def p_caseExpression(self, p):
         '''caseExpression : CASE innerExpression caseBranches'''
@@ -89,15 +123,15 @@ class Parser():
 
     def p_caseBranch(self, p):
         '''caseBranch : PIPE UPPERID parameters ARROW innerExpression'''
-        p[0] = CaseBranch(p[2], p[3], p[5])
+        p[0] = CaseBranch(p[2], p[3], p[5], p.lineno(1))
 
     def p_letExpression(self, p):
         '''letExpression : LET LOWERID parameters DEFEQ innerExpression IN outerExpression'''
-        p[0] = ExprLet(p[2], build_lambda(p[3], p[5]), p[7])
+        p[0] = ExprLet(p[2], build_lambda(p[3], p[5], p.lineno(1)), p[7])
 
     def p_lambdaExpression(self, p):
         '''lambdaExpression : LAMBDA parameters ARROW outerExpression'''
-        p[0] = build_lambda(p[2], p[4])
+        p[0] = build_lambda(p[2], p[4], p.lineno(1))
 
     def p_innerExpression(self, p):
         '''innerExpression : applyExpression
@@ -165,8 +199,64 @@ class Parser():
         p[0] = p[2]
 
     def p_error(self, p):
-        print(f'Syntax error at {p.value!r} | line: {p.lineno}')
+        message = f'Syntax error at {p.value!r} | line: {p.lineno}' if p else 'Syntax error at EOF'
+        self.errors.append(message)
+        if self.print_errors:
+            print(message)
 
     def parse(self, input):
+        self.errors = []
+        self.__rules.errors = self.errors
+        self.__lex.lineno = 1
         ast = self.__yacc.parse(input, lexer=self.__lex)
-        return ast
\ No newline at end of file
+        if ast is not None and self.hash_cons is not None:
+            ast = self.hash_cons.intern_program(ast)
+        return ast
+
+
+class ParseResult():
+    ''' Resultado de parsear un fuente: el AST (None si no se pudo construir) y los errores encontrados'''
+
+    def __init__(self, ast: Program | None, errors: list[str]):
+        self.ast = ast
+        self.errors = errors
+
+    def ok(self) -> bool:
+        return self.ast is not None and not self.errors
+
+    def __repr__(self):
+        return f'ParseResult({self.ast!r}, {self.errors!r})'
+
+
+__local = threading.local()
+
+
+def get_parser(fast_lexer: bool = False) -> Parser:
+    ''' Devuelve un Parser reutilizable propio del thread actual (los parsers de ply no son thread-safe)'''
+    parsers = getattr(__local, 'parsers', None)
+    if parsers is None:
+        parsers = __local.parsers = {}
+    parser = parsers.get(fast_lexer)
+    if parser is None:
+        parser = parsers[fast_lexer] = Parser(print_errors=False, fast_lexer=fast_lexer)
+    return parser
+
+
+def parse(input: str, fast_lexer: bool = False) -> Program | None:
+    ''' Parsea con el parser del thread actual, imprimiendo los errores como Parser.parse'''
+    parser = get_parser(fast_lexer)
+    ast = parser.parse(input)
+    for message in parser.errors:
+        print(message)
+    return ast
+
+
+def parse_many(sources: Iterable[str], fast_lexer: bool = False) -> list[ParseResult]:
+    ''' Parsea un lote de fuentes reutilizando las tablas y el lexer del parser del thread actual.
+    Los errores se devuelven en cada ParseResult en lugar de imprimirse.'''
+    parser = get_parser(fast_lexer)
+    results = []
+    for source in sources:
+        ast = parser.parse(source)
+        results.append(ParseResult(ast, parser.errors))
+    return results
\ No newline at end of file
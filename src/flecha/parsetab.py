@@ -0,0 +1,78 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'leftSEMICOLONleftIFCASELETLAMBDAleftTHENELSEELIFleftORleftANDrightNOTnonassocEQNEGELEGTLTleftPLUSMINUSleftTIMESleftDIVMODrightUMINUSAND ARROW CASE CHAR DEF DEFEQ DIV ELIF ELSE EQ GE GT IF IN LAMBDA LE LET LOWERID LPAREN LT MINUS MOD NE NOT NUMBER OR PIPE PLUS RPAREN SEMICOLON STRING THEN TIMES UPPERIDprogram :program : program definitiondefinition : DEF LOWERID parameters DEFEQ expressionparameters :parameters :  parameters LOWERID expression : outerExpression\n                       | secuenceExpression secuenceExpression : outerExpression SEMICOLON expressionouterExpression :  ifExpression\n                            | letExpression\n                            | lambdaExpression\n                            | caseExpression\n                            | innerExpression\n        ifExpression : IF innerExpression THEN innerExpression elseBrancheselseBranches : ELIF innerExpression THEN innerExpression elseBrancheselseBranches : ELSE innerExpressioncaseExpression : CASE innerExpression caseBranchescaseBranches :caseBranches : caseBranches caseBranchcaseBranch : PIPE UPPERID parameters ARROW innerExpressionletExpression : LET LOWERID parameters DEFEQ innerExpression IN outerExpressionlambdaExpression : LAMBDA parameters ARROW outerExpressioninnerExpression : applyExpression\n                           | binaryExpression\n                           | unaryExpressionunaryExpression : NOT innerExpression\n                           | MINUS innerExpression %prec UMINUS binaryExpression : innerExpression AND innerExpression\n                             | innerExpression OR innerExpression\n                             | innerExpression EQ innerExpression\n                             | innerExpression NE innerExpression\n                             | innerExpression GE innerExpression\n                             | innerExpression LE innerExpression\n                             | innerExpression GT innerExpression\n                             | innerExpression LT innerExpression\n                             | innerExpression PLUS innerExpression\n                             | innerExpression MINUS innerExpression\n                             | innerExpression TIMES innerExpression\n                             | innerExpression DIV innerExpression\n                             | innerExpression MOD innerExpressionapplyExpression : atomicExpressionapplyExpression : applyExpression atomicExpressionatomicExpression : LOWERIDatomicExpression : UPPERIDatomicExpression : NUMBERatomicExpression : CHARatomicExpression : STRINGatomicExpression : LPAREN expression RPAREN'
+    
+_lr_action_items = {'DEF':([0,1,2,8,9,10,11,12,13,14,15,16,21,22,23,24,27,28,29,30,49,50,51,52,54,55,56,57,58,59,60,61,62,63,64,65,66,67,71,72,75,76,78,84,88,91,92,],[-1,3,-2,-43,-3,-6,-7,-9,-10,-11,-12,-13,-23,-24,-25,-41,-44,-45,-46,-47,-18,-42,-27,-26,-8,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-17,-48,-22,-19,-14,-16,-21,-20,-15,]),'$end':([0,1,2,8,9,10,11,12,13,14,15,16,21,22,23,24,27,28,29,30,49,50,51,52,54,55,56,57,58,59,60,61,62,63,64,65,66,67,71,72,75,76,78,84,88,91,92,],[-1,0,-2,-43,-3,-6,-7,-9,-10,-11,-12,-13,-23,-24,-25,-41,-44,-45,-46,-47,-18,-42,-27,-26,-8,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-17,-48,-22,-19,-14,-16,-21,-20,-15,]),'LOWERID':([3,4,5,6,7,8,17,18,19,20,21,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,48,50,68,69,70,72,74,79,80,82,85,86,87,89,],[4,-4,6,-5,8,-43,8,47,-4,8,8,-41,8,8,-44,-45,-46,-47,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,-4,6,-42,8,6,8,-48,8,8,8,-4,8,6,8,8,]),'DEFEQ':([4,5,6,47,69,],[-4,7,-5,-4,74,]),'ARROW':([6,19,48,82,86,],[-5,-4,70,-4,89,]),'IF':([7,31,32,70,85,],[17,17,17,17,17,]),'LET':([7,31,32,70,85,],[18,18,18,18,18,]),'LAMBDA':([7,31,32,70,85,],[19,19,19,19,19,]),'CASE':([7,31,32,70,85,],[20,20,20,20,20,]),'NOT':([7,17,20,25,26,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,68,70,74,79,80,85,87,89,],[26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,]),'MINUS':([7,8,16,17,20,21,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,68,70,72,73,74,79,80,81,83,84,85,87,89,90,91,],[25,-43,42,25,25,-23,-24,-25,-41,25,25,-44,-45,-46,-47,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,42,42,-42,-27,42,42,42,42,42,42,42,42,42,-36,-37,-38,-39,-40,25,25,-48,42,25,25,25,42,42,42,25,25,25,42,42,]),'UPPERID':([7,8,17,20,21,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,50,68,70,72,74,77,79,80,85,87,89,],[27,-43,27,27,27,-41,27,27,-44,-45,-46,-47,27,27,27,27,27,27,27,27,27,27,27,27,27,27,27,-42,27,27,-48,27,82,27,27,27,27,27,]),'NUMBER':([7,8,17,20,21,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,50,68,70,72,74,79,80,85,87,89,],[28,-43,28,28,28,-41,28,28,-44,-45,-46,-47,28,28,28,28,28,28,28,28,28,28,28,28,28,28,28,-42,28,28,-48,28,28,28,28,28,28,]),'CHAR':([7,8,17,20,21,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,50,68,70,72,74,79,80,85,87,89,],[29,-43,29,29,29,-41,29,29,-44,-45,-46,-47,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,-42,29,29,-48,29,29,29,29,29,29,]),'STRING':([7,8,17,20,21,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,50,68,70,72,74,79,80,85,87,89,],[30,-43,30,30,30,-41,30,30,-44,-45,-46,-47,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,-42,30,30,-48,30,30,30,30,30,30,]),'LPAREN':([7,8,17,20,21,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,50,68,70,72,74,79,80,85,87,89,],[31,-43,31,31,31,-41,31,31,-44,-45,-46,-47,31,31,31,31,31,31,31,31,31,31,31,31,31,31,31,-42,31,31,-48,31,31,31,31,31,31,]),'AND':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,33,-23,-24,-25,-41,-44,-45,-46,-47,33,33,-42,-27,-26,-28,33,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-48,33,33,33,33,33,33,]),'OR':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,34,-23,-24,-25,-41,-44,-45,-46,-47,34,34,-42,-27,-26,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-48,34,34,34,34,34,34,]),'EQ':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,35,-23,-24,-25,-41,-44,-45,-46,-47,35,35,-42,-27,35,35,35,None,None,None,None,None,None,-36,-37,-38,-39,-40,-48,35,35,35,35,35,35,]),'NE':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,36,-23,-24,-25,-41,-44,-45,-46,-47,36,36,-42,-27,36,36,36,None,None,None,None,None,None,-36,-37,-38,-39,-40,-48,36,36,36,36,36,36,]),'GE':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,37,-23,-24,-25,-41,-44,-45,-46,-47,37,37,-42,-27,37,37,37,None,None,None,None,None,None,-36,-37,-38,-39,-40,-48,37,37,37,37,37,37,]),'LE':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,38,-23,-24,-25,-41,-44,-45,-46,-47,38,38,-42,-27,38,38,38,None,None,None,None,None,None,-36,-37,-38,-39,-40,-48,38,38,38,38,38,38,]),'GT':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,39,-23,-24,-25,-41,-44,-45,-46,-47,39,39,-42,-27,39,39,39,None,None,None,None,None,None,-36,-37,-38,-39,-40,-48,39,39,39,39,39,39,]),'LT':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,40,-23,-24,-25,-41,-44,-45,-46,-47,40,40,-42,-27,40,40,40,None,None,None,None,None,None,-36,-37,-38,-39,-40,-48,40,40,40,40,40,40,]),'PLUS':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,41,-23,-24,-25,-41,-44,-45,-46,-47,41,41,-42,-27,41,41,41,41,41,41,41,41,41,-36,-37,-38,-39,-40,-48,41,41,41,41,41,41,]),'TIMES':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,43,-23,-24,-25,-41,-44,-45,-46,-47,43,43,-42,-27,43,43,43,43,43,43,43,43,43,43,43,-38,-39,-40,-48,43,43,43,43,43,43,]),'DIV':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,44,-23,-24,-25,-41,-44,-45,-46,-47,44,44,-42,-27,44,44,44,44,44,44,44,44,44,44,44,44,-39,-40,-48,44,44,44,44,44,44,]),'MOD':([8,16,21,22,23,24,27,28,29,30,46,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,81,83,84,90,91,],[-43,45,-23,-24,-25,-41,-44,-45,-46,-47,45,45,-42,-27,45,45,45,45,45,45,45,45,45,45,45,45,-39,-40,-48,45,45,45,45,45,45,]),'SEMICOLON':([8,10,12,13,14,15,16,21,22,23,24,27,28,29,30,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,71,72,75,76,78,84,88,91,92,],[-43,32,-9,-10,-11,-12,-13,-23,-24,-25,-41,-44,-45,-46,-47,-18,-42,-27,-26,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-17,-48,-22,-19,-14,-16,-21,-20,-15,]),'THEN':([8,21,22,23,24,27,28,29,30,46,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,83,],[-43,-23,-24,-25,-41,-44,-45,-46,-47,68,-42,-27,-26,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-48,87,]),'PIPE':([8,21,22,23,24,27,28,29,30,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,71,72,76,91,],[-43,-23,-24,-25,-41,-44,-45,-46,-47,-18,-42,-27,-26,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,77,-48,-19,-20,]),'RPAREN':([8,10,11,12,13,14,15,16,21,22,23,24,27,28,29,30,49,50,51,52,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,71,72,75,76,78,84,88,91,92,],[-43,-6,-7,-9,-10,-11,-12,-13,-23,-24,-25,-41,-44,-45,-46,-47,-18,-42,-27,-26,72,-8,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-17,-48,-22,-19,-14,-16,-21,-20,-15,]),'ELIF':([8,21,22,23,24,27,28,29,30,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,90,],[-43,-23,-24,-25,-41,-44,-45,-46,-47,-42,-27,-26,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-48,79,79,]),'ELSE':([8,21,22,23,24,27,28,29,30,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,73,90,],[-43,-23,-24,-25,-41,-44,-45,-46,-47,-42,-27,-26,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-48,80,80,]),'IN':([8,21,22,23,24,27,28,29,30,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,72,81,],[-43,-23,-24,-25,-41,-44,-45,-46,-47,-42,-27,-26,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-48,85,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'definition':([1,],[2,]),'parameters':([4,19,47,82,],[5,48,69,86,]),'expression':([7,31,32,],[9,53,54,]),'outerExpression':([7,31,32,70,85,],[10,10,10,75,88,]),'secuenceExpression':([7,31,32,],[11,11,11,]),'ifExpression':([7,31,32,70,85,],[12,12,12,12,12,]),'letExpression':([7,31,32,70,85,],[13,13,13,13,13,]),'lambdaExpression':([7,31,32,70,85,],[14,14,14,14,14,]),'caseExpression':([7,31,32,70,85,],[15,15,15,15,15,]),'innerExpression':([7,17,20,25,26,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,68,70,74,79,80,85,87,89,],[16,46,49,51,52,16,16,55,56,57,58,59,60,61,62,63,64,65,66,67,73,16,81,83,84,16,90,91,]),'applyExpression':([7,17,20,25,26,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,68,70,74,79,80,85,87,89,],[21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,]),'binaryExpression':([7,17,20,25,26,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,68,70,74,79,80,85,87,89,],[22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,]),'unaryExpression':([7,17,20,25,26,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,68,70,74,79,80,85,87,89,],[23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,]),'atomicExpression':([7,17,20,21,25,26,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,68,70,74,79,80,85,87,89,],[24,24,24,50,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,]),'caseBranches':([49,],[71,]),'caseBranch':([71,],[76,]),'elseBranches':([73,90,],[78,92,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> <empty>','program',0,'p_program_empty','parser.py',47),
+  ('program -> program definition','program',2,'p_program','parser.py',51),
+  ('definition -> DEF LOWERID parameters DEFEQ expression','definition',5,'p_def','parser.py',56),
+  ('parameters -> <empty>','parameters',0,'p_parameters_empty','parser.py',60),
+  ('parameters -> parameters LOWERID','parameters',2,'p_parameters','parser.py',64),
+  ('expression -> outerExpression','expression',1,'p_expression_outerExpression','parser.py',68),
+  ('expression -> secuenceExpression','expression',1,'p_expression_outerExpression','parser.py',69),
+  ('secuenceExpression -> outerExpression SEMICOLON expression','secuenceExpression',3,'p_sequence_expression','parser.py',73),
+  ('outerExpression -> ifExpression','outerExpression',1,'p_outerExpression','parser.py',77),
+  ('outerExpression -> letExpression','outerExpression',1,'p_outerExpression','parser.py',78),
+  ('outerExpression -> lambdaExpression','outerExpression',1,'p_outerExpression','parser.py',79),
+  ('outerExpression -> caseExpression','outerExpression',1,'p_outerExpression','parser.py',80),
+  ('outerExpression -> innerExpression','outerExpression',1,'p_outerExpression','parser.py',81),
+  ('ifExpression -> IF innerExpression THEN innerExpression elseBranches','ifExpression',5,'p_ifExpression','parser.py',86),
+  ('elseBranches -> ELIF innerExpression THEN innerExpression elseBranches','elseBranches',5,'p_elseBranches_elif','parser.py',90),
+  ('elseBranches -> ELSE innerExpression','elseBranches',2,'p_elseBranches_else','parser.py',94),
+  ('caseExpression -> CASE innerExpression caseBranches','caseExpression',3,'p_caseExpression','parser.py',98),
+  ('caseBranches -> <empty>','caseBranches',0,'p_caseBranches_empty','parser.py',102),
+  ('caseBranches -> caseBranches caseBranch','caseBranches',2,'p_caseBranches_caseBranch','parser.py',106),
+  ('caseBranch -> PIPE UPPERID parameters ARROW innerExpression','caseBranch',5,'p_caseBranch','parser.py',110),
+  ('letExpression -> LET LOWERID parameters DEFEQ innerExpression IN outerExpression','letExpression',7,'p_letExpression','parser.py',114),
+  ('lambdaExpression -> LAMBDA parameters ARROW outerExpression','lambdaExpression',4,'p_lambdaExpression','parser.py',118),
+  ('innerExpression -> applyExpression','innerExpression',1,'p_innerExpression','parser.py',122),
+  ('innerExpression -> binaryExpression','innerExpression',1,'p_innerExpression','parser.py',123),
+  ('innerExpression -> unaryExpression','innerExpression',1,'p_innerExpression','parser.py',124),
+  ('unaryExpression -> NOT innerExpression','unaryExpression',2,'p_unaryOperation','parser.py',128),
+  ('unaryExpression -> MINUS innerExpression','unaryExpression',2,'p_unaryOperation','parser.py',129),
+  ('binaryExpression -> innerExpression AND innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',136),
+  ('binaryExpression -> innerExpression OR innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',137),
+  ('binaryExpression -> innerExpression EQ innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',138),
+  ('binaryExpression -> innerExpression NE innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',139),
+  ('binaryExpression -> innerExpression GE innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',140),
+  ('binaryExpression -> innerExpression LE innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',141),
+  ('binaryExpression -> innerExpression GT innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',142),
+  ('binaryExpression -> innerExpression LT innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',143),
+  ('binaryExpression -> innerExpression PLUS innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',144),
+  ('binaryExpression -> innerExpression MINUS innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',145),
+  ('binaryExpression -> innerExpression TIMES innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',146),
+  ('binaryExpression -> innerExpression DIV innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',147),
+  ('binaryExpression -> innerExpression MOD innerExpression','binaryExpression',3,'p_binaryExpression','parser.py',148),
+  ('applyExpression -> atomicExpression','applyExpression',1,'p_applyExpression_atomic','parser.py',155),
+  ('applyExpression -> applyExpression atomicExpression','applyExpression',2,'p_applyExpression','parser.py',159),
+  ('atomicExpression -> LOWERID','atomicExpression',1,'p_atomicExpression_lowerid','parser.py',163),
+  ('atomicExpression -> UPPERID','atomicExpression',1,'p_atomicExpression_upperid','parser.py',167),
+  ('atomicExpression -> NUMBER','atomicExpression',1,'p_atomicExpression_number','parser.py',171),
+  ('atomicExpression -> CHAR','atomicExpression',1,'p_atomicExpression_char','parser.py',175),
+  ('atomicExpression -> STRING','atomicExpression',1,'p_atomicExpression_string','parser.py',179),
+  ('atomicExpression -> LPAREN expression RPAREN','atomicExpression',3,'p_atomicExpression_parenthesis','parser.py',183),
+]
@@ -0,0 +1,39 @@
+from flecha.ast import *
+from flecha.interpreter import FALSE, TRUE, CharValue, ClosureValue, Value, arithmetic_ops, relational_ops
+from flecha.rewrite import ApplyKind, application_tags, binary_primitives, classify_apply, unary_primitives
+
+# Los enteros son int de Python; int(val) sólo se usa para subclases como IntValue.
+def as_number(val: Value) -> int:
+    if type(val) is int:
+        return val
+    if not isinstance(val, int):
+        raise RuntimeError(f"El valor {val} no se puede evaluar como número")
+    return int(val)
+
+
+def as_char(val: Value) -> str:
+    if type(val) is not CharValue:
+        raise RuntimeError(f"El valor {val} no se puede evaluar como char")
+    return val.value
+
+
+def as_closure(val: Value) -> Value:
+    if type(val) is not ClosureValue:
+        raise RuntimeError(f"El valor {val} no se puede evaluar como closure")
+    return val
+
+
+def as_boolean(val: Value) -> bool:
+    if val is TRUE:
+        return True
+    if val is not FALSE:
+        raise RuntimeError(f"El valor {val} no se puede evaluar como booleano")
+    return False
+
+
+def as_numbers(op: str, l: Value, r: Value) -> tuple[int, int]:
+    if type(l) is not int or type(r) is not int:
+        if not (isinstance(l, int) and isinstance(r, int)):
+            raise RuntimeError(f"El operador {op} solo se puede usar con números")
+        return (int(l), int(r))
+    return (l, r)
@@ -0,0 +1,181 @@
+import time
+from typing import TextIO
+from flecha.ast import *
+from flecha.interpreter import Interpreter, LocalEnv, Value
+from flecha.resolver import Frame
+
+
+class ProfileEntry:
+    ''' Lo medido para una función o rama: llamadas, tiempo total (sin contar dos veces las
+    llamadas recursivas), tiempo propio (sin las llamadas que hace) y valores asignados'''
+    __slots__ = ('label', 'calls', 'total', 'own', 'allocations')
+
+    def __init__(self, label: str):
+        self.label = label
+        self.calls = 0
+        self.total = 0
+        self.own = 0
+        self.allocations = 0
+
+
+class ProfilingInterpreter(Interpreter):
+    ''' Intérprete tree que mide el tiempo, las llamadas y las asignaciones (closures,
+    estructuras y strings) de cada definición global, lambda y rama de case. Cada una se
+    identifica por la definición que la contiene y su línea en el fuente:
+
+        fib:1           llamadas a fib (la lambda más interna de sus parámetros)
+        fib/False:1     rama False (el else de un if) de un case de fib
+        main/lambda:4   lambda dentro de main
+        main:3          evaluación de la definición main, si no es una función
+
+    Las llamadas de cola reemplazan el marco de la función que las hace, como la pila del
+    intérprete. El Interpreter sin perfilar no cambia: medir sólo cuesta si se usa esta clase.'''
+
+    def __init__(self, output: TextIO, memo=None, clock=time.perf_counter_ns) -> None:
+        super().__init__(output, memo)
+        self._clock = clock
+        self.entries: dict[str, ProfileEntry] = {}
+        # Pilas de llamadas, numeradas: (número de la pila sin el último marco, label) -> número.
+        # El tiempo propio de cada una (para los flamegraphs) se acumula en _stack_times.
+        self._stacks: dict[tuple[int, str], int] = {}
+        self._stack_keys: list[tuple[int, str]] = []
+        self._stack_times: list[int] = []
+        # Nombre de lo que se evalúa al entrar a cada cuerpo: id(cuerpo) -> (cuerpo, label).
+        self._labels: dict[int, tuple[AstNode, str]] = {}
+        # Marcos abiertos: [label, inicio, tiempo de las llamadas hechas desde el marco, pila].
+        self._frames: list[list] = []
+        self._active: dict[str, int] = {}
+        # Marcos que abrió el eval en curso: las llamadas de cola los reemplazan.
+        self._base = 0
+
+    def eval_program(self, ast: Program, env: Frame):
+        for d in ast.definitions():
+            self.label_definition(d)
+        for d in ast.definitions():
+            self.eval_definition(d, env)
+        return self._global_env.lookup('main')
+
+    def label_definition(self, d: Definition):
+        name = d.id()
+        # Cada lambda va con el label de la función a la que pertenece si es un parámetro
+        # más de ella (como y en `\x -> \y -> ...`), o None si empieza una función nueva.
+        pending = [(d.expr(), _label(name, d.line))]
+        while pending:
+            node, function = pending.pop()
+            if node.tag == Tags.ExprLambda:
+                function = function or _label(f'{name}/lambda', node.line)
+                body = node.body()
+                if body.tag == Tags.ExprLambda:
+                    # La llamada se cuenta al aplicar la lambda más interna.
+                    pending.append((body, function))
+                else:
+                    self._labels[id(body)] = (body, function)
+                    pending.append((body, None))
+                continue
+            if node.tag == Tags.CaseBranch:
+                self._labels[id(node.expr())] = (node.expr(), _label(f'{name}/{node.id()}', node.line))
+            pending.extend((p, None) for p in node._parts() if isinstance(p, AstNode))
+
+    def eval_definition(self, ast: Definition, env: Frame) -> Value:
+        if ast.expr().tag == Tags.ExprLambda:
+            return super().eval_definition(ast, env)
+        depth = len(self._frames)
+        self.enter(_label(ast.id(), ast.line))
+        try:
+            return super().eval_definition(ast, env)
+        finally:
+            self.leave(depth)
+
+    def eval(self, ast: AstNode, env: Frame | LocalEnv) -> Value:
+        base = self._base
+        self._base = len(self._frames)
+        try:
+            return super().eval(ast, env)
+        finally:
+            self.leave(self._base)
+            self._base = base
+
+    def tail_call(self, ast: ExprApply, env: Frame) -> tuple[AstNode, Frame]:
+        body, env = super().tail_call(ast, env)
+        self.leave(self._base)
+        self.enter_body(body)
+        return (body, env)
+
+    def tail_case(self, ast: ExprCase, env: Frame) -> tuple[AstNode, Frame]:
+        expr, env = super().tail_case(ast, env)
+        self.enter_body(expr)
+        return (expr, env)
+
+    def eval_lambda(self, ast: ExprLambda, env: Frame) -> Value:
+        self.allocated()
+        return super().eval_lambda(ast, env)
+
+    def eval_struct(self, ast: ExprStruct, env: Frame) -> Value:
+        val = super().eval_struct(ast, env)
+        self.allocated()
+        return val
+
+    def eval_string(self, ast: ExprString, env: Frame) -> Value:
+        self.allocated()
+        return super().eval_string(ast, env)
+
+    def enter_body(self, body: AstNode):
+        entry = self._labels.get(id(body))
+        if entry is not None and entry[0] is body:
+            self.enter(entry[1])
+
+    def enter(self, label: str):
+        entry = self.entries.get(label)
+        if entry is None:
+            entry = self.entries[label] = ProfileEntry(label)
+        entry.calls += 1
+        self._active[label] = self._active.get(label, 0) + 1
+        key = (self._frames[-1][3] if self._frames else -1, label)
+        stack = self._stacks.get(key)
+        if stack is None:
+            stack = self._stacks[key] = len(self._stack_keys)
+            self._stack_keys.append(key)
+            self._stack_times.append(0)
+        self._frames.append([label, self._clock(), 0, stack])
+
+    def leave(self, depth: int):
+        ''' Cierra los marcos abiertos por encima de depth'''
+        frames = self._frames
+        while len(frames) > depth:
+            label, start, inner, stack = frames.pop()
+            elapsed = self._clock() - start
+            entry = self.entries[label]
+            entry.own += elapsed - inner
+            self._stack_times[stack] += elapsed - inner
+            self._active[label] -= 1
+            if not self._active[label]:
+                entry.total += elapsed
+            if frames:
+                frames[-1][2] += elapsed
+
+    def allocated(self):
+        if self._frames:
+            self.entries[self._frames[-1][0]].allocations += 1
+
+    def report(self, output: TextIO):
+        ''' Escribe una tabla con lo medido, de mayor a menor tiempo propio'''
+        output.write(f'{"llamadas":>10} {"total ms":>11} {"propio ms":>11} {"asignaciones":>12}  nombre\n')
+        for e in sorted(self.entries.values(), key=lambda e: (-e.own, e.label)):
+            output.write(f'{e.calls:>10} {e.total / 1e6:>11.3f} {e.own / 1e6:>11.3f} {e.allocations:>12}  {e.label}\n')
+
+    def stacks(self) -> dict[str, int]:
+        ''' Tiempo propio en ns de cada pila de llamadas, como `main:3;fib:1;fib/False:1`'''
+        paths: list[str] = []
+        for parent, label in self._stack_keys:
+            paths.append(label if parent < 0 else f'{paths[parent]};{label}')
+        return dict(zip(paths, self._stack_times))
+
+    def collapsed(self, output: TextIO):
+        ''' Escribe el tiempo propio de cada pila de llamadas en microsegundos, una por línea
+        con el formato `main:3;fib:1;fib/False:1 1234` que leen flamegraph.pl y speedscope'''
+        for path, ns in sorted(self.stacks().items()):
+            output.write(f'{path} {ns // 1000}\n')
+
+
+def _label(name: str, line: int | None) -> str:
+    return name if line is None else f'{name}:{line}'
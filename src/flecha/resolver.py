@@ -0,0 +1,189 @@
+from typing import Callable
+from flecha.ast import *
+
+Address = tuple[int, int]
+Frame = list
+
+# Cada función (lambda o definición) tiene un único frame de tamaño fijo:
+# el slot 0 apunta al frame de la función que la contiene y los demás slots
+# guardan el parámetro y todas las variables ligadas en el cuerpo (let y
+# parámetros de ramas del case), sin atravesar lambdas anidadas.
+PARENT_SLOT = 0
+PARAM_SLOT = 1
+
+
+class FrameLayout:
+    ''' Lleva la cuenta de los slots reservados para el frame de una función'''
+
+    def __init__(self):
+        self.size = PARAM_SLOT
+
+    def allocate(self) -> int:
+        slot = self.size
+        self.size += 1
+        return slot
+
+
+class Scope:
+    ''' Ámbito léxico estático: asocia a cada variable local su dirección (profundidad, slot).
+
+    Los ámbitos son persistentes: bind y function devuelven un ámbito nuevo,
+    de modo que las ligaduras de una rama o de un let no se filtran a sus hermanos.'''
+
+    def __init__(self, parent: 'Scope | None' = None, layout: FrameLayout = None, slots: dict[str, int] = None):
+        self.parent = parent
+        self.layout = layout or FrameLayout()
+        self._slots = slots or {}
+
+    def bind(self, id: str) -> 'Scope':
+        return Scope(self.parent, self.layout, {**self._slots, id: self.layout.allocate()})
+
+    def function(self, param: str) -> 'Scope':
+        return Scope(self, FrameLayout()).bind(param)
+
+    def slot(self, id: str) -> int:
+        return self._slots[id]
+
+    def address(self, id: str) -> Address | None:
+        depth, scope = 0, self
+        while scope is not None:
+            if id in scope._slots:
+                return (depth, scope._slots[id])
+            depth, scope = depth + 1, scope.parent
+        return None
+
+
+def new_frame(parent: Frame | None, size: int) -> Frame:
+    frame = [None] * size
+    frame[PARENT_SLOT] = parent
+    return frame
+
+
+def frame_getter(address: Address) -> Callable[[Frame], object]:
+    ''' Devuelve una función que lee la dirección dada a partir del frame actual'''
+    depth, slot = address
+    if depth == 0:
+        return lambda f: f[slot]
+    if depth == 1:
+        return lambda f: f[PARENT_SLOT][slot]
+    if depth == 2:
+        return lambda f: f[PARENT_SLOT][PARENT_SLOT][slot]
+
+    def getter(f):
+        for _ in range(depth):
+            f = f[PARENT_SLOT]
+        return f[slot]
+    return getter
+
+
+def frame_value(frame: Frame, depth: int, slot: int):
+    for _ in range(depth):
+        frame = frame[PARENT_SLOT]
+    return frame[slot]
+
+
+def address(root: AstNode, scope: Scope) -> AstNode:
+    ''' Reescribe root (con las primitivas ya resueltas, ver flecha.rewrite) para evaluarlo
+    sobre frames: las variables locales de scope y de root pasan a ser ExprLocal, y cada
+    lambda y definición guarda el tamaño de su frame (size), cada let y rama los slots que
+    liga (slot, slots) y cada ExprMemo las direcciones de sus parámetros (addresses).
+
+    Los nodos que ligan variables se construyen de nuevo en cada lugar donde aparecen, así
+    que los subárboles compartidos reciben las direcciones que les corresponden en cada uno.
+    El recorrido es iterativo: done guarda los nodos ya reescritos y cada nodo pendiente
+    toma los de sus partes al armarse.'''
+    done: list[AstNode] = []
+    pending: list[tuple[AstNode, Scope | list[Scope], bool]] = [(root, scope, False)]
+    while pending:
+        node, scope, ready = pending.pop()
+        tag = node.tag
+        if ready:
+            done.append(_rebuild(node, scope, done))
+            continue
+        match tag:
+            case Tags.ExprVar:
+                location = scope.address(node.id())
+                done.append(node if location is None else ExprLocal(node.id(), *location))
+                continue
+            case Tags.ExprApply:
+                pending.append((node, scope, True))
+                pending.append((node.arg(), scope, False))
+                pending.append((node.fn(), scope, False))
+                continue
+            case Tags.ExprLambda:
+                inner = scope.function(node.param())
+                parts = [(node.body(), inner)]
+            case Tags.ExprLet:
+                inner = scope.bind(node.param())
+                parts = [(node.argExpr(), scope), (node.inExpr(), inner)]
+            case Tags.ExprCase:
+                inner = []
+                parts = [(node.expr(), scope)]
+                for b in node.branches():
+                    branch_scope = scope
+                    for p in b.params():
+                        branch_scope = branch_scope.bind(p)
+                    inner.append(branch_scope)
+                    parts.append((b.expr(), branch_scope))
+            case Tags.Definition:
+                inner = Scope(scope, FrameLayout())
+                parts = [(node.expr(), inner)]
+            case Tags.Program:
+                inner = scope
+                parts = [(d, scope) for d in node.definitions()]
+            case Tags.ExprPrimitive | Tags.ExprStruct:
+                inner = scope
+                parts = [(a, scope) for a in node.args()]
+            case Tags.ExprMemo:
+                inner = scope
+                parts = [(node.body(), scope)]
+            case _:
+                done.append(node)
+                continue
+        pending.append((node, inner, True))
+        pending.extend((p, s, False) for p, s in reversed(parts))
+    return done[0]
+
+
+def _rebuild(node: AstNode, inner: Scope | list[Scope], done: list[AstNode]) -> AstNode:
+    match node.tag:
+        case Tags.ExprLambda:
+            new = ExprLambda(node.param(), done.pop(), node.line)
+            new.size = inner.layout.size
+        case Tags.ExprLet:
+            in_expr, arg = done.pop(), done.pop()
+            new = ExprLet(node.param(), arg, in_expr)
+            new.slot = inner.slot(node.param())
+        case Tags.ExprCase:
+            branches = []
+            for b, branch_scope, expr in zip(node.branches(), inner, _take(done, len(inner))):
+                branch = CaseBranch(b.id(), b.params(), expr, b.line)
+                branch.slots = tuple(branch_scope.slot(p) for p in b.params())
+                branches.append(branch)
+            new = ExprCase(done.pop(), CaseBranches(branches))
+        case Tags.Definition:
+            new = Definition(node.id(), done.pop(), node.line)
+            new.size = inner.layout.size
+        case Tags.Program:
+            new = Program()
+            for d in _take(done, len(node.definitions())):
+                new.append(d)
+        case Tags.ExprApply:
+            arg, fn = done.pop(), done.pop()
+            new = node if fn is node.fn() and arg is node.arg() else ExprApply(fn, arg)
+        case Tags.ExprPrimitive:
+            new = ExprPrimitive(node.op(), _take(done, len(node.args())))
+        case Tags.ExprStruct:
+            new = ExprStruct(node.id(), _take(done, len(node.args())))
+        case Tags.ExprMemo:
+            new = ExprMemo(node.id(), node.params(), done.pop())
+            new.addresses = tuple(inner.address(p) for p in node.params())
+        case _:
+            raise RuntimeError(f"No se puede resolver la expresión {node}")
+    return new
+
+
+def _take(done: list[AstNode], n: int) -> list[AstNode]:
+    parts = done[len(done) - n:]
+    del done[len(done) - n:]
+    return parts
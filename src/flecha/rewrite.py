@@ -0,0 +1,117 @@
+from enum import Enum
+from typing import Callable
+from flecha.ast import *
+
+# Primitivas con efectos: imprimen en la salida.
+print_primitives = frozenset(p.value for p in Primitives)
+unary_primitives = print_primitives | frozenset(unary_operators.values())
+binary_primitives = frozenset(binary_operators.values())
+
+# Tags de los nodos que clasifica classify_apply.
+application_tags = frozenset((Tags.ExprApply, Tags.ExprPrimitive, Tags.ExprStruct))
+
+class ApplyKind(Enum):
+    Unary = "Unary"
+    Binary = "Binary"
+    Struct = "Struct"
+    Call = "Call"
+
+
+def classify_apply(ast: ExprApply | ExprPrimitive | ExprStruct) -> tuple:
+    ''' Clasifica una aplicación:
+    (Unary, op, arg) | (Binary, op, left, right) | (Struct, ctor, args) | (Call, fn, arg)'''
+    if ast.tag == Tags.ExprPrimitive:
+        return (ApplyKind.Unary if len(ast.args()) == 1 else ApplyKind.Binary, ast.op(), *ast.args())
+    if ast.tag == Tags.ExprStruct:
+        return (ApplyKind.Struct, ast.id(), list(ast.args()))
+    fn = ast.fn()
+    if fn.tag == Tags.ExprVar and fn.id() in unary_primitives:
+        return (ApplyKind.Unary, fn.id(), ast.arg())
+    if fn.tag == Tags.ExprApply and fn.fn().tag == Tags.ExprVar and fn.fn().id() in binary_primitives:
+        return (ApplyKind.Binary, fn.fn().id(), fn.arg(), ast.arg())
+    args = []
+    head = ast
+    while head.tag == Tags.ExprApply:
+        args.append(head.arg())
+        head = head.fn()
+        if head.tag == Tags.ExprString:
+            # Un string aplicado a argumentos es la aplicación de su primera celda.
+            head = head.cons()
+    if head.tag == Tags.ExprConstructor:
+        return (ApplyKind.Struct, head.id(), args[::-1])
+    return (ApplyKind.Call, fn, ast.arg())
+
+
+# region Resolución de primitivas
+# Después de resolver un AST, cada ExprApply que queda es la llamada a una función: las
+# aplicaciones de operadores y de unsafePrint* pasan a ser ExprPrimitive y las de
+# constructores ExprStruct, así que evaluarlas no requiere volver a clasificarlas.
+
+def _subexpressions(node: AstNode, kind: tuple | None) -> list[AstNode]:
+    if kind is not None:
+        if kind[0] == ApplyKind.Struct:
+            return kind[2]
+        return [p for p in kind[1:] if isinstance(p, AstNode)]
+    tag = node.tag
+    if tag == Tags.ExprLambda: return [node.body()]
+    if tag == Tags.ExprLet: return [node.argExpr(), node.inExpr()]
+    if tag == Tags.ExprCase: return [node.expr(), *node.branches()]
+    if tag == Tags.CaseBranch or tag == Tags.Definition: return [node.expr()]
+    if tag == Tags.ExprPrimitive or tag == Tags.ExprStruct: return list(node.args())
+    if tag == Tags.ExprMemo: return [node.body()]
+    return []
+
+
+def _rebuild(node: AstNode, kind: tuple | None, new: Callable[[AstNode], AstNode]) -> AstNode:
+    if kind is not None:
+        match kind[0]:
+            case ApplyKind.Unary: return ExprPrimitive(kind[1], [new(kind[2])])
+            case ApplyKind.Binary: return ExprPrimitive(kind[1], [new(kind[2]), new(kind[3])])
+            case ApplyKind.Struct: return ExprStruct(kind[1], [new(a) for a in kind[2]])
+        fn, arg = new(kind[1]), new(kind[2])
+        return node if fn is kind[1] and arg is kind[2] else ExprApply(fn, arg)
+    parts = node._parts()
+    new_parts = tuple(new(p) if isinstance(p, AstNode) else p for p in parts)
+    if all(n is p for n, p in zip(new_parts, parts)):
+        return node
+    match node.tag:
+        case Tags.ExprLambda: return ExprLambda(*new_parts, node.line)
+        case Tags.ExprLet: return ExprLet(*new_parts)
+        case Tags.ExprCase: return ExprCase(new_parts[0], CaseBranches(list(new_parts[1:])))
+        case Tags.CaseBranch: return CaseBranch(*new_parts, node.line)
+        case Tags.Definition: return Definition(*new_parts, node.line)
+        case Tags.ExprPrimitive: return ExprPrimitive(new_parts[0], new_parts[1:])
+        case Tags.ExprStruct: return ExprStruct(new_parts[0], new_parts[1:])
+        case Tags.ExprMemo: return ExprMemo(*new_parts)
+    raise RuntimeError(f"No se puede resolver la expresión {node}")
+
+
+def resolve(root: AstNode) -> AstNode:
+    ''' Reescribe las aplicaciones de primitivas y constructores de root. El recorrido es
+    iterativo y los subárboles que no cambian (y los compartidos) se reutilizan.'''
+    resolved: dict[int, AstNode] = {}
+    # Clasificación de cada aplicación; mantiene vivos los nodos creados al clasificar
+    # (las celdas de un string) mientras se usan sus id como claves.
+    kinds: dict[int, tuple] = {}
+    new = lambda n: resolved[id(n)]
+    pending = [(root, False)]
+    while pending:
+        node, expanded = pending.pop()
+        if id(node) in resolved:
+            continue
+        if not expanded:
+            if node.tag == Tags.ExprApply:
+                kinds[id(node)] = classify_apply(node)
+            pending.append((node, True))
+            pending.extend((c, False) for c in _subexpressions(node, kinds.get(id(node))))
+            continue
+        resolved[id(node)] = _rebuild(node, kinds.get(id(node)), new)
+    return resolved[id(root)]
+
+
+def resolve_program(program: Program) -> Program:
+    resolved = Program()
+    for d in program.definitions():
+        resolved.append(resolve(d))
+    return resolved
+# endregion
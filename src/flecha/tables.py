@@ -0,0 +1,38 @@
+''' Genera las tablas del lexer (lextab.py) y del parser (parsetab.py) que se distribuyen
+con el paquete. Hay que volver a generarlas cada vez que cambia la gramática o los tokens:
+
+    py -m flecha.tables     (desde src)'''
+import os
+import ply.lex as lex
+from ply.yacc import yacc
+from flecha.lexer import Lexer
+from flecha.parser import Parser
+
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def generate():
+    for module in ('lextab', 'parsetab'):
+        path = os.path.join(OUTPUT_DIR, f'{module}.py')
+        if os.path.exists(path):
+            os.remove(path)
+    lex.lex(module=Lexer(), optimize=True, lextab='lextab', outputdir=OUTPUT_DIR)
+    yacc(module=Parser(tables=False), tabmodule='parsetab', outputdir=OUTPUT_DIR, debug=False)
+
+
+def grammar_signature() -> str:
+    ''' Firma de la gramática actual, tal como la guarda yacc en parsetab._lr_signature'''
+    from ply.yacc import ParserReflect
+    reflect = ParserReflect({name: getattr(Parser, name) for name in dir(Parser)})
+    reflect.get_all()
+    return reflect.signature()
+
+
+def lexer_regexes() -> dict[str, list[str]]:
+    ''' Expresiones regulares de las reglas actuales del lexer por estado, tal como las guarda
+    lex en lextab._lexstatere'''
+    return {state: list(regexes) for state, regexes in Lexer().build(tables=False).lexstateretext.items()}
+
+
+if __name__ == "__main__":
+    generate()
@@ -0,0 +1,128 @@
+from typing import TextIO
+from flecha.bytecode import Block, BytecodeCompiler, BytecodeProgram, Op
+from flecha.interpreter import (FALSE, TRUE, VOID, ClosureValue, GlobalEnv, StructValue, Value, boolean_value,
+                                constructor_value, type_name)
+from flecha.primitives import *
+from flecha.resolver import new_frame
+from flecha.ast import Program
+
+# Los códigos se copian a variables de módulo: comparar enteros es más barato que acceder a Op.X.
+(LOAD_LOCAL, LOAD_DEREF, LOAD_GLOBAL, LOAD_CONST, STORE_LOCAL, MAKE_CLOSURE, MAKE_STRUCT, CALL, TAIL_CALL,
+ RETURN, CASE, JUMP, AND_JUMP, OR_JUMP, TO_BOOL, ADD, SUB, MUL, DIV, MOD, EQ, NE, GE, LE, GT, LT,
+ NOT, UMINUS, PRINT_INT, PRINT_CHAR) = [int(op) for op in Op]
+
+_binary_fns = {int(Op[op]): fn for op, fn in list(relational_ops.items()) + list(arithmetic_ops.items())}
+_op_names = {int(op): op.name for op in Op}
+
+
+class VM:
+    ''' Máquina de pila que ejecuta el bytecode generado por BytecodeCompiler.
+
+    Las llamadas a closures guardan (código, pc, frame) en una pila de llamadas
+    propia en lugar de usar la pila de Python, y TAIL_CALL no la hace crecer.'''
+
+    def __init__(self, output: TextIO) -> None:
+        self._global_env = GlobalEnv()
+        self._output = output
+        self._constructors: dict[str, StructValue] = {}
+
+    def run(self, program: Program) -> Value:
+        return self.run_bytecode(BytecodeCompiler().compile_program(program))
+
+    def run_bytecode(self, program: BytecodeProgram) -> Value:
+        for id, block in program.definitions:
+            self._global_env.assign(id, self.execute(program, block, new_frame(None, block.frame_size)))
+        return self._global_env.lookup('main')
+
+    def execute(self, program: BytecodeProgram, block: Block, frame: list) -> Value:
+        consts = program.consts
+        lookup = self._global_env.lookup
+        write = self._output.write
+        binary_fns = _binary_fns
+        constructors = self._constructors
+        code = block.code
+        pc = 0
+        stack = []
+        push, pop = stack.append, stack.pop
+        calls = []
+        while True:
+            op = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+            if op == LOAD_LOCAL:
+                push(frame[arg])
+            elif op == LOAD_DEREF:
+                f = frame
+                for _ in range(arg >> 16):
+                    f = f[0]
+                push(f[arg & 0xFFFF])
+            elif op == LOAD_CONST:
+                push(consts[arg])
+            elif op == LOAD_GLOBAL:
+                push(lookup(consts[arg]))
+            elif op == STORE_LOCAL:
+                frame[arg] = pop()
+            elif op >= ADD and op <= LT:
+                r = pop()
+                l = pop()
+                x, y = as_numbers(_op_names[op], l, r)
+                result = binary_fns[op](x, y)
+                push((TRUE if result else FALSE) if op >= EQ else result)
+            elif op == CALL or op == TAIL_CALL:
+                cl = as_closure(pop())
+                a = pop()
+                if op == CALL:
+                    calls.append((code, pc, frame))
+                body = cl.body
+                code, pc, frame = body.code, 0, [cl.env, a, *body.padding]
+            elif op == RETURN:
+                if not calls:
+                    return pop()
+                code, pc, frame = calls.pop()
+            elif op == CASE:
+                val = pop()
+                branches = consts[arg].branches
+                if isinstance(val, StructValue):
+                    target = branches.get((val.ctor, len(val.args)))
+                    if target is not None:
+                        for s, v in zip(target[1], val.args):
+                            frame[s] = v
+                else:
+                    target = branches.get(type_name(val))
+                if target is None:
+                    raise RuntimeError(f"Error al intentar matchear la expresión: {val}")
+                pc = target[0]
+            elif op == JUMP:
+                pc = arg
+            elif op == MAKE_STRUCT:
+                ctor, arity = consts[arg]
+                if arity:
+                    args = stack[-arity:]
+                    del stack[-arity:]
+                    push(StructValue(ctor, args))
+                else:
+                    push(constructor_value(ctor, constructors))
+            elif op == MAKE_CLOSURE:
+                push(ClosureValue(None, consts[arg], frame))
+            elif op == AND_JUMP:
+                if not as_boolean(pop()):
+                    push(FALSE)
+                    pc = arg
+            elif op == OR_JUMP:
+                if as_boolean(pop()):
+                    push(TRUE)
+                    pc = arg
+            elif op == TO_BOOL:
+                push(boolean_value(as_boolean(pop())))
+            elif op == NOT:
+                push(boolean_value(not as_boolean(pop())))
+            elif op == UMINUS:
+                push(-as_number(pop()))
+            elif op == PRINT_INT:
+                write(str(as_number(pop())))
+                push(VOID)
+            elif op == PRINT_CHAR:
+                write(as_char(pop()))
+                push(VOID)
+            else:
+                raise RuntimeError(f"Instrucción no reconocida: {op}")
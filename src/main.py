@@ -1,17 +1,41 @@
+import json
+import os
 import sys
+from flecha.bytecode import BytecodeCompiler, disassemble
+from flecha.cache import ProgramCache
+from flecha.engines import ENGINES
 from flecha.interpreter import Interpreter, LocalEnv
+from flecha.limits import LimitedInterpreter, LimitExceeded, Limits
+from flecha.memo import MemoCache, memoize_program
 from flecha.lexer import Lexer
-from flecha.parser import Parser
+from flecha.fastlexer import FastLexer
+from flecha.parser import parse, parse_many
+from flecha.optimizer import LEVELS, Optimizer
+from flecha.output import stdout_buffer
+from flecha.profiler import ProfilingInterpreter
+from flecha.rewrite import resolve_program
 
-from flecha.ast import jsonConfig
+from flecha.ast import dump, jsonConfig
 
 # region COMMANDS
 
 def parse_input(input):
-    print(Parser().parse(input))
+    program = parse(input, fast_lexer())
+    if program is None:
+        print(program)
+        return
+    if __options['--ast'] == 'resolved':
+        program = resolve_program(program)
+    elif __options['--ast'] == 'optimized':
+        program = optimize(program)
+    dump(program, sys.stdout)
+    sys.stdout.write('\n')
+
+def fast_lexer():
+    return __options['--lexer'] == 'fast'
 
 def tokenize_input(input):
-    _lex = Lexer().build()
+    _lex = FastLexer() if fast_lexer() else Lexer().build()
     _lex.input(input)
     result = []
     while True:
@@ -21,8 +45,96 @@ def tokenize_input(input):
         result.append((tok.type,tok.value))
     print(result)
 
+def tokenize_stream(input_file, batch=4096):
+    ''' Escribe un token por línea en JSON a medida que se leen del archivo, en lotes de batch
+    líneas. Los errores van a stderr, así que cada línea de la salida es un token.'''
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(', ', ': ')).encode
+    lexer = FastLexer(print_errors=False)
+    lines = []
+    for type, value, lineno, lexpos in lexer.tokenize_file(input_file):
+        if lexer.errors:
+            print_lexer_errors(lexer)
+        lines.append(f'["{type}", {encode(value)}, {lineno}, {lexpos}]\n')
+        if len(lines) >= batch:
+            sys.stdout.write(''.join(lines))
+            lines.clear()
+    print_lexer_errors(lexer)
+    sys.stdout.write(''.join(lines))
+
+def print_lexer_errors(lexer):
+    sys.stderr.write(''.join(f'{message}\n' for message in lexer.errors))
+    lexer.errors.clear()
+
+def parse_program(input:str):
+    if __options['--cache-dir']:
+        result = ProgramCache(__options['--cache-dir']).parse(input, lambda source: parse_many([source], fast_lexer())[0])
+        for message in result.errors:
+            print(message)
+        return result.ast
+    return parse(input, fast_lexer())
+
+def optimize(program):
+    optimizer = Optimizer(int(__options['--optimize']))
+    program = optimizer.optimize_program(program)
+    if __options['--optimize-report'] == 'on':
+        print(f'optimize={optimizer.level}: {optimizer.report}', file=sys.stderr)
+    return program
+
 def eval_input(input:str):
-    return Interpreter(sys.stdout).eval(Parser().parse(input), LocalEnv())
+    program = parse_program(input)
+    if program is not None and __options['--optimize'] != '0':
+        program = optimize(program)
+    # La salida se escribe en bloques, y lo impreso se escribe aunque la evaluación falle.
+    try:
+        with stdout_buffer() as output:
+            if program is not None and (__options['--memoize'] != '0' or __options['--profile'] != 'off' or limited()):
+                return eval_tree(output, program)
+            return __engines[__options['--engine']](output, program)
+    except LimitExceeded as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+def eval_tree(output, program):
+    ''' Evalúa con el intérprete tree memorizando y perfilando según las opciones'''
+    memo = None
+    if __options['--memoize'] != '0':
+        memo = MemoCache(int(__options['--memoize']))
+        program = memoize_program(program)
+    if __options['--profile'] != 'off':
+        interpreter = ProfilingInterpreter(output, memo)
+    elif limited():
+        interpreter = LimitedInterpreter(output, limits(), memo)
+    else:
+        interpreter = Interpreter(output, memo)
+    try:
+        result = interpreter.eval(program, LocalEnv())
+    finally:
+        # Lo medido se informa también si la evaluación falla.
+        if __options['--profile'] != 'off':
+            write_profile(interpreter)
+    if memo is not None and __options['--memoize-report'] == 'on':
+        print(f'memoize={memo.capacity}: {memo}', file=sys.stderr)
+    return result
+
+def limited():
+    return any(__options[key] != '0' for key in ('--max-steps', '--timeout', '--max-heap'))
+
+def limits():
+    # 0 es sin límite.
+    return Limits(int(__options['--max-steps']) or None, float(__options['--timeout']) or None,
+                  int(__options['--max-heap']) or None)
+
+def write_profile(profiler):
+    write = profiler.report if __options['--profile'] == 'report' else profiler.collapsed
+    if not __options['--profile-output']:
+        write(sys.stderr)
+        return
+    with open(__options['--profile-output'], mode='w', encoding='utf-8') as file:
+        write(file)
+
+
+def disassemble_input(input:str):
+    print(disassemble(BytecodeCompiler().compile_program(parse(input, fast_lexer()))))
 
 
 def read_file(input_file):
@@ -38,20 +150,69 @@ def parse_file(input_file):
 def tokenize_file(input_file):
     tokenize_input(read_file(input_file))
 
+def disassemble_file(input_file):
+    disassemble_input(read_file(input_file))
+
 
 def print_help():
     print("Usage:")
     for k, val in __commands.items():
         print(f' py src/main.py {k} {" ".join([f"<{v}>" for v in val[1]])}')
+    print("Options:")
+    for k, val in __options.items():
+        print(f' {k}={val}')
+    print(f' --engine: {" | ".join(__engines)}')
+    print(f' --lexer: {" | ".join(__lexers)}')
+    print(f' --ast: {" | ".join(__ast_forms)}')
+    print(f' --optimize: {" | ".join(__optimize_levels)}')
+    print(f' --optimize-report: off | on')
+    print(f' --memoize: 0 | <entradas> (sólo con --engine=tree)')
+    print(f' --memoize-report: off | on')
+    print(f' --profile: {" | ".join(__profile_modes)} (sólo con --engine=tree)')
+    print(f' --profile-output: <archivo> (stderr si no se indica)')
+    print(f' --max-steps: 0 | <pasos> (sólo con --engine=tree)')
+    print(f' --timeout: 0 | <segundos> (sólo con --engine=tree)')
+    print(f' --max-heap: 0 | <celdas> (sólo con --engine=tree)')
 
 
 __commands = {
     '--tokenize': (tokenize_input, ['input']),
     '--tokenize-file': (tokenize_file, ['input_file']),
+    '--tokenize-stream': (tokenize_stream, ['input_file']),
     '--parse': (parse_input, ['input']),
     '--parse-file': (parse_file, ['input_file']),
     '--eval': (eval_input, ['input']),
     '--eval-file': (eval_file, ['input']),
+    '--disassemble': (disassemble_input, ['input']),
+    '--disassemble-file': (disassemble_file, ['input_file']),
+}
+
+__engines = ENGINES
+
+__lexers = ['ply', 'fast']
+
+# Forma del AST que muestran --parse y --parse-file: la del parser o con las primitivas resueltas.
+__ast_forms = ['source', 'resolved', 'optimized']
+
+__optimize_levels = [str(level) for level in LEVELS]
+
+# Lo que escribe --profile: una tabla por función y rama, o las pilas para un flamegraph.
+__profile_modes = ['off', 'report', 'collapsed']
+
+__options = {
+    '--engine': 'tree',
+    '--lexer': 'ply',
+    '--ast': 'source',
+    '--optimize': '0',
+    '--optimize-report': 'off',
+    '--memoize': '0',
+    '--memoize-report': 'off',
+    '--profile': 'off',
+    '--profile-output': '',
+    '--max-steps': '0',
+    '--timeout': '0',
+    '--max-heap': '0',
+    '--cache-dir': os.environ.get('FLECHA_CACHE_DIR', ''),
 }
 
 # endregion
@@ -59,13 +220,61 @@ def process_command(key, params):
     __commands[key][0](*params)
 
 
+def split_options(args):
+    ''' Separa las opciones de la forma --clave=valor del resto de los argumentos'''
+    params, options = [], {}
+    for arg in args:
+        key, sep, val = arg.partition('=')
+        if sep and key in __options:
+            options[key] = val
+        else:
+            params.append(arg)
+    return params, options
+
+
 def valid_args(args):
     return args and (args[0] in __commands) and (len(args) == (len(__commands[args[0]][1])+1))
 
 
+def valid_options(options):
+    return (options.get('--engine', __options['--engine']) in __engines and
+            options.get('--lexer', __options['--lexer']) in __lexers and
+            options.get('--ast', __options['--ast']) in __ast_forms and
+            options.get('--optimize', __options['--optimize']) in __optimize_levels and
+            options.get('--optimize-report', __options['--optimize-report']) in ['off', 'on'] and
+            valid_memoize(options.get('--memoize', __options['--memoize']), options.get('--engine', __options['--engine'])) and
+            options.get('--memoize-report', __options['--memoize-report']) in ['off', 'on'] and
+            valid_profile(options.get('--profile', __options['--profile']), options.get('--engine', __options['--engine'])) and
+            valid_limits({**__options, **options}))
+
+
+def valid_memoize(capacity, engine):
+    # La memoización es parte del intérprete tree.
+    return capacity.isdigit() and (int(capacity) == 0 or engine == 'tree')
+
+
+def valid_profile(mode, engine):
+    # El perfilador es un intérprete tree que mide lo que evalúa.
+    return mode in __profile_modes and (mode == 'off' or engine == 'tree')
+
+
+def valid_limits(options):
+    # Los límites son parte del intérprete tree y no se combinan con el perfilador.
+    if not (options['--max-steps'].isdigit() and options['--max-heap'].isdigit()):
+        return False
+    try:
+        timeout = float(options['--timeout'])
+    except ValueError:
+        return False
+    unlimited = int(options['--max-steps']) == int(options['--max-heap']) == 0 and timeout == 0
+    return timeout >= 0 and (unlimited or (options['--engine'] == 'tree' and options['--profile'] == 'off'))
+
+
 def main():
-    if (valid_args(sys.argv[1:])):
-        process_command(sys.argv[1], sys.argv[2:])
+    args, options = split_options(sys.argv[1:])
+    if valid_args(args) and valid_options(options):
+        __options.update(options)
+        process_command(args[0], args[1:])
     else:
         print_help()
 
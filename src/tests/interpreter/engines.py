@@ -0,0 +1,42 @@
+import glob
+import os
+import pytest
+from flecha.engines import ENGINES
+from flecha.interpreter import LocalEnv
+from flecha.memo import memoize_program
+from flecha.parser import Parser
+from tests.interpreter.test_interpreter import FakeOutput, read_expected_file, read_file
+
+# Los tests que valen para todos los motores se parametrizan con engines.
+engines = ENGINES
+# lazy no evalúa los argumentos que no se usan: los tests del orden de evaluación usan los demás.
+strict_engines = [engine for engine in engines if engine != 'lazy']
+
+def example_files():
+    return sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'examples', '*.fl')))
+
+def run(engine, source) -> str:
+    ''' Evalúa source con engine y devuelve lo que imprimió'''
+    out = FakeOutput()
+    engines[engine](out, Parser().parse(source))
+    return out.read()
+
+def evaluate(engine, source):
+    ''' Evalúa source con engine y devuelve el valor de main'''
+    return engines[engine](FakeOutput(), Parser().parse(source))
+
+def interpret(interpreter, source, memoize=False):
+    ''' Evalúa source con el intérprete tree que arma interpreter(out) y devuelve el intérprete
+    y lo que imprimió. Con memoize se memorizan antes las funciones puras del programa.'''
+    out = FakeOutput()
+    program = Parser().parse(source)
+    evaluator = interpreter(out)
+    evaluator.eval(memoize_program(program) if memoize else program, LocalEnv())
+    return evaluator, out.read()
+
+def examples_keep_their_output(interpreter, memoize=False):
+    ''' Test parametrizado con los ejemplos: cada uno imprime lo esperado al evaluarlo con interpreter(out)'''
+    @pytest.mark.parametrize('filename', example_files(), ids=os.path.basename)
+    def test(filename):
+        assert interpret(interpreter, read_file(filename), memoize)[1] == read_expected_file(filename)
+    return test
@@ -0,0 +1,23 @@
+import pytest
+from flecha.interpreter import StructValue, case_table, select_branch
+from tests.interpreter.engines import engines, evaluate
+
+def test_first_matching_branch_wins():
+    table = case_table([('Cons', ('x',), 1), ('Cons', ('x', 'xs'), 2), ('Cons', ('y', 'ys'), 3), ('Int', (), 4)])
+    assert select_branch(table, StructValue('Cons', [1, 2])) == (('x', 'xs'), 2)
+    assert select_branch(table, 7) == ((), 4)
+    with pytest.raises(RuntimeError):
+        select_branch(table, StructValue('Nil', []))
+
+@pytest.mark.parametrize('engine', engines)
+def test_case_over_many_constructors(engine):
+    ctors = [f'C{i}' for i in range(200)]
+    branches = ' '.join(f'| {c} x -> x + {i}' for i, c in enumerate(ctors))
+    calls = ' + '.join(f'f ({c} 1000)' for c in ctors[::-1][:3])
+    source = f'def f v = case v {branches}\ndef main = {calls}'
+    assert evaluate(engine, source) == 3000 + 199 + 198 + 197
+
+@pytest.mark.parametrize('engine', engines)
+def test_case_without_matching_branch(engine):
+    with pytest.raises(RuntimeError, match='matchear'):
+        evaluate(engine, 'def main = case Nil | Cons x xs -> 1 | Int -> 2')
@@ -0,0 +1,26 @@
+import pytest
+import glob
+import os
+from flecha.compiler import Compiler
+from flecha.parser import Parser
+from tests.interpreter.test_interpreter import FakeOutput, read_file, read_expected_file
+
+@pytest.mark.parametrize('n',[str.rjust(str(n), 2, '0') for n in range(1,32)])
+def test_compiled_example_(n):__test_example_file(n)
+
+def __test_example_file(n):
+    filename = glob.glob(
+        os.getcwd() + f'/**/test{n}.fl', recursive=True)[0]
+    input, expected = read_file(filename), read_expected_file(filename)
+    out = FakeOutput()
+    Compiler(out).run(Parser().parse(input))
+    assert out.read() == expected
+
+def test_compiled_closures_capture_env():
+    out = FakeOutput()
+    Compiler(out).run(Parser().parse('def k x y = x def main = unsafePrintInt (k 1 2)'))
+    assert out.read() == '1'
+
+def test_compiled_match_error():
+    with pytest.raises(RuntimeError):
+        Compiler(FakeOutput()).run(Parser().parse('def main = case Nil | Cons x xs -> 0'))
@@ -2,18 +2,17 @@ import pytest
 from flecha.ast import *
 import os
 import glob
-from flecha.interpreter import IntValue, Interpreter, LocalEnv, StructValue, Value
+from flecha.interpreter import IntValue, Interpreter, LocalEnv, StructValue, Value, select_branch
 from flecha.parser import Parser
+from flecha.resolver import Scope, address, new_frame
 
 class FakeOutput():
     def __init__(self):
-        self._buffer = ''
-
-    def write(self, str:str):
-        self._buffer += str
+        self._parts: list[str] = []
+        self.write = self._parts.append
 
     def read(self) -> str:
-        return self._buffer
+        return ''.join(self._parts)
 
 @pytest.mark.parametrize('n',[str.rjust(str(n), 2, '0') for n in range(1,32)])
 def test_eval_example_(n):__test_example_file(n)
@@ -33,20 +32,32 @@ def __test_example_file(n):
     Interpreter(out).eval(Parser().parse(input),LocalEnv())
     assert out.read() == expected
 
-def test_match_extends_env_ok():
-    env = LocalEnv()
+def test_case_table_binds_branch_params():
     cons_id = 'Cons'
     num = 1
-    cons_expr = ExprConstructor(cons_id)
-    head_expr = ExprNumber(num)
-    tail_expr = ExprConstructor('Nil')
-    expr = ExprApply(ExprApply(cons_expr,head_expr),tail_expr)
+    expr = ExprApply(ExprApply(ExprConstructor(cons_id),ExprNumber(num)),ExprConstructor('Nil'))
+    scope = Scope().bind('v')
+    case = address(ExprCase(ExprVar('v'), CaseBranches([CaseBranch('Nil',[],ExprNumber(0)), CaseBranch(cons_id,['x','xs'],expr)])), scope)
     interpreter = Interpreter(FakeOutput())
     struct = StructValue(cons_id,[IntValue(num),StructValue('Nil',[])])
-    pattern = CaseBranch(cons_id,['x','xs'],expr)
-    is_match, new_env = interpreter.match(struct,pattern,env)
-    assert is_match
-    x:IntValue = new_env.lookup("x")
-    xs:StructValue = new_env.lookup("xs")
+    slots = case.branches()[1].slots
+    assert select_branch(interpreter.case_table(case), struct) == (slots, case.branches()[1].expr())
+    frame = new_frame(None, scope.layout.size)
+    frame[scope.slot('v')] = struct
+    branch, new_env = interpreter.tail_case(case, frame)
+    assert branch is case.branches()[1].expr() and new_env is frame
+    x:IntValue = new_env[slots[0]]
+    xs:StructValue = new_env[slots[1]]
     assert isinstance(x,IntValue) and x.value==num
-    assert isinstance(xs,StructValue) and xs.ctor=="Nil"
\ No newline at end of file
+    assert isinstance(xs,StructValue) and xs.ctor=="Nil"
+
+def test_eval_resolves_expression_roots():
+    expr = Parser().parse('def main = 1 + 2').definitions()[0].expr()
+    interpreter = Interpreter(FakeOutput())
+    assert interpreter.eval(expr, LocalEnv()) == 3
+    assert interpreter.eval(expr, LocalEnv()) == 3
+
+def test_eval_resolves_hand_built_constructor_applications():
+    expr = ExprApply(ExprApply(ExprConstructor('Cons'),ExprVar('x')),ExprConstructor('Nil'))
+    struct = Interpreter(FakeOutput()).eval(expr, LocalEnv().extend('x', 1))
+    assert struct.ctor == 'Cons' and struct.args[0] == 1 and struct.args[1].ctor == 'Nil'
@@ -0,0 +1,50 @@
+import pytest
+from flecha.interpreter import LocalEnv
+from flecha.lazy import LazyInterpreter, Thunk
+from flecha.parser import Parser
+from tests.interpreter.engines import examples_keep_their_output, interpret
+from tests.interpreter.test_interpreter import FakeOutput
+
+def run(source):
+    return interpret(LazyInterpreter, source)[1]
+
+test_examples_keep_their_output = examples_keep_their_output(LazyInterpreter)
+
+def test_unused_arguments_are_not_evaluated():
+    assert run('def const x y = x def main = unsafePrintInt (const 1 (1 / 0))') == '1'
+    assert run('def main = let x = unsafePrintInt 2 in unsafePrintInt 3') == '3'
+
+def test_thunks_are_evaluated_once():
+    assert run('def main = let x = (unsafePrintInt 7; 5) in unsafePrintInt (x + x)') == '710'
+
+def test_sequence_is_strict():
+    assert run('def main = unsafePrintInt 1; let x = unsafePrintInt 2 in unsafePrintInt 3; unsafePrintInt 4') == '134'
+
+def test_operands_keep_evaluation_order():
+    assert run('def f x y = (unsafePrintInt 1; 0) + y def main = unsafePrintInt (f 0 (unsafePrintInt 2; 5))') == '125'
+
+def test_infinite_list():
+    assert run('''
+        def from n = Cons n (from (n + 1))
+        def take n xs = if n == 0 then Nil else (case xs | Nil -> Nil | Cons y ys -> Cons y (take (n - 1) ys))
+        def print xs = case xs | Nil -> 0 | Cons y ys -> (unsafePrintInt y; print ys)
+        def main = print (take 5 (from 3))''') == '34567'
+
+def test_long_chain_of_delayed_accumulators():
+    assert run('''
+        def id x = x
+        def sum n acc = if n == 0 then acc else sum (n - 1) (acc + id n)
+        def main = unsafePrintInt (sum 20000 0)''') == str(20000 * 20001 // 2)
+
+def test_errors_are_reported_when_the_value_is_used():
+    with pytest.raises(ZeroDivisionError):
+        run('def main = let x = 1 / 0 in unsafePrintInt x')
+    with pytest.raises(RuntimeError):
+        run("def main = let x = 'a' + 1 in unsafePrintInt x")
+
+def test_struct_arguments_are_shared_thunks():
+    interpreter = LazyInterpreter(FakeOutput())
+    value = interpreter.eval(Parser().parse('def f x = x def main = Cons (f 1) Nil'), LocalEnv())
+    head = value.args[0]
+    assert type(head) is Thunk and f'{head}' == '<thunk>'
+    assert interpreter.force(head) == 1 and f'{head}' == '1'
@@ -0,0 +1,88 @@
+import pytest
+from flecha.interpreter import LocalEnv
+from flecha.limits import HeapLimitExceeded, LimitedInterpreter, LimitExceeded, Limits, StepLimitExceeded, TimeLimitExceeded
+from flecha.memo import MemoCache
+from flecha.parser import Parser
+from tests.interpreter.engines import examples_keep_their_output, interpret
+from tests.interpreter.test_interpreter import FakeOutput
+
+FIB = 'def fib n = if n < 2 then n else fib (n - 1) + fib (n - 2) def main = unsafePrintInt (fib 10)'
+LOOP = 'def loop n = loop (n + 1) def main = unsafePrintInt 1; loop 0'
+GROW = 'def grow xs = grow (Cons 1 xs) def main = grow Nil'
+SQUARE = 'def sq n x = if n == 0 then x else sq (n - 1) (x * x) def main = unsafePrintInt (sq {n} {x})'
+
+def run(source, limits, memo=None):
+    return interpret(lambda out: LimitedInterpreter(out, limits, memo), source, memo is not None)[1]
+
+def test_usage_within_limits():
+    limits = Limits(steps=10000, seconds=60, heap=10000)
+    assert run(FIB, limits) == '55'
+    # Una aplicación y un case por llamada a fib; la única closure es la de fib.
+    assert (limits.steps, limits.heap) == (354, 355)
+    assert str(limits).startswith('354 pasos, ') and str(limits).endswith(' s, 355 celdas')
+
+@pytest.mark.parametrize('batch', [1, 7, 4096])
+def test_step_limit_is_exact(batch):
+    limits = Limits(steps=1000, batch=batch)
+    with pytest.raises(StepLimitExceeded) as e:
+        run(LOOP, limits)
+    assert e.value.steps == limits.steps == 1000
+    assert 'Se excedió el límite de 1000 pasos' in str(e.value)
+
+def test_step_limit_allows_exact_usage():
+    assert run(FIB, Limits(steps=354, batch=10)) == '55'
+    with pytest.raises(StepLimitExceeded):
+        run(FIB, Limits(steps=353, batch=10))
+
+def test_heap_limit():
+    limits = Limits(heap=5000, batch=100)
+    with pytest.raises(HeapLimitExceeded) as e:
+        run(GROW, limits)
+    assert 5000 < e.value.heap <= 5000 + 4 * 100
+    assert e.value.steps <= 5000
+
+def test_time_limit():
+    with pytest.raises(TimeLimitExceeded) as e:
+        run(LOOP, Limits(seconds=0.05, batch=100))
+    assert 0.05 < e.value.seconds < 5
+
+def test_big_integers_use_heap():
+    small, big = Limits(), Limits()
+    run(SQUARE.format(n=8, x=1), small)
+    run(SQUARE.format(n=8, x=2), big)
+    # 2^64, 2^128 y 2^256 ocupan 1, 2 y 4 celdas.
+    assert big.heap - small.heap == 7 and big.steps == small.steps
+
+@pytest.mark.parametrize('limits, error', [(dict(heap=1000), HeapLimitExceeded), (dict(seconds=0.2), TimeLimitExceeded)])
+def test_costly_arithmetic_in_few_steps(limits, error):
+    # Cada paso eleva al cuadrado: sin controlar dentro del lote terminaría con 2^(2^31).
+    with pytest.raises(error) as e:
+        run(SQUARE.format(n=31, x=2), Limits(steps=1000, **limits))
+    assert e.value.steps < 1000 and e.value.seconds < 5
+
+def test_limits_are_not_program_errors():
+    # Un límite que se supera dentro de una operación no se confunde con un error del programa.
+    with pytest.raises(StepLimitExceeded):
+        run('def f n = 1 + f n def main = unsafePrintInt (f 0)', Limits(steps=100))
+    assert not issubclass(LimitExceeded, RuntimeError)
+    with pytest.raises(RuntimeError):
+        run('def main = 1 + Nil', Limits(steps=100))
+
+def test_output_before_the_limit_is_kept():
+    out = FakeOutput()
+    with pytest.raises(StepLimitExceeded):
+        LimitedInterpreter(out, Limits(steps=100)).eval(Parser().parse(LOOP), LocalEnv())
+    assert out.read() == '1'
+
+def test_memoized_evaluation():
+    limits = Limits(steps=1000)
+    assert run(FIB, limits, MemoCache(100)) == '55'
+    assert limits.steps < 354
+
+@pytest.mark.parametrize('limits', [dict(steps=0), dict(seconds=-1), dict(heap=0), dict(batch=0)])
+def test_invalid_limits(limits):
+    with pytest.raises(RuntimeError):
+        Limits(**limits)
+
+test_examples_keep_their_output = examples_keep_their_output(
+    lambda out: LimitedInterpreter(out, Limits(steps=10**6, seconds=60, heap=10**6, batch=16)))
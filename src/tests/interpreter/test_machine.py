@@ -0,0 +1,48 @@
+import pytest
+import glob
+import os
+from flecha.machine import Machine
+from flecha.parser import Parser
+from tests.interpreter.test_interpreter import FakeOutput, read_file, read_expected_file
+
+@pytest.mark.parametrize('n',[str.rjust(str(n), 2, '0') for n in range(1,32)])
+def test_machine_example_(n):__test_example_file(n)
+
+def __test_example_file(n):
+    filename = glob.glob(
+        os.getcwd() + f'/**/test{n}.fl', recursive=True)[0]
+    input, expected = read_file(filename), read_expected_file(filename)
+    out = FakeOutput()
+    Machine(out).run(Parser().parse(input))
+    assert out.read() == expected
+
+def run(source):
+    out = FakeOutput()
+    Machine(out).run(Parser().parse(source))
+    return out.read()
+
+def test_machine_deep_non_tail_recursion():
+    source = '''
+    def sum n = if n == 0 then 0 else n + sum (n - 1)
+    def main = unsafePrintInt (sum 20000)
+    '''
+    assert run(source) == str(sum(range(20001)))
+
+def test_machine_long_list_recursion():
+    source = '''
+    def range n = if n == 0 then Nil else Cons n (range (n - 1))
+    def length xs = case xs | Nil -> 0 | Cons x ys -> 1 + length ys
+    def main = unsafePrintInt (length (range 20000))
+    '''
+    assert run(source) == '20000'
+
+def test_machine_long_string_literal():
+    text = 'abc' * 5000
+    source = f'''
+    def print s = case s | Nil -> 0 | Cons c cs -> (unsafePrintChar c; print cs)
+    def main = print "{text}"
+    '''
+    assert run(source) == text
+
+def test_machine_short_circuit():
+    assert run('def main = unsafePrintInt (if False && (1 / 0 == 0) then 1 else 2)') == '2'
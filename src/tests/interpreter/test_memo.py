@@ -0,0 +1,64 @@
+import pytest
+from flecha.interpreter import ClosureValue, Interpreter, LocalEnv, StringValue, StructValue, char_value
+from flecha.memo import MemoCache, memoizable
+from flecha.parser import Parser
+from flecha.rewrite import resolve_program
+from tests.interpreter.engines import examples_keep_their_output, interpret
+
+FIB = 'def fib n = if n < 2 then n else fib (n - 1) + fib (n - 2) '
+
+def run(source, memo):
+    return interpret(lambda out: Interpreter(out, memo), source, memoize=True)[1]
+
+@pytest.mark.parametrize('source, expected', [
+    (FIB, {'fib': 1}),
+    ('def c n k = if k == 0 || k == n then 1 else c (n - 1) (k - 1) + c (n - 1) k', {'c': 2}),
+    ('def fact n = if n == 0 then 1 else n * fact (n - 1)', {}),
+    ('def loop n = if n == 0 then 0 else (if n % 2 == 0 then loop (n - 1) else loop (n - 2))', {}),
+    ('def f n acc = if n == 0 then acc else (if n == 1 then f 0 (acc + f 0 1) else f (n - 1) (acc + 1))', {}),
+    ('def f n = if n < 2 then unsafePrintInt n else (f (n - 1); f (n - 2))', {}),
+    ('def log n = unsafePrintInt n def f n = if n < 2 then log n else f (n - 1) + f (n - 2)', {}),
+    ('def f n = if n < 2 then g n else f (n - 1) + f (n - 2)', {}),
+    ('def g n = n def f n = if n < 2 then g n else f (n - 1) + f (n - 2) def g n = 0', {}),
+])
+def test_memoizable(source, expected):
+    assert memoizable(resolve_program(Parser().parse(source))) == expected
+
+def test_memoized_fib():
+    memo = MemoCache(100)
+    assert run(FIB + 'def main = unsafePrintInt (fib 80)', memo) == '23416728348467685'
+    assert (memo.hits, memo.misses, memo.evictions) == (78, 81, 0)
+    assert str(memo) == '78 aciertos, 81 fallos, 0 desalojos, 81/100 entradas'
+
+def test_tail_calls_are_kept():
+    # Memorizar f haría que sus llamadas de cola usen la pila de Python.
+    source = 'def f n acc = if n == 0 then acc else (if n == 1 then f 0 (acc + f 0 1) else f (n - 1) (acc + 1))'
+    assert run(source + ' def main = unsafePrintInt (f 100000 0)', MemoCache(100)) == '100000'
+
+def test_lru_evicts_least_recently_used():
+    memo = MemoCache(2)
+    memo.put(('f', 1), 1)
+    memo.put(('f', 2), 2)
+    assert memo.get(('f', 1)) == 1
+    memo.put(('f', 3), 3)
+    assert memo.get(('f', 2)) is None and memo.get(('f', 1)) == 1
+    assert (memo.hits, memo.misses, memo.evictions, len(memo)) == (2, 1, 1, 2)
+
+def test_keys_are_structural():
+    memo = MemoCache(10)
+    cells = StructValue('Cons', [char_value(ord('a')), StructValue('Nil', [])])
+    assert memo.key('f', [StringValue('a'), 1]) == memo.key('f', [cells, 1])
+    assert memo.key('f', [1]) != memo.key('f', [char_value(1)]) != memo.key('g', [1])
+    assert memo.key('f', [ClosureValue('x', None, LocalEnv())]) is None
+
+def test_calls_with_closures_are_not_memoized():
+    memo = MemoCache(10)
+    source = 'def f g n = if n < 2 then g n else f g (n - 1) + f g (n - 2) def main = unsafePrintInt (f (\\x -> x) 10)'
+    assert run(source, memo) == '55'
+    assert memo.hits == memo.misses == 0
+
+def test_invalid_capacity():
+    with pytest.raises(RuntimeError):
+        MemoCache(0)
+
+test_examples_keep_their_output = examples_keep_their_output(lambda out: Interpreter(out, MemoCache(4)), memoize=True)
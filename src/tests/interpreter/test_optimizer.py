@@ -0,0 +1,118 @@
+import os
+import pytest
+from flecha import optimizer
+from flecha.ast import *
+from flecha.interpreter import Interpreter
+from flecha.optimizer import Optimizer
+from flecha.parser import Parser
+from tests.interpreter.engines import engines, example_files, strict_engines
+from tests.interpreter.test_interpreter import FakeOutput, read_expected_file, read_file
+
+def names(program):
+    return [d.id() for d in program.definitions()]
+
+def optimize(source, level=2):
+    optimizer = Optimizer(level)
+    program = optimizer.optimize_program(Parser().parse(source))
+    return program.definitions()[-1].expr(), optimizer.report
+
+@pytest.mark.parametrize('source, expected', [
+    ('def main = 1 + 2 * 3 - -4', ExprNumber(11)),
+    ('def main = 7 / 2 == 3 && !(1 > 2)', ExprConstructor('True')),
+    ('def main = False && f x', ExprConstructor('False')),
+    ('def main = if 1 < 2 then \'a\' else \'b\'', ExprChar('a')),
+    ('def main = case "hi" | Nil -> 0 | Cons c cs -> c', ExprChar('h')),
+    ('def main = case 3 | Char -> 1 | Int -> 2', ExprNumber(2)),
+    ('def main = let x = 2 in let y = x * x in \\z -> y + z',
+     ExprLambda('z', ExprPrimitive('ADD', [ExprNumber(4), ExprVar('z')]))),
+])
+def test_folds_constants(source, expected):
+    assert optimize(source)[0] == expected
+
+def test_folds_with_the_interpreter_operators():
+    interpreter = Interpreter(FakeOutput())
+    assert optimizer.arithmetic_ops is interpreter._arithmetic_ops and optimizer.relational_ops is interpreter._relational_ops
+
+@pytest.mark.parametrize('source', [
+    'def main = 1 / 0',
+    'def main = 5 % (2 - 2)',
+    'def main = \'a\' + 1',
+    'def main = True && f x',
+    'def main = case Nil | Cons x xs -> 1',
+    'def main = case Cons 1 x | Cons x y -> y',
+])
+def test_keeps_operations_that_fail_or_depend_on_runtime(source):
+    assert optimize(source)[0].tag != Tags.ExprNumber
+
+def test_level_one_does_not_propagate_lets():
+    expr, report = optimize('def main = let x = 1 + 1 in x', level=1)
+    assert expr == ExprLet('x', ExprNumber(2), ExprVar('x'))
+    assert (report.folded, report.cases, report.propagated) == (1, 0, 0)
+
+def test_propagation_respects_shadowing():
+    expr, _ = optimize('def main = let x = 1 in (\\x -> x) (case Cons 2 Nil | Cons x xs -> x + x)')
+    assert expr == ExprApply(ExprLambda('x', ExprVar('x')), ExprNumber(4))
+
+def test_known_case_keeps_side_effects_in_order():
+    expr, report = optimize('def main = case Cons (unsafePrintInt 1) (unsafePrintInt 2) | Cons a b -> 0')
+    assert expr == ExprLet('a', ExprPrimitive('unsafePrintInt', [ExprNumber(1)]),
+                           ExprLet('b', ExprPrimitive('unsafePrintInt', [ExprNumber(2)]), ExprNumber(0)))
+    assert report.cases == 1
+
+def test_deep_expression():
+    source = 'def main = ' + ' + '.join(['1'] * 20000)
+    assert optimize(source)[0] == ExprNumber(20000)
+
+@pytest.mark.parametrize('level', [1, 2, 3])
+@pytest.mark.parametrize('engine', engines)
+@pytest.mark.parametrize('filename', example_files(), ids=os.path.basename)
+def test_examples_keep_their_output(level, engine, filename):
+    out = FakeOutput()
+    engines[engine](out, Optimizer(level).optimize_program(Parser().parse(read_file(filename))))
+    assert out.read() == read_expected_file(filename)
+
+def test_removes_unreachable_pure_definitions():
+    optimizer = Optimizer(3)
+    program = optimizer.optimize_program(Parser().parse(
+        'def unused x = x def noisy = unsafePrintInt 1 def used x = used x def main = used'))
+    assert names(program) == ['noisy', 'used', 'main']
+    assert optimizer.report.removed == 1
+
+def test_inlines_small_non_recursive_definitions():
+    expr, report = optimize('def k = 10 def inc x = x + 1 def add x y = x + y def main = add (inc k) 3', level=3)
+    assert expr == ExprNumber(14)
+    assert report.inlined == 3
+
+@pytest.mark.parametrize('source', [
+    'def loop n = loop n def main = loop 1',
+    'def even n = odd n def odd n = even n def main = odd 1',
+    'def main = f 1 def f x = x',
+    'def f x = x def f x = 0 def main = f 1',
+    'def h x = h x def g x = h x def main = \\h -> g 1',
+])
+def test_does_not_inline_recursive_redefined_or_captured_calls(source):
+    expr, report = optimize(source, level=3)
+    assert report.inlined == 0
+    assert expr.tag != Tags.ExprNumber
+
+def test_inline_budget():
+    source = 'def f x = x + x + x + x def main = f 1'
+    assert optimize(source, level=3)[0] == ExprNumber(4)
+    optimizer = Optimizer(3, inline_budget=5)
+    program = optimizer.optimize_program(Parser().parse(source))
+    assert names(program) == ['f', 'main'] and optimizer.report.inlined == 0
+
+@pytest.mark.parametrize('engine', strict_engines)
+def test_inlining_keeps_evaluation_order(engine):
+    source = 'def p x y = y def main = p (unsafePrintInt 1) (unsafePrintInt 2)'
+    expected, out = FakeOutput(), FakeOutput()
+    engines[engine](expected, Parser().parse(source))
+    engines[engine](out, Optimizer(3).optimize_program(Parser().parse(source)))
+    assert out.read() == expected.read() == '21'
+
+@pytest.mark.parametrize('engine', engines)
+def test_inlining_does_not_capture_arguments(engine):
+    source = 'def f x y = x - y def main = unsafePrintInt ((\\x -> f 1 x) 5)'
+    out = FakeOutput()
+    engines[engine](out, Optimizer(3).optimize_program(Parser().parse(source)))
+    assert out.read() == '-4'
@@ -0,0 +1,43 @@
+import io
+import pytest
+from flecha.output import OutputBuffer
+from flecha.parser import Parser
+from tests.interpreter.engines import engines
+from tests.interpreter.test_interpreter import FakeOutput
+
+def test_writes_when_the_buffer_fills():
+    out = FakeOutput()
+    buffer = OutputBuffer(out, size=8)
+    buffer.write('abc')
+    assert out.read() == ''
+    buffer.write('d' * io.DEFAULT_BUFFER_SIZE)
+    assert out.read().startswith('abcddddd')
+    buffer.flush()
+    assert out.read() == 'abc' + 'd' * io.DEFAULT_BUFFER_SIZE
+
+def test_binary_output_is_encoded():
+    out = io.BytesIO()
+    with OutputBuffer(out, size=4) as buffer:
+        buffer.write('ñandú €' * 3)
+    assert out.getvalue() == ('ñandú €' * 3).encode('utf-8')
+
+def test_multibyte_characters_split_between_blocks():
+    out = FakeOutput()
+    with OutputBuffer(out, size=3) as buffer:
+        for c in 'añ€😀b' * 5:
+            buffer.write(c)
+    assert out.read() == 'añ€😀b' * 5
+
+@pytest.mark.parametrize('engine', engines)
+def test_output_is_flushed_on_error(engine):
+    out = FakeOutput()
+    with pytest.raises(ZeroDivisionError):
+        with OutputBuffer(out) as buffer:
+            engines[engine](buffer, Parser().parse('def main = unsafePrintInt 12; unsafePrintChar \'a\'; unsafePrintInt (1 / 0)'))
+    assert out.read() == '12a'
+
+def test_closefd_closes_the_output():
+    out, kept = io.BytesIO(), io.BytesIO()
+    with OutputBuffer(out, closefd=True) as buffer, OutputBuffer(kept):
+        buffer.write('a')
+    assert out.closed and not kept.closed
@@ -0,0 +1,91 @@
+import io
+import itertools
+import pytest
+from flecha.interpreter import LocalEnv
+from flecha.memo import MemoCache
+from flecha.parser import Parser
+from flecha.profiler import ProfilingInterpreter
+from tests.interpreter.engines import examples_keep_their_output, interpret
+from tests.interpreter.test_interpreter import FakeOutput
+
+FIB = '''def fib n =
+  if n < 2
+    then n
+    else fib (n - 1) + fib (n - 2)
+def main = unsafePrintInt (fib 10)'''
+
+def profile(source, memo=None):
+    ''' Perfila source con un reloj que avanza 1 ns cada vez que se consulta'''
+    clock = itertools.count().__next__
+    return interpret(lambda out: ProfilingInterpreter(out, memo, clock=clock), source, memo is not None)
+
+def calls(profiler):
+    return {label: e.calls for label, e in profiler.entries.items()}
+
+def test_calls_per_function_and_branch():
+    profiler, out = profile(FIB)
+    assert out == '55'
+    assert calls(profiler) == {'main:5': 1, 'fib:1': 177, 'fib/True:2': 89, 'fib/False:4': 88}
+
+def test_times_add_up():
+    profiler, _ = profile(FIB)
+    main = profiler.entries['main:5']
+    assert sum(e.own for e in profiler.entries.values()) == main.total
+    assert sum(profiler.stacks().values()) == main.total
+    # Las llamadas recursivas no se cuentan dos veces en el total.
+    assert main.total > profiler.entries['fib:1'].total > profiler.entries['fib/False:4'].total
+
+def test_curried_functions_and_lambdas():
+    source = '''def add x y = x + y
+def twice f x = f (f x)
+def main =
+  unsafePrintInt (twice (\\n -> add n 1) 0)'''
+    profiler, out = profile(source)
+    assert out == '2'
+    assert calls(profiler) == {'main:3': 1, 'twice:2': 1, 'main/lambda:4': 2, 'add:1': 2}
+
+def test_tail_calls_replace_frames():
+    source = '''def loop n =
+  if n == 0 then 0 else loop (n - 1)
+def main = unsafePrintInt (loop 10000)'''
+    profiler, out = profile(source)
+    assert out == '0'
+    assert profiler.entries['loop:1'].calls == 10001
+    assert max(path.count(';') for path in profiler.stacks()) == 2
+
+def test_allocations():
+    source = '''def build n = if n == 0 then Nil else Cons n (build (n - 1))
+def main = case build 3 | Cons x xs -> unsafePrintInt x'''
+    profiler, _ = profile(source)
+    assert profiler.entries['build/False:1'].allocations == 3
+    assert profiler.entries['main:2'].allocations == 0
+
+def test_collapsed_stacks():
+    profiler, _ = profile('def f x = x\ndef main = unsafePrintInt (f 1)')
+    output = io.StringIO()
+    profiler.collapsed(output)
+    assert [line.split(' ')[0] for line in output.getvalue().splitlines()] == ['main:2', 'main:2;f:1']
+
+def test_report():
+    profiler, _ = profile(FIB)
+    output = io.StringIO()
+    profiler.report(output)
+    lines = output.getvalue().splitlines()
+    assert lines[0].split() == ['llamadas', 'total', 'ms', 'propio', 'ms', 'asignaciones', 'nombre']
+    assert sorted(line.split()[-1] for line in lines[1:]) == ['fib/False:4', 'fib/True:2', 'fib:1', 'main:5']
+
+def test_frames_are_closed_on_errors():
+    profiler = ProfilingInterpreter(FakeOutput())
+    with pytest.raises(RuntimeError):
+        profiler.eval(Parser().parse('def f x = x + Nil\ndef main = f 1'), LocalEnv())
+    assert calls(profiler) == {'main:2': 1, 'f:1': 1}
+    assert not profiler._frames
+
+def test_memoized_calls_are_counted():
+    memo = MemoCache(100)
+    profiler, out = profile(FIB, memo)
+    assert out == '55'
+    assert profiler.entries['fib:1'].calls == memo.hits + memo.misses
+    assert profiler.entries['fib/False:4'].calls == 9
+
+test_examples_keep_their_output = examples_keep_their_output(ProfilingInterpreter)
@@ -0,0 +1,76 @@
+import pytest
+from flecha.compiler import Compiler
+from flecha.interpreter import LocalEnv
+from flecha.parser import Parser
+from flecha.ast import *
+from flecha.resolver import Scope, address
+from flecha.rewrite import resolve
+from tests.interpreter.engines import run
+from tests.interpreter.test_interpreter import FakeOutput
+
+def test_scope_addresses():
+    root = Scope().bind('a')
+    fn = root.function('x').bind('y')
+    assert root.address('a') == (0, 1)
+    assert fn.address('x') == (0, 1)
+    assert fn.address('y') == (0, 2)
+    assert fn.address('a') == (1, 1)
+    assert fn.address('main') is None
+
+def test_scope_shadowing_does_not_leak():
+    outer = Scope().bind('x')
+    inner = outer.bind('x')
+    assert inner.address('x') == (0, 2)
+    assert outer.address('x') == (0, 1)
+    assert outer.layout.size == 3
+
+def test_compiled_shadowing_and_nested_closures():
+    source = '''
+    def add x y = x + y
+    def main =
+      let x = 1 in
+      let f = (\\y -> let x = y * 10 in add x) in
+      let x = f 2 3 in
+      unsafePrintInt x
+    '''
+    out = FakeOutput()
+    Compiler(out).run(Parser().parse(source))
+    assert out.read() == '23'
+
+def test_compiled_deep_let_chain():
+    lets = ''.join(f'let x{i} = x{i-1} + 1 in ' for i in range(1, 300))
+    out = FakeOutput()
+    Compiler(out).run(Parser().parse(f'def main = let x0 = 0 in {lets} unsafePrintInt x299'))
+    assert out.read() == '299'
+
+def test_address_resolves_locals_to_frame_slots():
+    program = Parser().parse('def f x = let y = x in \\z -> case z | Cons h t -> y + h + f')
+    definition = address(resolve(program.definitions()[0]), Scope())
+    outer = definition.expr()
+    let = outer.body()
+    inner = let.inExpr()
+    branch = inner.body().branches()[0]
+    assert let.argExpr() == ExprLocal('x', 0, 1) and let.slot == 2 and outer.size == 3
+    assert branch.slots == (2, 3) and inner.size == 4
+    y, h = branch.expr().args()[0].args()
+    assert (y, h) == (ExprLocal('y', 1, 2), ExprLocal('h', 0, 2))
+    assert branch.expr().args()[1] == ExprVar('f')
+
+def test_address_gives_shared_subtrees_their_own_slots():
+    shared = ExprLet('y', ExprVar('x'), ExprVar('y'))
+    root = address(ExprLet('x', ExprNumber(1), ExprApply(ExprApply(ExprVar('g'), shared), shared)), Scope())
+    first, second = root.inExpr().fn().arg(), root.inExpr().arg()
+    assert first.slot != second.slot
+    assert first.inExpr() == ExprLocal('y', 0, first.slot) and second.inExpr() == ExprLocal('y', 0, second.slot)
+
+@pytest.mark.parametrize('engine', ['tree', 'lazy'])
+def test_tree_deep_let_chain(engine):
+    lets = ''.join(f'let x{i} = x{i-1} + x0 in ' for i in range(1, 300))
+    assert run(engine, f'def main = let x0 = 1 in {lets} unsafePrintInt x299') == '300'
+
+def test_local_env_extend_is_persistent():
+    env = LocalEnv().extend('x', 1)
+    extended = env.extend('x', 2)
+    assert env.lookup('x') == 1 and extended.lookup('x') == 2
+    assert len(env) == 1 and len(extended) == 2
+    assert extended.lookup('y') is None
@@ -0,0 +1,33 @@
+import os
+import pytest
+from flecha.ast import *
+from flecha.parser import Parser
+from flecha.rewrite import resolve, resolve_program
+from tests.interpreter.engines import engines, example_files
+from tests.interpreter.test_interpreter import FakeOutput, read_expected_file, read_file
+
+def test_resolve_rewrites_primitives_and_structs():
+    program = Parser().parse('def main = f (-1 + 2) (Cons x Nil) (unsafePrintChar \'a\')')
+    assert f'{resolve_program(program)}' == ('[["Def","main",["ExprApply",["ExprApply",["ExprApply",["ExprVar","f"],'
+        '["ExprPrimitive","ADD",["ExprPrimitive","UMINUS",["ExprNumber",1]],["ExprNumber",2]]],'
+        '["ExprStruct","Cons",["ExprVar","x"],["ExprConstructor","Nil"]]],'
+        '["ExprPrimitive","unsafePrintChar",["ExprChar",97]]]]]')
+
+def test_resolve_keeps_unchanged_subtrees():
+    program = Parser().parse('def id x = x\ndef main = \\y -> id (g y)')
+    assert all(new is old for new, old in zip(resolve_program(program).definitions(), program.definitions()))
+    assert resolve_program(resolve_program(Parser().parse('def main = 1 + 2'))) == resolve_program(Parser().parse('def main = 1 + 2'))
+
+def test_resolve_long_list():
+    expr = ExprConstructor('Nil')
+    for i in range(100000):
+        expr = ExprApply(ExprApply(ExprConstructor('Cons'), ExprNumber(i)), expr)
+    resolved = resolve(expr)
+    assert resolved.tag == Tags.ExprStruct and resolved.args()[0] == ExprNumber(99999)
+
+@pytest.mark.parametrize('engine', engines)
+@pytest.mark.parametrize('filename', example_files(), ids=os.path.basename)
+def test_engines_run_resolved_programs(engine, filename):
+    out = FakeOutput()
+    engines[engine](out, resolve_program(Parser().parse(read_file(filename))))
+    assert out.read() == read_expected_file(filename)
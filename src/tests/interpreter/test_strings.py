@@ -0,0 +1,50 @@
+import pytest
+from flecha.ast import ExprString, build_string
+from flecha.bytecode import BytecodeCompiler, disassemble
+from flecha.interpreter import CharValue, StringValue, StructValue
+from flecha.parser import Parser
+from tests.interpreter.engines import engines, run
+
+PRINT = '''
+def print s = case s | Nil -> 0 | Cons c cs -> (unsafePrintChar c; print cs)
+def main = print "{text}"
+'''
+
+def test_string_value_behaves_like_cons_list():
+    s = StringValue('ab')
+    assert (s.ctor, len(s.args)) == ('Cons', 2)
+    assert s.args[0].value == 'a' and s.args[1].args[0].value == 'b'
+    assert s.args[1].args[1].ctor == 'Nil' and s.args[1].args[1].args == []
+    assert s.args is s.args
+    cells = StructValue('Cons', [CharValue(ord('a')), StructValue('Cons', [CharValue(ord('b')), StructValue('Nil', [])])])
+    assert f'{s}' == f'{cells}'
+
+def test_string_literal_is_packed():
+    program = Parser().parse('def s = "hola"')
+    assert program.definitions()[0].expr() == ExprString('hola')
+    assert f'{ExprString("")}' == '["ExprConstructor","Nil"]'
+
+@pytest.mark.parametrize('engine', engines)
+def test_print_long_string(engine):
+    text = 'abc' * 20000
+    assert run(engine, PRINT.format(text=text)) == text
+
+@pytest.mark.parametrize('engine', engines)
+def test_string_case_arity(engine):
+    source = '''
+    def f s = case s | Cons x -> 1 | Nil -> 2 | Cons x xs -> 3
+    def main = unsafePrintInt (f "a"); unsafePrintInt (f "")
+    '''
+    assert run(engine, source) == '32'
+
+@pytest.mark.parametrize('engine', engines)
+def test_applied_string_is_applied_cons(engine):
+    source = '''
+    def main = case "ab" 7
+      | Cons c cs n -> (unsafePrintChar c; unsafePrintInt n)
+    '''
+    assert run(engine, source) == 'a7'
+
+def test_disassemble_string_constant():
+    listing = disassemble(BytecodeCompiler().compile_program(Parser().parse('def s = "a\\"b"')))
+    assert 'LOAD_CONST   0 ("a\\"b")' in listing
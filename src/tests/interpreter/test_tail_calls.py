@@ -0,0 +1,39 @@
+import sys
+import pytest
+from flecha.parser import Parser
+from tests.interpreter.engines import engines, run
+from tests.interpreter.test_interpreter import FakeOutput
+
+LOOP = '''
+def loop n acc = if n == 0 then acc else loop (n - 1) (acc + n)
+def main = unsafePrintInt (loop {n} 0)
+'''
+
+COUNTDOWN = '''
+def countdown n =
+  case n == 0
+  | True -> unsafePrintChar 'x'
+  | False -> (let m = n - 1 in (countdown m; unsafePrintChar 'y'; countdown2 m))
+def countdown2 n = if n == 0 then unsafePrintChar '.' else countdown2 (n - 1)
+def main = countdown 1
+'''
+
+@pytest.mark.parametrize('engine', engines)
+def test_tail_recursive_loop_1e6(engine):
+    assert run(engine, LOOP.format(n=10**6)) == str(10**6 * (10**6 + 1) // 2)
+
+@pytest.mark.parametrize('engine', engines)
+def test_tail_calls_use_constant_host_stack(engine):
+    program = Parser().parse(LOOP.format(n=5000))
+    out = FakeOutput()
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    try:
+        engines[engine](out, program)
+    finally:
+        sys.setrecursionlimit(limit)
+    assert out.read() == str(5000 * 5001 // 2)
+
+@pytest.mark.parametrize('engine', engines)
+def test_tail_positions_in_case_let_and_sequence(engine):
+    assert run(engine, COUNTDOWN) == 'xy.'
@@ -0,0 +1,65 @@
+import pytest
+from flecha.interpreter import (FALSE, TRUE, VOID, CharValue, ClosureValue, IntValue, StructValue, StringValue,
+                                boolean_value, char_value, constructor_value, type_name)
+from tests.interpreter.engines import engines, evaluate
+
+def test_shared_values():
+    assert boolean_value(1 < 2) is TRUE and boolean_value(False) is FALSE
+    assert constructor_value('Nil') is constructor_value('Nil')
+    assert constructor_value('True') is TRUE
+    assert char_value(97) is char_value(97) and char_value(97).value == 'a'
+    assert char_value(0x263A).value == '☺'
+
+@pytest.mark.parametrize('engine', engines)
+def test_program_constructors_are_not_interned_globally(engine):
+    value = evaluate(engine, 'def main = Zed')
+    assert value.ctor == 'Zed' and evaluate(engine, 'def main = Zed') is not value
+    table = {}
+    assert constructor_value('Zed', table) is constructor_value('Zed', table) is not constructor_value('Zed')
+    assert constructor_value('Nil', table) is constructor_value('Nil') and list(table) == ['Zed']
+
+@pytest.mark.parametrize('engine', engines)
+@pytest.mark.parametrize('source, expected', [
+    ('def main = 1 < 2', TRUE),
+    ('def main = !(1 < 2)', FALSE),
+    ('def main = 1 == 1 && 2 == 2', TRUE),
+    ('def main = Nil', constructor_value('Nil')),
+    ('def main = unsafePrintInt 1', VOID),
+    ("def main = 'x'", char_value(ord('x'))),
+])
+def test_engines_return_shared_values(engine, source, expected):
+    assert evaluate(engine, source) is expected
+
+@pytest.mark.parametrize('engine', engines)
+def test_large_values_are_still_built(engine):
+    assert evaluate(engine, 'def main = 1000 * 1000') == 1000000
+    value = evaluate(engine, 'def main = Cons 1 Nil')
+    assert type(value) is StructValue and value.args[1] is constructor_value('Nil')
+
+@pytest.mark.parametrize('engine', engines)
+def test_ints_are_unboxed(engine):
+    value = evaluate(engine, 'def main = 3 + 4')
+    assert type(value) is int and value == 7
+    assert type(evaluate(engine, 'def main = -(2 * 3)')) is int
+
+def test_struct_repr():
+    value = StructValue('Cons', [1, char_value(97), StructValue('Nil', [])])
+    assert repr(value) == '["Struct", "Cons", 1, "a", "[\\"Struct\\", \\"Nil\\"]"]'
+    assert repr(StringValue('a')) == repr(StructValue('Cons', [char_value(97), StructValue('Nil', [])]))
+
+def test_values_are_slotted():
+    for value in (char_value(97), StructValue('Cons', []), StringValue('ab'), TRUE, VOID, ClosureValue('x', None, None)):
+        assert not hasattr(value, '__dict__')
+
+def test_type_names():
+    assert [type_name(v) for v in (1, IntValue(1), char_value(97), ClosureValue('x', None, None), TRUE, StringValue(''))] == \
+        ['Int', 'Int', 'Char', 'Closure', 'Struct', 'Struct']
+    assert (IntValue(3).value, IntValue(3).type, char_value(97).type) == (3, 'Int', 'Char')
+
+@pytest.mark.parametrize('engine', engines)
+def test_case_on_type_names(engine):
+    source = '''
+    def kind x = case x | Int -> 1 | Char -> 2 | Closure -> 3 | Cons y ys -> 4
+    def main = kind 5 * 1000 + kind 'a' * 100 + kind (\\y -> y) * 10 + kind "ab"
+    '''
+    assert evaluate(engine, source) == 1234
@@ -0,0 +1,64 @@
+import pytest
+import glob
+import os
+from flecha import bytecode
+from flecha.bytecode import BytecodeCompiler, Op, disassemble
+from flecha.vm import VM
+from flecha.parser import Parser
+from tests.interpreter.test_interpreter import FakeOutput, read_file, read_expected_file
+
+@pytest.mark.parametrize('n',[str.rjust(str(n), 2, '0') for n in range(1,32)])
+def test_vm_example_(n):__test_example_file(n)
+
+def __test_example_file(n):
+    filename = glob.glob(
+        os.getcwd() + f'/**/test{n}.fl', recursive=True)[0]
+    input, expected = read_file(filename), read_expected_file(filename)
+    out = FakeOutput()
+    VM(out).run(Parser().parse(input))
+    assert out.read() == expected
+
+def run(source):
+    out = FakeOutput()
+    VM(out).run(Parser().parse(source))
+    return out.read()
+
+def test_vm_deep_non_tail_recursion():
+    source = '''
+    def sum n = if n == 0 then 0 else n + sum (n - 1)
+    def main = unsafePrintInt (sum 20000)
+    '''
+    assert run(source) == str(sum(range(20001)))
+
+def test_vm_case_jump_table_first_matching_branch_wins():
+    source = '''
+    def f x = case x | Pair a b -> 1 | Pair a -> 2 | Int -> 3 | Pair c d -> 4
+    def main = unsafePrintInt (f (Pair 1 2)); unsafePrintInt (f (Pair 1)); unsafePrintInt (f 7)
+    '''
+    assert run(source) == '123'
+
+def test_vm_match_error():
+    with pytest.raises(RuntimeError):
+        run('def main = case Nil | Cons x xs -> 0')
+
+def test_disassemble():
+    program = BytecodeCompiler().compile_program(Parser().parse('def inc x = x + 1'))
+    listing = disassemble(program)
+    assert listing.splitlines() == [
+        'inc: (frame 1)',
+        '      0  MAKE_CLOSURE 1 (inc/x)',
+        '      2  RETURN       ',
+        'inc/x: (frame 2)',
+        '      0  LOAD_LOCAL   1',
+        '      2  LOAD_CONST   0 (1)',
+        '      4  ADD          ',
+        '      6  RETURN       ',
+    ]
+    _, block = program.definitions[0]
+    assert list(block.code) == [Op.MAKE_CLOSURE, 1, Op.RETURN, 0]
+
+def test_deref_slot_out_of_range(monkeypatch):
+    monkeypatch.setattr(bytecode, 'DEREF_SLOTS', 2)
+    assert run('def main = let a = 1 in let b = 2 in unsafePrintInt ((\\y -> a) 0)') == '1'
+    with pytest.raises(RuntimeError, match='LOAD_DEREF'):
+        BytecodeCompiler().compile_program(Parser().parse('def main = let a = 1 in let b = 2 in (\\y -> b) 0'))
@@ -1,3 +1,4 @@
+import io
 import json
 from typing import Any
 from flecha.ast import *
@@ -61,4 +62,39 @@ def test_Curry():
 def test_AST():
     actual = f"{ExprCase(ExprVar('x'),CaseBranches([CaseBranch('True',[],ExprVar('y')),CaseBranch('False',[],ExprVar('z'))]))}"
     expected = '["ExprCase",["ExprVar","x"],[["CaseBranch","True",[],["ExprVar","y"]],["CaseBranch","False",[],["ExprVar","z"]]]]'
-    assert actual == expected
\ No newline at end of file
+    assert actual == expected
+
+def test_nodes_are_compact():
+    branch = CaseBranch('Cons', ['z', 'zs'], ExprChar('c'))
+    case = ExprCase(ExprApply(ExprVar('g'), ExprNumber(1)), CaseBranches([branch]))
+    let = ExprLet('y', ExprString('ab'), case)
+    program = Program(Definition('f', ExprLambda('x', let)))
+    nodes = [program, program.definitions()[0], program.definitions()[0].expr(), let, let.argExpr(),
+             case, case.expr(), case.expr().fn(), case.expr().arg(), branch, branch.expr(), ExprConstructor('Nil')]
+    assert all(not hasattr(node, '__dict__') for node in nodes)
+    assert all(not hasattr(node, 'children') for node in nodes[1:])
+    assert f'{program}' == ('[["Def","f",["ExprLambda","x",["ExprLet","y",'
+        '["ExprApply",["ExprApply",["ExprConstructor","Cons"],["ExprChar",97]],'
+        '["ExprApply",["ExprApply",["ExprConstructor","Cons"],["ExprChar",98]],["ExprConstructor","Nil"]]],'
+        '["ExprCase",["ExprApply",["ExprVar","g"],["ExprNumber",1]],[["CaseBranch","Cons",["z","zs"],["ExprChar",99]]]]]]]]')
+
+
+def test_dump_matches_repr():
+    program = Program()
+    program.append(Definition('s', ExprString('a"ñ\n')))
+    program.append(Definition('l', ExprLambda('x', ExprVar('x'))))
+    program.append(Definition('c', ExprCase(ExprVar('x'), CaseBranches([CaseBranch('Cons', ['y', 'ys'], ExprNumber(-1))]))))
+    out = io.StringIO()
+    dump(program, out, batch=3)
+    assert len(program.definitions()) == 3 and out.getvalue() == f'{program}'
+    assert f'{program}' == json.dumps(json.loads(f'{program}'), **jsonConfig)
+    assert '"a\\"\\u00f1\\n"' not in f'{program}' and '["ExprChar",241]' in f'{program}'
+
+
+def test_repr_of_deep_ast():
+    expr = ExprNumber(0)
+    for i in range(50000):
+        expr = ExprApply(ExprLambda('x', expr), ExprNumber(i))
+    text = f'{expr}'
+    assert text.startswith('["ExprApply",["ExprLambda","x",["ExprApply",')
+    assert text.endswith('["ExprNumber",49998]]],["ExprNumber",49999]]')
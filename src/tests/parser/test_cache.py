@@ -0,0 +1,75 @@
+import glob
+import os
+import pytest
+from flecha import cache
+from flecha.ast import *
+from flecha.cache import ProgramCache, decode, encode
+from flecha.parser import Parser, parse_many
+
+def example_files():
+    return sorted(glob.glob(os.getcwd() + '/**/parser/examples/*.input', recursive=True))
+
+@pytest.mark.parametrize('filename', example_files(), ids=os.path.basename)
+def test_encode_decode_roundtrip(filename):
+    with open(filename, 'r') as fi:
+        program = Parser().parse(fi.read())
+    assert f'{decode(encode(program))}' == f'{program}'
+
+def test_encode_keeps_source_lines():
+    program = Parser().parse('def f x =\n  case x\n  | Nil -> (\\y -> y)\n\ndef g = 1')
+    f, g = decode(encode(program)).definitions()
+    branch = f.expr().body().branches()[0]
+    assert (f.line, f.expr().line, branch.line, branch.expr().line, g.line) == (1, 1, 3, 3, 5)
+
+def test_encode_long_list_is_flat():
+    expr = ExprConstructor('Nil')
+    for _ in range(10000):
+        expr = ExprApply(ExprApply(ExprConstructor('Cons'), ExprNumber(1)), expr)
+    decoded = decode(encode(Program(Definition('l', expr))))
+    assert len(decoded.definitions()) == 1
+    assert decoded.definitions()[0].expr().fn().arg() == ExprNumber(1)
+
+def test_encode_string_literal():
+    decoded = decode(encode(Program(Definition('s', build_string('x' * 10000)))))
+    assert decoded.definitions()[0].expr().tag == Tags.ExprString
+    assert decoded.definitions()[0].expr().value == 'x' * 10000
+
+def parse(source):
+    return parse_many([source])[0]
+
+def test_cache_hit_skips_parser(tmp_path):
+    source = 'def main = unsafePrintInt 1'
+    store = ProgramCache(str(tmp_path))
+    first = store.parse(source, parse)
+    def fail(s): raise AssertionError('no debería parsear')
+    assert f'{store.parse(source, fail).ast}' == f'{first.ast}'
+
+@pytest.mark.parametrize('source, error', [
+    ('def main = unsafePrintInt 1 $', "Illegal character '$'"),
+    ('def main = unsafePrintInt 1 def = 3 def g = 2', "Syntax error at '='"),
+])
+def test_programs_with_errors_are_not_cached(tmp_path, source, error):
+    store = ProgramCache(str(tmp_path))
+    for _ in range(2):
+        result = store.parse(source, parse)
+        assert result.ast is not None and [e for e in result.errors if e.startswith(error)]
+    assert store.load(source) is None
+
+def test_cache_key_depends_on_source_and_version(tmp_path, monkeypatch):
+    store = ProgramCache(str(tmp_path))
+    key = store.key('def a = 1')
+    assert key != store.key('def a = 2')
+    monkeypatch.setattr(cache, 'MAGIC', b'FLC0\0')
+    assert key != store.key('def a = 1')
+
+def test_cache_ignores_corrupt_entries(tmp_path):
+    source = 'def a = 1'
+    store = ProgramCache(str(tmp_path))
+    with open(store.path(source), 'wb') as fo:
+        fo.write(cache.MAGIC + b'garbage')
+    assert store.load(source) is None
+    with open(store.path(source), 'wb') as fo:
+        pass
+    assert store.load(source) is None
+    assert f'{store.parse(source, parse).ast}' == '[["Def","a",["ExprNumber",1]]]'
+    assert store.load(source) is not None
@@ -0,0 +1,72 @@
+import glob
+import os
+import pytest
+from flecha.fastlexer import FastLexer
+from flecha.lexer import Lexer
+from flecha.parser import Parser
+from tests.parser.test_lexer import testData
+
+TESTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def sources():
+    files = glob.glob(os.path.join(TESTS_DIR, '*', 'examples', '*.input'))
+    files += glob.glob(os.path.join(TESTS_DIR, '*', 'examples', '*.fl'))
+    for path in sorted(files):
+        with open(path, encoding='utf-8') as file:
+            yield file.read()
+
+def ply_tokens(input):
+    l = Lexer(print_errors=False).build()
+    l.input(input)
+    return [(t.type, t.value, t.lineno, t.lexpos) for t in iter(l.token, None)]
+
+@pytest.mark.parametrize('input', list(testData) + ['a $ b', "'a' \"b\\\"c\"\n--x", 'x\n\n -- c\ny'])
+def test_fast_lexer_matches_ply_lexer(input):
+    assert list(FastLexer(print_errors=False).tokenize(input)) == ply_tokens(input)
+
+def test_fast_lexer_matches_ply_lexer_on_examples():
+    inputs = list(sources())
+    assert inputs
+    for input in inputs:
+        assert list(FastLexer().tokenize(input)) == ply_tokens(input)
+
+def test_fast_lexer_reports_errors(capsys):
+    lexer = FastLexer()
+    assert [t[0] for t in lexer.tokenize('a $ b')] == ['LOWERID', 'LOWERID']
+    assert lexer.errors == ["Illegal character '$'"]
+    assert capsys.readouterr().out == "Illegal character '$'\n"
+
+def test_parser_with_fast_lexer():
+    ply, fast = Parser(print_errors=False), Parser(print_errors=False, fast_lexer=True)
+    for input in sources():
+        assert f'{fast.parse(input)}' == f'{ply.parse(input)}'
+    for input in ['def = 1', 'def a = 1\n\ndef b = )', 'def a = 1 $']:
+        ply.parse(input); fast.parse(input)
+        assert fast.errors == ply.errors
+
+def test_tokenize_file_matches_tokenize(tmp_path):
+    path = tmp_path / 'all.fl'
+    text = '\n'.join(sources())
+    path.write_text(text, encoding='utf-8')
+    # Las posiciones de tokenize_file son en bytes: sólo coinciden con tokenize en texto ASCII.
+    assert [t[:3] for t in FastLexer().tokenize_file(str(path))] == [t[:3] for t in FastLexer().tokenize(text)]
+    path.write_text('def a = "b" -- c\n  \\x -> x', encoding='utf-8')
+    assert list(FastLexer().tokenize_file(str(path))) == list(FastLexer().tokenize(path.read_text()))
+
+def test_tokenize_file_decodes_utf8(tmp_path):
+    path = tmp_path / 'utf8.fl'
+    path.write_text("def ñ = 'ñ'\n\"año\" ¿", encoding='utf-8')
+    lexer = FastLexer(print_errors=False)
+    assert list(lexer.tokenize_file(str(path))) == [
+        ('DEF', 'def', 1, 0), ('DEFEQ', '=', 1, 7), ('CHAR', 'ñ', 1, 9), ('STRING', 'año', 2, 14)]
+    assert lexer.errors == ["Illegal character 'ñ'", "Illegal character '¿'"]
+
+def test_tokenize_file_empty_and_partial(tmp_path):
+    empty = tmp_path / 'empty.fl'
+    empty.write_bytes(b'')
+    assert list(FastLexer().tokenize_file(str(empty))) == []
+    big = tmp_path / 'big.fl'
+    big.write_text('def a = 1\n' * 1000, encoding='utf-8')
+    tokens = FastLexer().tokenize_file(str(big))
+    assert next(tokens) == ('DEF', 'def', 1, 0)
+    tokens.close()
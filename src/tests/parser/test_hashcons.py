@@ -0,0 +1,60 @@
+import glob
+import os
+from flecha.ast import *
+from flecha.hashcons import HashConsTable
+from flecha.parser import Parser
+
+def example_programs():
+    paths = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'examples', '*.input')))
+    assert paths
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            yield Parser(print_errors=False).parse(file.read())
+
+def test_equal_nodes_have_equal_hashes():
+    for program, twin in zip(example_programs(), example_programs()):
+        assert program == twin
+        for a, b in zip(program.definitions(), twin.definitions()):
+            assert a is not b and hash(a) == hash(b)
+
+def test_different_nodes_are_not_equal():
+    assert ExprApply(ExprVar('f'), ExprNumber(1)) != ExprApply(ExprVar('f'), ExprNumber(2))
+    assert ExprLambda('x', ExprVar('x')) != ExprLambda('y', ExprVar('x'))
+    assert CaseBranch('Cons', ['x'], ExprNumber(1)) != CaseBranch('Cons', ['x', 'xs'], ExprNumber(1))
+    assert ExprVar('Nil') != ExprConstructor('Nil')
+    assert ExprNumber(1) != 1
+
+def test_string_equals_its_cons_chain():
+    chain = ExprApply(ExprApply(ExprConstructor('Cons'), ExprChar('a')), ExprConstructor('Nil'))
+    assert ExprString('a') == chain and chain == ExprString('a')
+    assert hash(ExprString('a')) == hash(chain)
+    assert hash(ExprString('')) == hash(ExprConstructor('Nil'))
+    assert ExprString('ab') != ExprString('ac')
+
+def test_nodes_as_dict_keys():
+    memo = {ExprApply(ExprVar('f'), ExprNumber(1)): 'f 1'}
+    assert memo[Parser().parse('def a = f 1').definitions()[0].expr()] == 'f 1'
+
+def test_equality_of_deep_trees_is_iterative():
+    a, b = ExprNumber(0), ExprNumber(0)
+    for i in range(100000):
+        a, b = ExprApply(a, ExprNumber(i)), ExprApply(b, ExprNumber(i))
+    assert a == b
+
+def test_hash_consing_shares_subtrees():
+    table = HashConsTable()
+    source = 'def f x = (x + 1) * (x + 1) def g x = (x + 1) * 2'
+    program = Parser(hash_cons=table).parse(source)
+    assert f'{program}' == f'{Parser().parse(source)}'
+    f, g = [d.expr().body() for d in program.definitions()]
+    assert f.fn().arg() is f.arg() is g.fn().arg()
+    again = Parser(hash_cons=table).parse('def h y = x + 1')
+    assert again.definitions()[0].expr().body() is f.arg()
+
+def test_hash_consing_preserves_examples():
+    for program in example_programs():
+        table = HashConsTable()
+        interned = table.intern_program(program)
+        assert f'{interned}' == f'{program}'
+        assert table.intern_program(program).definitions() == interned.definitions()
+        assert all(a is b for a, b in zip(table.intern_program(program).definitions(), interned.definitions()))
@@ -0,0 +1,34 @@
+import threading
+from flecha.parser import ParseResult, get_parser, parse_many
+
+def test_parse_many_returns_asts_and_errors(capsys):
+    results = parse_many(['def a = 1', 'def = 2', 'def b = $', 'def c = 2'])
+    assert [r.ok() for r in results] == [True, False, False, True]
+    assert f'{results[0].ast}' == '[["Def","a",["ExprNumber",1]]]'
+    assert results[1].errors == ["Syntax error at '=' | line: 1"]
+    assert results[2].errors[0] == "Illegal character '$'"
+    assert f'{results[3].ast}' == '[["Def","c",["ExprNumber",2]]]'
+    assert capsys.readouterr().out == ''
+
+def test_parse_many_resets_line_numbers():
+    results = parse_many(['def a = 1\n\n\ndef b = 2', 'def = 3'])
+    assert results[1].errors == ["Syntax error at '=' | line: 1"]
+
+def test_parser_is_cached_per_thread():
+    parsers = []
+    def collect(): parsers.append(get_parser())
+    threads = [threading.Thread(target=collect) for _ in range(2)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert get_parser() is get_parser()
+    assert len({id(p) for p in parsers + [get_parser()]}) == 3
+
+def test_parse_many_concurrently():
+    sources = [f'def f{i} x = x + {i}' for i in range(200)]
+    expected = [f'{r.ast}' for r in parse_many(sources)]
+    outputs: list[list[ParseResult]] = []
+    def run(): outputs.append(parse_many(sources))
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert all([f'{r.ast}' for r in out] == expected for out in outputs)
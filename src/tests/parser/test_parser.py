@@ -58,3 +58,26 @@ def __testExampleFile(file_number):
         os.getcwd() + f'/**/test{file_number}.input', recursive=True)[0]
     input, expected = getInput(filename), getExpected(filename)
     assert f'{p.parse(input)}' == expected
+
+LINES_SOURCE = '''def f x y =
+  if x
+    then y
+    elif y then 1
+    else (case y
+      | Nil -> 2
+      | Cons z zs -> (\\w -> w) z)
+def g = 1'''
+
+def lines(program):
+    f, g = program.definitions()
+    branches = f.expr().body().body().branches()
+    elif_branches = branches[1].expr().branches()
+    case_branches = elif_branches[1].expr().branches()
+    return (f.line, f.expr().line, f.expr().body().line, [b.line for b in branches],
+            [b.line for b in elif_branches], [b.line for b in case_branches],
+            case_branches[1].expr().fn().line, g.line)
+
+@pytest.mark.parametrize('fast_lexer', [False, True])
+def test_source_lines(fast_lexer):
+    program = Parser(fast_lexer=fast_lexer).parse(LINES_SOURCE)
+    assert lines(program) == (1, 1, 1, [2, 4], [4, 5], [6, 7], 7, 8)
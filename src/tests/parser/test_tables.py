@@ -0,0 +1,29 @@
+import glob
+import os
+import pytest
+from flecha import lextab, parsetab
+from flecha.lexer import Lexer
+from flecha.parser import Parser
+from flecha.tables import grammar_signature, lexer_regexes
+
+def test_shipped_tables_match_grammar():
+    # Si falla, regenerar las tablas con: py -m flecha.tables (desde src)
+    assert parsetab._lr_signature == grammar_signature()
+    assert lextab._lextokens == set(Lexer.tokens)
+    assert {state: [regex for regex, _ in rules] for state, rules in lextab._lexstatere.items()} == lexer_regexes()
+
+@pytest.mark.parametrize('filename', sorted(glob.glob(os.getcwd() + '/**/parser/examples/*.input', recursive=True)),
+                         ids=os.path.basename)
+def test_shipped_tables_parse_like_generated_tables(filename):
+    with open(filename, 'r') as fi:
+        source = fi.read()
+    assert f'{Parser().parse(source)}' == f'{Parser(tables=False).parse(source)}'
+
+def test_parser_startup_writes_no_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    package_dir = os.path.dirname(parsetab.__file__)
+    before = sorted(os.listdir(package_dir))
+    Parser().parse('def a = 1')
+    Parser(tables=False).parse('def a = 1')
+    assert os.listdir(tmp_path) == []
+    assert sorted(os.listdir(package_dir)) == before